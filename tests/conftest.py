@@ -0,0 +1,20 @@
+"""Shared fixtures for the ``tools`` test suite (run ``python -m pytest`` from the repo root)."""
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SHEET_PATH = os.path.join(ROOT, 'data', 'weapon-sheet.tsv')
+CATALOG_PATH = os.path.join(ROOT, 'data', 'weapons.json')
+TECH_TREE_PATH = os.path.join(ROOT, 'data', 'tech-tree.json')
+
+
+@pytest.fixture
+def catalog() -> dict:
+    with open(CATALOG_PATH, encoding='utf-8') as handle:
+        return json.load(handle)
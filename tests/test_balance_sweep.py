@@ -0,0 +1,99 @@
+import json
+import math
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from tools.balance_sweep import (  # noqa: E402
+    CONFIG_FILE, RESULTS_FILE, SweepConfigError, build_report, default_shard_size, main, run_sweep)
+
+TARGETS = [{"name": "line", "evasion": 0, "armor": 0}, {"name": "armoured", "evasion": 0, "armor": 3}]
+
+
+@pytest.fixture
+def small_catalog(tmp_path, catalog) -> str:
+    weapons = [weapon for category in catalog['categories'] for weapon in category['weapons']][:12]
+    path = tmp_path / 'weapons.json'
+    path.write_text(json.dumps({"categories": [{"name": 'Mixed', "weapons": weapons}]}), encoding='utf-8')
+    return str(path)
+
+
+def _sweep(catalog_path: str, out_dir, **options) -> list[dict]:
+    options = {"targets": TARGETS, "volleys": 500, "exact": True, "workers": 2, "shard_size": 5, **options}
+    return run_sweep(catalog_path, str(out_dir), **options)
+
+
+def _by_id(records: list[dict]) -> dict:
+    return {record['id']: record for record in records}
+
+
+def test_resume_skips_finished_shards(small_catalog, tmp_path):
+    out = tmp_path / 'sweep'
+    first = _sweep(small_catalog, out)
+    results = sorted((out / RESULTS_FILE).read_text(encoding='utf-8').splitlines())
+    assert len(first) == 12
+    assert json.loads((out / CONFIG_FILE).read_text(encoding='utf-8'))['shard_size'] == 5
+
+    # The pinned shard size is reused, so another worker count resumes cleanly.
+    again = _sweep(small_catalog, out, workers=3, shard_size=None)
+
+    assert _by_id(again) == _by_id(first)
+    assert sorted((out / RESULTS_FILE).read_text(encoding='utf-8').splitlines()) == results
+
+
+def test_half_written_shard_is_recomputed(small_catalog, tmp_path):
+    out = tmp_path / 'sweep'
+    first = _sweep(small_catalog, out)
+    lines = (out / RESULTS_FILE).read_text(encoding='utf-8').splitlines(keepends=True)
+    # Drop the last shard's done marker and tear its last record in half.
+    torn = lines[:-2] + [lines[-2][:len(lines[-2]) // 2]]
+    (out / RESULTS_FILE).write_text(''.join(torn), encoding='utf-8')
+
+    resumed = _sweep(small_catalog, out)
+
+    assert _by_id(resumed) == _by_id(first)
+    markers = [json.loads(line) for line in (out / RESULTS_FILE).read_text(encoding='utf-8').splitlines()]
+    assert sorted(marker['shard'] for marker in markers if marker.get('done')) == [0, 1, 2]
+
+
+def test_changed_parameters_are_refused(small_catalog, tmp_path, capsys):
+    out = tmp_path / 'sweep'
+    _sweep(small_catalog, out)
+    with pytest.raises(SweepConfigError):
+        _sweep(small_catalog, out, volleys=600)
+    with pytest.raises(SystemExit):
+        main([small_catalog, '--out', str(out), '--exact', '--volleys', '600', '--workers', '1'])
+    assert 'different parameters' in capsys.readouterr().err
+    assert len(_sweep(small_catalog, out, volleys=600, fresh=True)) == 12
+
+
+def test_default_shard_size_gives_several_shards_per_worker():
+    for weapons, workers in ((191, 32), (191, 4), (10_000, 64), (3, 8)):
+        size = default_shard_size(weapons, workers)
+        shards = math.ceil(weapons / size)
+        assert shards >= min(weapons, 3 * workers)
+
+
+def _record(weapon_id, category, hardpoint, cost, damage, name=None):
+    return {"id": weapon_id, "name": name or weapon_id, "category": category, "hardpoint": hardpoint,
+            "cost": cost, "damage": damage}
+
+
+def test_build_report():
+    records = [_record(f'gun-{n}', 'Kinetic', 'UHP', 10, 5.0 + n * 0.1) for n in range(6)]
+    records += [_record('broken-gun', 'Kinetic', 'UHP', 10, 40.0),
+                _record('free-gun', 'Kinetic', 'UHP', 0, 3.0),
+                _record('unresolved', 'Kinetic', 'UHP', 5, None),
+                _record('coil-01', 'Kinetic', 'MHP', 10, 8.0, 'Spinal Coilgun 01'),
+                _record('coil-02', 'Kinetic', 'MHP', 20, 6.0, 'Spinal Coilgun 02')]
+
+    report = build_report(records)
+
+    assert report['ranking'][0]['id'] == 'broken-gun'
+    assert [entry['id'] for entry in report['ranking']].count('free-gun') == 0
+    assert report['unpriced'] == ['free-gun']
+    assert [entry['id'] for group in report['outliers'] for entry in group['weapons']] == ['broken-gun']
+    assert report['progressions'] == [{"family": 'Spinal Coilgun', "from": 1, "to": 2,
+                                       "problems": ['damage drops', 'efficiency drops >10%'],
+                                       "damage": [8.0, 6.0], "cost": [10, 20]}]
@@ -0,0 +1,57 @@
+import copy
+import json
+
+import pytest
+
+from tools.catalog_store import CHANGED, WEAPON, CatalogStore, RefError
+
+from conftest import TECH_TREE_PATH
+
+
+@pytest.fixture
+def techs() -> dict:
+    with open(TECH_TREE_PATH, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def test_checkout_round_trip(tmp_path, catalog, techs):
+    store = CatalogStore(str(tmp_path / 'store'))
+    first, created = store.commit(catalog, techs, 'initial')
+    assert created
+
+    edited = copy.deepcopy(catalog)
+    edited["categories"][0]["weapons"][0]["cost"] = 999
+    store.commit(edited, techs, 'edit')
+
+    assert store.commit(edited, techs)[1] is False
+    for ref, expected in (('HEAD~1', catalog), (first[:8], catalog), ('HEAD', edited)):
+        checked_out, checked_techs = store.checkout(ref)
+        assert json.dumps(checked_out, indent=2) == json.dumps(expected, indent=2)
+        assert json.dumps(checked_techs, indent=2) == json.dumps(techs, indent=2)
+
+
+def test_category_move_lists_category_pointer(tmp_path, catalog, techs):
+    store = CatalogStore(str(tmp_path / 'store'))
+    store.commit(catalog, techs)
+    moved = copy.deepcopy(catalog)
+    weapon = moved["categories"][0]["weapons"].pop(0)
+    moved["categories"][1]["weapons"].append(weapon)
+    store.commit(moved, techs)
+
+    changes = [change for change in store.diff('HEAD~1', 'HEAD') if change['kind'] == WEAPON]
+
+    assert len(changes) == 1
+    change = changes[0]
+    assert change['id'] == weapon['id'] and change['op'] == CHANGED and change['fields'] == ['category']
+    assert change['changes'] == [{"path": "/category", "old": catalog["categories"][0]["name"],
+                                  "new": catalog["categories"][1]["name"]}]
+
+
+def test_bad_refs_raise_ref_error(tmp_path, catalog, techs):
+    store = CatalogStore(str(tmp_path / 'store'))
+    with pytest.raises(RefError):
+        store.resolve('HEAD')
+    store.commit(catalog, techs)
+    for ref in ('HEAD~1', 'HEAD~x', 'nope', 'pass-12'):
+        with pytest.raises(RefError):
+            store.resolve(ref)
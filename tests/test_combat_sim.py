@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from tools.combat_sim import DEFAULT_TARGETS, all_weapons, simulate  # noqa: E402
+
+VOLLEYS = 20_000
+
+
+def test_sampled_means_agree_with_exact(catalog):
+    weapons = all_weapons(catalog)
+    exact = simulate(weapons, DEFAULT_TARGETS, VOLLEYS, exact=True)
+    sampled = simulate(weapons, DEFAULT_TARGETS, VOLLEYS, seed=7)
+
+    assert exact.exact[~np.isnan(exact.mean)].all()
+    assert np.array_equal(np.isnan(exact.mean), np.isnan(sampled.mean))
+    resolved = ~np.isnan(exact.mean)
+    # Five standard errors of the sampled mean (plus float slack for exact cells).
+    tolerance = 5 * np.sqrt(exact.variance[resolved] / VOLLEYS) + 1e-9
+    assert (np.abs(sampled.mean[resolved] - exact.mean[resolved]) <= tolerance).all()
+    assert not sampled.exact[resolved].all()
+
+
+def test_sampled_runs_are_reproducible_for_a_seed(catalog):
+    weapons = all_weapons(catalog)[:20]
+    first = simulate(weapons, volleys=5_000, seed=3)
+    second = simulate(weapons, volleys=5_000, seed=3)
+    assert np.array_equal(first.mean, second.mean, equal_nan=True)
+
+
+def test_exact_distribution_sums_to_one(catalog):
+    weapons = all_weapons(catalog)
+    result = simulate(weapons, volleys=1, exact=True)
+    for weapon_id in result.weapon_ids:
+        for band in range(5):
+            pmf = result.distribution(weapon_id, band)
+            if pmf is not None:
+                assert pmf.sum() == pytest.approx(1.0)
@@ -0,0 +1,120 @@
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from tools.data_server import DataServer
+
+from conftest import ROOT
+
+
+@pytest.fixture
+def server() -> DataServer:
+    return DataServer(ROOT)
+
+
+def _get(server: DataServer, target: str) -> tuple[int, bytes]:
+    status, _, body = server.respond('GET', target, {})
+    return status, body
+
+
+def _ids(body: bytes) -> set[str]:
+    return {weapon['id'] for category in json.loads(body)['categories'] for weapon in category['weapons']}
+
+
+def test_serves_app_files_only(server):
+    assert _get(server, '/')[0] == 200
+    assert _get(server, '/js/main.js')[0] == 200
+    assert _get(server, '/data/weapons.json')[0] == 200
+    for target in ('/.git/config', '/.catalog-store/HEAD', '/data/.hidden', '/tools/data_server.py',
+                   '/README.md', '/js/../.git/config', '/%2e%2e/etc/passwd'):
+        assert _get(server, target)[0] == 404, target
+
+
+def test_empty_researched_keeps_only_unlocked_weapons(server):
+    status, body = _get(server, '/api/weapons?researched=')
+    assert status == 200
+    server.data.refresh()
+    resolver = server.data.resolver
+    expected = {weapon['id'] for weapon in resolver.unlocked_weapons([])}
+    assert _ids(body) == expected
+    assert len(expected) < len(_ids(_get(server, '/api/weapons')[1]))
+
+
+def test_unexpected_errors_become_500(server, monkeypatch):
+    def broken(target):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(server, 'route', broken)
+    assert _get(server, '/api/index')[0] == 500
+
+
+def test_etags_and_not_modified(server):
+    status, headers, body = server.respond('GET', '/data/weapons.json', {})
+    etag = headers['ETag']
+    assert status == 200 and headers['Cache-Control'] == 'no-cache' and 'Content-Encoding' not in headers
+
+    for if_none_match in (etag, f'"stale", W/{etag}', '*'):
+        status, headers, body = server.respond('GET', '/data/weapons.json', {"if-none-match": if_none_match})
+        assert (status, body) == (304, b'') and headers['ETag'] == etag
+    assert server.respond('GET', '/data/weapons.json', {"if-none-match": '"stale"'})[0] == 200
+    # The gzip representation has its own tag, so a cached identity body is not reused for it.
+    status, headers, _ = server.respond('GET', '/data/weapons.json', {"if-none-match": etag, "accept-encoding": 'gzip'})
+    assert status == 200 and headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip', 'gzip'), ('gzip, deflate', 'gzip'), ('*', 'gzip'), ('', None), ('deflate', None),
+    ('gzip;q=0', None), ('*, gzip;q=0', None), ('identity', None),
+])
+def test_gzip_follows_accept_encoding(server, monkeypatch, accept, expected):
+    monkeypatch.setattr('tools.data_server._brotli', lambda: None)
+    server.files.clear()
+    status, headers, body = server.respond('GET', '/data/weapons.json', {"accept-encoding": accept})
+
+    assert status == 200 and headers.get('Content-Encoding') == expected and headers['Vary'] == 'Accept-Encoding'
+    assert int(headers['Content-Length']) == len(body)
+    with open(os.path.join(ROOT, 'data', 'weapons.json'), 'rb') as handle:
+        assert (gzip.decompress(body) if expected else body) == handle.read()
+    assert server.respond('HEAD', '/data/weapons.json', {"accept-encoding": accept})[2] == b''
+
+
+def _write(path, obj, stamp: int) -> None:
+    path.write_text(json.dumps(obj), encoding='utf-8')
+    os.utime(path, ns=(stamp, stamp))  # distinct mtimes even on coarse clocks
+
+
+def test_refreshes_when_data_files_change(tmp_path, catalog):
+    weapons_path, tech_path = tmp_path / 'weapons.json', tmp_path / 'tech-tree.json'
+    shutil.copyfile(os.path.join(ROOT, 'data', 'tech-tree.json'), tech_path)
+    first = {"categories": catalog['categories'][:1]}
+    _write(weapons_path, first, 10**18)
+    server = DataServer(str(tmp_path), str(weapons_path), str(tech_path))
+
+    status, headers, body = server.respond('GET', '/api/index', {})
+    assert status == 200 and json.loads(body)['weapons'] == len(first['categories'][0]['weapons'])
+    assert server.respond('GET', '/api/index', {"if-none-match": headers['ETag']})[0] == 304
+
+    _write(weapons_path, catalog, 10**18 + 10**9)
+    status, headers_after, body = server.respond('GET', '/api/index', {"if-none-match": headers['ETag']})
+    assert status == 200 and headers_after['ETag'] != headers['ETag']
+    assert json.loads(body)['weapons'] == sum(len(category['weapons']) for category in catalog['categories'])
+
+    # A half-written file keeps serving the previous data.
+    weapons_path.write_text('{"categories": [', encoding='utf-8')
+    os.utime(weapons_path, ns=(10**18 + 2 * 10**9,) * 2)
+    assert server.respond('GET', '/api/index', {"if-none-match": headers_after['ETag']})[0] == 304
+
+
+def test_static_files_are_reloaded_when_they_change(tmp_path):
+    page = tmp_path / 'index.html'
+    page.write_text('<p>one</p>', encoding='utf-8')
+    server = DataServer(str(tmp_path))
+    first = server.respond('GET', '/', {})
+
+    page.write_text('<p>two, longer</p>', encoding='utf-8')
+    second = server.respond('GET', '/', {"if-none-match": first[1]['ETag']})
+
+    assert second[0] == 200 and second[2] == b'<p>two, longer</p>' and second[1]['ETag'] != first[1]['ETag']
@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import CATALOG_PATH, TECH_TREE_PATH
+from tools.empire_preflight import CACHE_FILE, validate_tree
+
+
+def _export(name: str, widgets=()) -> dict:
+    return {"fileVersion": 1, "empire": {"name": name, "researchedTech": []},
+            "widgets": list(widgets), "connections": []}
+
+
+@pytest.fixture
+def saves(tmp_path):
+    folder = tmp_path / 'saves'
+    folder.mkdir()
+    for name in ('alpha', 'beta'):
+        (folder / f'{name}.json').write_text(json.dumps(_export(name)), encoding='utf-8')
+    return folder
+
+
+@pytest.fixture
+def tech_path(tmp_path) -> str:
+    # A private copy, so the index written next to it stays out of data/.
+    path = tmp_path / 'tech-tree.json'
+    shutil.copyfile(TECH_TREE_PATH, path)
+    return str(path)
+
+
+def _validate(saves, tech_path):
+    results, stats = validate_tree(str(saves), CATALOG_PATH, tech_path, workers=2)
+    return {os.path.basename(result['path']): result for result in results}, stats
+
+
+def test_malformed_files_fail_alone(saves, tech_path):
+    (saves / 'widgets.json').write_text(json.dumps({"widgets": ['x']}), encoding='utf-8')
+    (saves / 'empire.json').write_text(json.dumps({"empire": 'Rome'}), encoding='utf-8')
+    (saves / 'torn.json').write_text('{"empire": ', encoding='utf-8')
+    (saves / 'list.json').write_text('[]', encoding='utf-8')
+
+    results, stats = _validate(saves, tech_path)
+
+    assert stats == {"files": 6, "checked": 6, "cached": 0, "failed": 4}
+    assert results['alpha.json']['ok'] and results['beta.json']['empire'] == 'beta'
+    for name in ('widgets.json', 'empire.json', 'torn.json', 'list.json'):
+        assert results[name]['ok'] is False and results[name]['invalid']
+    assert results['widgets.json']['invalid'].startswith('AttributeError')
+    # The failures are cached like any other result.
+    assert _validate(saves, tech_path)[1]['checked'] == 0
+
+
+def test_unchanged_files_come_from_the_cache(saves, tech_path):
+    first, stats = _validate(saves, tech_path)
+    assert stats['checked'] == 2
+    assert os.path.exists(saves / CACHE_FILE)
+
+    again, stats = _validate(saves, tech_path)
+    assert stats == {"files": 2, "checked": 0, "cached": 2, "failed": 0}
+    assert again == first
+
+    # A touched file with the same content is matched by its hash.
+    os.utime(saves / 'alpha.json', ns=(1, 1))
+    assert _validate(saves, tech_path)[1]['checked'] == 0
+
+
+def test_cache_is_invalidated_by_content_and_rule_changes(saves, tech_path):
+    _validate(saves, tech_path)
+
+    (saves / 'beta.json').write_text(json.dumps(_export('gamma')), encoding='utf-8')
+    results, stats = _validate(saves, tech_path)
+    assert stats['checked'] == 1
+    assert results['beta.json']['empire'] == 'gamma'
+
+    with open(tech_path, encoding='utf-8') as handle:
+        techs = json.load(handle)
+    techs['extra-tech'] = {"name": 'Extra', "cost": 5, "prerequisites": []}
+    with open(tech_path, 'w', encoding='utf-8') as handle:
+        json.dump(techs, handle)
+    assert _validate(saves, tech_path)[1]['checked'] == 2
@@ -0,0 +1,28 @@
+import hashlib
+
+import pytest
+
+from tools.fileutil import file_digest, open_atomic, write_atomic
+
+
+def test_write_atomic_and_digest(tmp_path):
+    path = tmp_path / 'out.json'
+    write_atomic(str(path), 'café\n')
+    write_atomic(str(path), b'{"a": 1}\n')
+
+    assert path.read_bytes() == b'{"a": 1}\n'
+    assert file_digest(str(path)) == hashlib.blake2b(b'{"a": 1}\n', digest_size=16).hexdigest()
+    assert [item.name for item in tmp_path.iterdir()] == ['out.json']
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_text('old', encoding='utf-8')
+
+    with pytest.raises(RuntimeError):
+        with open_atomic(str(path)) as handle:
+            handle.write('half')
+            raise RuntimeError('interrupted')
+
+    assert path.read_text(encoding='utf-8') == 'old'
+    assert [item.name for item in tmp_path.iterdir()] == ['out.txt']
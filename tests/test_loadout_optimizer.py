@@ -0,0 +1,85 @@
+import itertools
+import random
+import time
+
+from tools.hardpoints import HARDPOINTS, class_masks, hardpoint_demand
+from tools.loadout_optimizer import optimize
+
+
+def _item(index: int, hardpoint: str, size: int, cost: int, value: float) -> dict:
+    return {"weapon": {"id": f"w{index}", "name": f"W{index}", "hardpoint": hardpoint},
+            "class": hardpoint, "size": size, "cost": cost, "value": value}
+
+
+def _brute_force(items: list[dict], slots: dict[str, int], budget: int | None) -> float:
+    """Best value over every multiset of items that fits the slots and budget."""
+    best = 0.0
+    limits = [slots.get(item['class'], 0) // item['size'] for item in items]
+    for counts in itertools.product(*(range(limit + 1) for limit in limits)):
+        used = dict.fromkeys(HARDPOINTS, 0)
+        for item, count in zip(items, counts):
+            used[item['class']] += item['size'] * count
+        if any(used[key] > slots.get(key, 0) for key in HARDPOINTS):
+            continue
+        cost = sum(item['cost'] * count for item, count in zip(items, counts))
+        if budget is not None and cost > budget:
+            continue
+        best = max(best, sum(item['value'] * count for item, count in zip(items, counts)))
+    return best
+
+
+def test_optimizer_matches_brute_force_on_small_cases():
+    rng = random.Random(11)
+    for _ in range(60):
+        items = [_item(i, rng.choice(HARDPOINTS[:3]), rng.choice((1, 1, 2)), rng.randint(1, 9), rng.randint(1, 12) / 2)
+                 for i in range(rng.randint(1, 5))]
+        slots = {key: rng.randint(0, 3) for key in HARDPOINTS[:3]}
+        budget = rng.choice((None, rng.randint(0, 20)))
+
+        result = optimize(items, slots, budget)
+
+        assert result["value"] == round(_brute_force(items, slots, budget), 6)
+        assert budget is None or result["cost"] <= budget
+        assert all(result["used"][key] <= slots.get(key, 0) for key in HARDPOINTS)
+
+
+def test_multi_hardpoint_classification():
+    assert hardpoint_demand('PHP') == ('PHP', 1)
+    assert hardpoint_demand('MH4') == ('MHP', 4)
+    assert hardpoint_demand('hHP') is None
+    assert hardpoint_demand(None) is None
+    assert class_masks({"MHP": 1, "MH2": 2, "SpHP": 4}) == {"MHP": 3}
+
+
+def _random_items(rng: random.Random, count: int) -> list[dict]:
+    return [_item(i, rng.choice(HARDPOINTS), rng.choice((1, 1, 2, 3)), rng.randint(1, 40), rng.randint(1, 60) / 4)
+            for i in range(count)]
+
+
+def test_unbudgeted_fill_matches_an_unreachable_budget():
+    rng = random.Random(5)
+    for _ in range(20):
+        items = _random_items(rng, rng.randint(1, 12))
+        slots = {key: rng.randint(0, 12) for key in HARDPOINTS}
+        loose = sum(item['cost'] for item in items) * max(slots.values())
+
+        unbudgeted = optimize(items, slots)
+
+        assert unbudgeted["value"] == optimize(items, slots, loose)["value"]
+        assert all(unbudgeted["used"][key] <= slots[key] for key in HARDPOINTS)
+        assert sum(weapon["cost"] for weapon in unbudgeted["weapons"]) == unbudgeted["cost"]
+
+
+def test_large_designs_stay_fast():
+    items = _random_items(random.Random(3), 60)
+    slots = dict.fromkeys(HARDPOINTS, 48)
+
+    start = time.perf_counter()
+    unbudgeted = optimize(items, slots)
+    elapsed = time.perf_counter() - start
+    budgeted = optimize(items, slots, 150)
+
+    assert elapsed < 0.1
+    assert unbudgeted["front"] == 1
+    assert budgeted["cost"] <= 150 < unbudgeted["cost"]
+    assert budgeted["value"] < unbudgeted["value"]
@@ -0,0 +1,46 @@
+import io
+import json
+
+from tools import weapon_parser as wp
+from tools.parser_bench import DISTINCT_NAMES, HEADER_EVERY, STAGES, benchmark, compare, format_report, synthetic_lines
+
+
+def test_synthetic_lines_parse_like_the_sheet():
+    lines = list(synthetic_lines(120, seed=3))
+
+    assert len(lines) == 120
+    assert lines == list(synthetic_lines(120, seed=3))
+    assert lines != list(synthetic_lines(120, seed=4))
+    headers = [index for index, line in enumerate(lines) if line.split('\t')[0] in wp.CATEGORY_HEADERS]
+    assert headers == list(range(0, 120, HEADER_EVERY))
+
+    out = io.StringIO()
+    assert wp.write_catalog(wp.iter_records(wp.iter_rows(lines)), out) == (120 - len(headers), len(headers))
+    weapons = [weapon for category in json.loads(out.getvalue())['categories'] for weapon in category['weapons']]
+    suffixes = {weapon['name'].rsplit(' ', 1)[1] for weapon in weapons}
+    assert suffixes <= {f'Mk{n}' for n in range(DISTINCT_NAMES)}
+    assert all(len(weapon['ranges']) == wp.RANGE_BANDS for weapon in weapons)
+
+
+def _report(rows: int, **throughput) -> dict:
+    return {"rows": rows, "stages": {stage: {"seconds": 1.0, "rows_per_sec": value}
+                                     for stage, value in throughput.items()}}
+
+
+def test_compare_flags_only_losses_beyond_the_tolerance():
+    baseline = [_report(1000, split_line=1000, slugify=1000, parse_notes=None), _report(5000, split_line=10)]
+    report = [_report(1000, split_line=700, slugify=800, parse_notes=5, end_to_end=1), _report(2000, split_line=1)]
+
+    assert compare(report, baseline, 0.25) == ['split_line @ 1000 rows: 700 rows/s vs 1,000 baseline']
+    assert compare(report, baseline, 0.1) == ['split_line @ 1000 rows: 700 rows/s vs 1,000 baseline',
+                                              'slugify @ 1000 rows: 800 rows/s vs 1,000 baseline']
+    assert compare(report, baseline, 0.5) == []
+
+
+def test_benchmark_report():
+    report = [benchmark(60)]
+
+    assert set(report[0]['stages']) == set(STAGES) | {'end_to_end'}
+    assert report[0]['peak_traced_mb'] > 0
+    assert compare(report, report, 0.0) == []
+    assert format_report(report).splitlines()[-1].startswith('peak traced MB')
@@ -0,0 +1,56 @@
+import json
+import os
+
+from tools.save_archive import SaveArchive, main, search
+
+
+def _export(name: str, ships: int, weapon_id: str = 'heavy-coilgun') -> dict:
+    outfit = {"weapons": {"spinal": None, "offensive": [{"weaponId": weapon_id, "count": 2}], "defensive": []},
+              "notes": "Standard line outfit " * 20}
+    widgets = [{"id": f"w{index}", "type": 'outfit', "position": {"x": index * 40, "y": 0},
+                "data": {"title": f"Ship {index % 3}", "outfitData": outfit}} for index in range(ships)]
+    return {"fileVersion": '1.0', "timestamp": '2026-01-01T00:00:00.000Z',
+            "empire": {"name": name, "researchedTech": ['light-coilgun', 'heavy-coilgun'], "techPoints": 3},
+            "widgets": widgets,
+            "connections": [{"from": f"w{index}", "to": f"w{index + 1}"} for index in range(ships - 1)]}
+
+
+def _extract(archive: SaveArchive, entry: dict) -> bytes:
+    return ''.join(archive.stream(entry)).encode('utf-8')
+
+
+def test_extract_returns_the_ingested_bytes(tmp_path):
+    texts = {
+        'indent.json': json.dumps(_export('Terran Union', 12), indent=2, ensure_ascii=False),
+        'compact.json': json.dumps(_export('Ærø Pact', 30), separators=(',', ':'), ensure_ascii=False) + '\n',
+        'odd.json': json.dumps(_export('Odd Spacing', 3), indent=4),
+    }
+    archive = SaveArchive(str(tmp_path / 'archive'))
+    entries = {}
+    for name, text in texts.items():
+        path = tmp_path / name
+        path.write_bytes(text.encode('utf-8'))
+        entry, added = archive.ingest(str(path))
+        assert added
+        entries[name] = entry
+
+    assert entries['odd.json']['format'] == 'raw'
+    for name, text in texts.items():
+        assert _extract(archive, entries[name]) == text.encode('utf-8')
+        assert archive.verify(entries[name])
+        out = tmp_path / f'restored-{name}'
+        assert main(['--archive', archive.root, '--extract', entries[name]['id'][:10], '-o', str(out)]) == 0
+        assert out.read_bytes() == text.encode('utf-8')
+
+
+def test_repeated_payloads_are_stored_once(tmp_path):
+    archive = SaveArchive(str(tmp_path / 'archive'))
+    for index, ships in enumerate((20, 21)):
+        path = tmp_path / f'save-{index}.json'
+        path.write_text(json.dumps(_export('Terran Union', ships), indent=2), encoding='utf-8')
+        archive.ingest(str(path))
+    size = sum(os.path.getsize(os.path.join(folder, name))
+               for folder, _, names in os.walk(tmp_path / 'archive' / 'chunks') for name in names)
+
+    assert size < os.path.getsize(tmp_path / 'save-1.json')
+    assert [entry['widgets'] for entry in search(archive.index(), empire='terran', weapons=['heavy-coilgun'])] == [20, 21]
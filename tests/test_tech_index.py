@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from conftest import TECH_TREE_PATH
+from tools.tech_index import (
+    TechGraphError, TechResolver, build_index, check_graph, effective_prerequisites, load_index, topological_order)
+
+
+def _tech(cost=None, prerequisites=(), special=None):
+    tech = {"prerequisites": list(prerequisites)}
+    if cost is not None:
+        tech["cost"] = cost
+    if special is not None:
+        tech["specialRequirement"] = special
+    return tech
+
+
+def test_only_explicit_zero_cost_techs_are_auto_unlocked():
+    techs = {"free": _tech(0), "unpriced": _tech(), "paid": _tech(3),
+             "gated": _tech(0, special='Tier3'), "child": _tech(0, ['free'])}
+    resolver = TechResolver(build_index(techs))
+
+    assert set(resolver.ids(resolver.auto_unlocked)) == {'free'}
+
+
+def test_missing_cost_adds_nothing_to_research_paths():
+    techs = {"base": _tech(), "next": _tech(4, ['base'])}
+    resolver = TechResolver(build_index(techs))
+
+    assert resolver.research_path('next') == (['base', 'next'], 4)
+
+
+def test_check_graph_reports_unknown_prerequisites_and_cycles():
+    techs = {"a": _tech(1, ['b']), "b": _tech(1, ['c']), "c": _tech(1, ['a']),
+             "d": _tech(1, ['ghost'], special='phantom'), "e": _tech(1, special='Tier3')}
+
+    problems = check_graph(techs)
+
+    assert "d requires unknown tech 'ghost'" in problems
+    assert "d requires unknown tech 'phantom'" in problems
+    assert 'prerequisite cycle: a -> b -> c -> a' in problems
+    assert len(problems) == 3
+    with pytest.raises(TechGraphError) as error:
+        topological_order(techs)
+    assert error.value.problems == problems
+
+
+def test_topological_order_puts_prerequisites_first():
+    techs = {"top": _tech(1, ['mid', 'side']), "mid": _tech(1, ['base']), "side": _tech(1, special='base'),
+             "base": _tech(0), "loose": _tech(2)}
+
+    order = topological_order(techs)
+
+    assert order == ['base', 'mid', 'side', 'top', 'loose']
+
+
+def test_topological_order_of_the_real_tree():
+    with open(TECH_TREE_PATH, encoding='utf-8') as handle:
+        techs = json.load(handle)
+
+    order = topological_order(techs)
+
+    assert sorted(order) == sorted(techs)
+    position = {tech_id: index for index, tech_id in enumerate(order)}
+    for tech_id, tech in techs.items():
+        for prerequisite in effective_prerequisites(tech):
+            assert position[prerequisite] < position[tech_id]
+
+
+def _catalog(*weapons):
+    return {"categories": [{"name": 'Test', "weapons": [
+        {"id": weapon_id, "techRequirement": tech} for weapon_id, tech in weapons]}]}
+
+
+def test_unlocked_weapons():
+    techs = {"base": _tech(0), "mid": _tech(5, ['base']), "top": _tech(5, ['mid']), "other": _tech(3)}
+    catalog = _catalog(('starter', 'base'), ('mid-gun', 'mid'), ('top-gun', 'top'), ('odd-gun', 'other'),
+                       ('salvage', None), ('mystery', 'not-a-tech'))
+    resolver = TechResolver(build_index(techs), catalog)
+
+    def unlocked(researched, **options):
+        return [weapon['id'] for weapon in resolver.unlocked_weapons(researched, **options)]
+
+    assert unlocked([]) == ['starter', 'salvage', 'mystery']
+    assert unlocked(['mid']) == ['starter', 'mid-gun', 'salvage', 'mystery']
+    # ``top`` researched without ``mid`` only counts when prerequisites are not required.
+    assert unlocked(['top']) == ['starter', 'top-gun', 'salvage', 'mystery']
+    assert unlocked(['top'], require_prerequisites=True) == ['starter', 'salvage', 'mystery']
+    assert unlocked(['mid', 'top', 'other'], require_prerequisites=True) == [
+        'starter', 'mid-gun', 'top-gun', 'odd-gun', 'salvage', 'mystery']
+
+
+@pytest.mark.parametrize('content', ['', '{"version": 2, "sou', '[1, 2]', 'null'])
+def test_load_index_rebuilds_a_corrupt_index(tmp_path, content):
+    tech_path = tmp_path / 'tree.json'
+    tech_path.write_text(json.dumps({"base": _tech(0), "next": _tech(4, ['base'])}), encoding='utf-8')
+    index_path = tmp_path / 'tree.index.json'
+    index_path.write_text(content, encoding='utf-8')
+
+    index = load_index(str(tech_path))
+
+    assert index['order'] == ['base', 'next']
+    assert json.loads(index_path.read_text(encoding='utf-8')) == index
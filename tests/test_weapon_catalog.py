@@ -0,0 +1,83 @@
+import io
+import json
+
+from tools.weapon_catalog import ColumnarBuilder, WeaponCatalog, _as_int, write_columnar
+from tools.weapon_parser import iter_records, iter_rows, write_catalog
+
+
+def _normalized(value):
+    """The columnar format stores numeric strings such as ``"+1"`` as integers."""
+    as_int = _as_int(value)
+    return value if as_int is None or value == 'N/A' else as_int
+
+
+def _expected(catalog: dict) -> dict:
+    categories = []
+    for category in catalog["categories"]:
+        weapons = []
+        for weapon in category["weapons"]:
+            entry = dict(weapon)
+            entry["ranges"] = [{key: _normalized(band[key]) for key in ("accuracy", "damage")} for band in weapon["ranges"]]
+            entry["notes"] = [{key: _normalized(value) for key, value in note.items()} for note in weapon["notes"]]
+            entry["cost"] = _normalized(weapon["cost"])
+            weapons.append(entry)
+        categories.append({"name": category["name"], "weapons": weapons})
+    return {"categories": categories}
+
+
+def test_columnar_round_trip(catalog, tmp_path):
+    path = str(tmp_path / 'weapons.fvwc')
+    write_columnar(catalog, path)
+
+    with WeaponCatalog(path) as columnar:
+        assert len(columnar) == 191
+        assert columnar.to_catalog() == _expected(catalog)
+        row = columnar.index_of('pd-gun-pack')
+        assert columnar.band(row, 0) == (1, 1)
+        assert columnar.has_flag(row, 'Antimissile')
+
+
+def test_exception_cells_round_trip(tmp_path):
+    weapon = {"id": "mortar", "name": "Mortar",
+              "ranges": [{"accuracy": 2, "damage": "2d6"}, {"accuracy": 'N/A', "damage": 1.5}] + [{"accuracy": None, "damage": None}] * 3,
+              "notes": [{"name": "Volume", "value": 2}, {"name": "Indirect"}],
+              "hardpoint": "MH4", "cost": None, "techRequirement": "artillery", "ammo": "shell"}
+    catalog = {"categories": [{"name": "Kinetic", "weapons": [weapon]}]}
+    path = str(tmp_path / 'mortar.fvwc')
+    write_columnar(catalog, path)
+
+    with WeaponCatalog(path) as columnar:
+        assert columnar.to_catalog() == catalog
+
+
+def _weapon(weapon_id: str) -> dict:
+    return {"id": weapon_id, "name": weapon_id.title(), "ranges": [{"accuracy": 1, "damage": 2}] * 5,
+            "notes": [], "hardpoint": "UHP", "cost": 3}
+
+
+def test_reopened_category_blocks_round_trip(tmp_path):
+    catalog = {"categories": [{"name": "Kinetic", "weapons": [_weapon('gun')]},
+                              {"name": "Particle", "weapons": [_weapon('beam')]},
+                              {"name": "Empty", "weapons": []},
+                              {"name": "Kinetic", "weapons": [_weapon('rail')]}]}
+    path = str(tmp_path / 'blocks.fvwc')
+    write_columnar(catalog, path)
+
+    with WeaponCatalog(path) as columnar:
+        assert columnar.categories() == ['Kinetic', 'Particle', 'Empty', 'Kinetic']
+        assert columnar.to_catalog() == catalog
+
+
+def test_streamed_records_keep_parser_blocks(tmp_path):
+    header = '\t' * 13 + '0\n'
+    lines = ['Kinetic' + header, 'Gun\t1\t2' + '\t' * 9 + 'UHP\t5\n',
+             'Particle' + header, 'Beam\t1\t2' + '\t' * 9 + 'SHP\t5\n',
+             'Kinetic' + header, 'Rail\t1\t2' + '\t' * 9 + 'UHP\t6\n']
+    builder = ColumnarBuilder()
+    out = io.StringIO()
+    write_catalog(builder.add_records(iter_records(iter_rows(lines))), out)
+    path = str(tmp_path / 'streamed.fvwc')
+    builder.write(path)
+
+    with WeaponCatalog(path) as columnar:
+        assert columnar.to_catalog() == _expected(json.loads(out.getvalue()))
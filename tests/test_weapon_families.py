@@ -0,0 +1,74 @@
+import pytest
+
+from conftest import CATALOG_PATH, SHEET_PATH
+from tools.weapon_families import FamilyCatalog, FamilyError, build_compact, main
+
+
+@pytest.fixture
+def families(catalog) -> FamilyCatalog:
+    return FamilyCatalog(build_compact(catalog, [SHEET_PATH]))
+
+
+def _weapons(catalog: dict) -> dict:
+    return {weapon['name']: weapon for category in catalog['categories'] for weapon in category['weapons']}
+
+
+def test_expand_rebuilds_the_catalog(catalog, families):
+    assert families.expand() == {"categories": [{"name": category['name'], "weapons": category['weapons']}
+                                                for category in catalog['categories']]}
+    assert [weapon for _, weapon in families.iter_weapons()] == list(_weapons(catalog).values())
+    stored = sum(len(category['weapons']) for category in families.compact['categories'])
+    assert stored < len(_weapons(catalog))
+
+
+def test_tier_expansion(catalog, families):
+    weapons = _weapons(catalog)
+    coilgun = families.family('Spinal Coilgun')
+
+    assert coilgun.tiers == ['01', '02', '03', '04', '05']
+    assert families.tier('Spinal Coilgun', '03') == weapons['Spinal Coilgun 03']
+    assert coilgun.tier(5) == weapons['Spinal Coilgun 05']
+    assert coilgun.tier('03') is coilgun.tier(3)
+
+
+@pytest.mark.parametrize('family, tier, message', [
+    ('Spinal Coilgun', '06', "Spinal Coilgun has no tier '06'"),
+    ('Spinal Coilgun', 0, 'Spinal Coilgun has no tier 0'),
+    ('Spinal Coilgun', 6, 'Spinal Coilgun has no tier 6'),
+    ('Spinal Coilgn', '01', "Unknown family 'Spinal Coilgn'"),
+])
+def test_unknown_tiers_and_families(families, family, tier, message):
+    with pytest.raises(KeyError) as error:
+        families.tier(family, tier)
+    assert error.type is FamilyError and str(error.value).startswith(message)
+
+
+def test_with_generator_applies_signed_offsets(catalog, families):
+    maser = _weapons(catalog)['Light Optical MASER']
+    offsets = families.generator('MASER').offsets('01')
+
+    assert offsets[:2] == [{"accuracy": 0, "damage": 0}, {"accuracy": 0, "damage": -1}]
+    # Later tiers only change the cost and inherit the first tier's offsets.
+    assert families.generator('MASER').offsets('05') == offsets
+
+    boosted = families.with_generator(maser, 'MASER', '02')
+    assert boosted['ranges'][:2] == [{"accuracy": 7, "damage": 4}, {"accuracy": 4, "damage": 0}]
+    assert boosted['ranges'][2:] == maser['ranges'][2:]
+    assert boosted != maser and maser['ranges'][1]['damage'] == 1
+
+    signed = {**maser, "ranges": [{"accuracy": '+1', "damage": 3}] * 5}
+    assert families.with_generator(signed, 'MASER', 1)['ranges'][3] == {"accuracy": '+0', "damage": 1}
+
+    variants = list(families.generator_variants('MASER', '02'))
+    assert boosted in variants and all('MASER' in weapon['name'].split() for weapon in variants)
+    with pytest.raises(FamilyError):
+        families.generator('GASER')
+    with pytest.raises(FamilyError):
+        next(families.generator_variants('MASER', '09'))
+
+
+def test_cli_reports_unknown_tiers(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([CATALOG_PATH, '--tier', 'Spinal Coilgun', '06'])
+    assert exit_info.value.code == 2
+    assert "Spinal Coilgun has no tier '06'" in capsys.readouterr().err
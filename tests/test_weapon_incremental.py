@@ -0,0 +1,78 @@
+import json
+import shutil
+
+from tools.weapon_incremental import manifest_path_for, rebuild
+
+from conftest import CATALOG_PATH, SHEET_PATH
+
+
+def _workspace(tmp_path):
+    sheet = tmp_path / 'weapon-sheet.tsv'
+    catalog = tmp_path / 'weapons.json'
+    shutil.copy(SHEET_PATH, sheet)
+    shutil.copy(CATALOG_PATH, catalog)
+    return sheet, catalog
+
+
+def _weapons(catalog_path) -> dict:
+    with open(catalog_path, encoding='utf-8') as handle:
+        catalog = json.load(handle)
+    return {weapon["id"]: weapon for category in catalog["categories"] for weapon in category["weapons"]}
+
+
+def test_first_run_without_manifest_leaves_catalog_unchanged(tmp_path):
+    sheet, catalog = _workspace(tmp_path)
+    before = catalog.read_text(encoding='utf-8')
+
+    stats = rebuild([str(sheet)], str(catalog))
+
+    assert stats == {"parsed": 0, "reused": 191, "removed": 0, "kept": 0}
+    assert catalog.read_text(encoding='utf-8') == before
+    manifest = json.loads(open(manifest_path_for(str(catalog)), encoding='utf-8').read())
+    assert len(manifest["rows"]) == 191
+
+
+def test_checked_in_manifest_matches_sheet(tmp_path):
+    sheet, catalog = _workspace(tmp_path)
+    shutil.copy(manifest_path_for(CATALOG_PATH), manifest_path_for(str(catalog)))
+    before = catalog.read_text(encoding='utf-8')
+
+    assert rebuild([str(sheet)], str(catalog))["parsed"] == 0
+    assert catalog.read_text(encoding='utf-8') == before
+
+
+def test_one_row_edit_reparses_only_that_row(tmp_path):
+    sheet, catalog = _workspace(tmp_path)
+    rebuild([str(sheet)], str(catalog))
+    before = _weapons(catalog)
+
+    lines = sheet.read_text(encoding='utf-8').splitlines(keepends=True)
+    index = next(i for i, line in enumerate(lines) if line.startswith('Boosted Cannon\t'))
+    cells = lines[index].rstrip('\n').split('\t')
+    cells[-1] = str(int(cells[-1]) + 7)
+    lines[index] = '\t'.join(cells) + '\n'
+    sheet.write_text(''.join(lines), encoding='utf-8')
+
+    stats = rebuild([str(sheet)], str(catalog))
+    after = _weapons(catalog)
+
+    assert stats == {"parsed": 1, "reused": 190, "removed": 0, "kept": 0}
+    changed = [weapon_id for weapon_id in before if before[weapon_id] != after[weapon_id]]
+    assert changed == ['boosted-cannon']
+    assert after['boosted-cannon']["cost"] == before['boosted-cannon']["cost"] + 7
+    assert after['boosted-cannon']["techRequirement"] == before['boosted-cannon']["techRequirement"]
+
+
+def test_reopened_category_starts_new_block(tmp_path):
+    sheet = tmp_path / 'sheet.tsv'
+    catalog = tmp_path / 'weapons.json'
+    header = '\t' * 13 + '0\n'
+    sheet.write_text('Kinetic' + header + 'Gun\t1\t2' + '\t' * 9 + 'UHP\t5\n'
+                     'Particle' + header + 'Beam\t1\t2' + '\t' * 9 + 'SHP\t5\n'
+                     'Kinetic' + header + 'Rail\t1\t2' + '\t' * 9 + 'UHP\t6\n', encoding='utf-8')
+
+    rebuild([str(sheet)], str(catalog))
+    categories = json.loads(catalog.read_text(encoding='utf-8'))["categories"]
+
+    assert [(c["name"], [w["id"] for w in c["weapons"]]) for c in categories] == [
+        ('Kinetic', ['gun']), ('Particle', ['beam']), ('Kinetic', ['rail'])]
@@ -0,0 +1,64 @@
+import io
+import json
+
+from tools.weapon_parser import iter_lines, iter_records, iter_rows, normalize_row, parse_range_cell, write_catalog
+
+from conftest import SHEET_PATH
+
+
+def _parse_sheet() -> str:
+    out = io.StringIO()
+    write_catalog(iter_records(iter_rows(iter_lines([SHEET_PATH]))), out)
+    return out.getvalue()
+
+
+def _collect(records) -> dict:
+    categories = []
+    for kind, category, weapon in records:
+        if not categories or categories[-1]["name"] != category:
+            categories.append({"name": category, "weapons": []})
+        if weapon is not None:
+            categories[-1]["weapons"].append(weapon)
+    return {"categories": categories}
+
+
+def test_streamed_output_matches_json_dump():
+    records = list(iter_records(iter_rows(iter_lines([SHEET_PATH]))))
+    out = io.StringIO()
+    write_catalog(records, out)
+    assert out.getvalue() == json.dumps(_collect(records), indent=2)
+
+
+def test_reopened_category_starts_new_block():
+    lines = ['Kinetic\t\t\t\t\t\t\t\t\t\t\t\t\t0\n',
+             'Gun\t1\t2\t\t\t\t\t\t\t\t\t\tUHP\t5\n',
+             'Particle\t\t\t\t\t\t\t\t\t\t\t\t\t0\n',
+             'Beam\t1\t2\t\t\t\t\t\t\t\t\t\tSHP\t5\n',
+             'Kinetic\t\t\t\t\t\t\t\t\t\t\t\t\t0\n',
+             'Gun\t1\t2\t\t\t\t\t\t\t\t\t\tUHP\t5\n']
+    out = io.StringIO()
+    assert write_catalog(iter_records(iter_rows(lines)), out) == (3, 3)
+    catalog = json.loads(out.getvalue())
+    assert [c["name"] for c in catalog["categories"]] == ['Kinetic', 'Particle', 'Kinetic']
+    assert catalog["categories"][2]["weapons"][0]["id"] == 'gun-2'
+
+
+def test_sheet_reproduces_checked_in_catalog(catalog):
+    for category in catalog["categories"]:
+        for weapon in category["weapons"]:
+            weapon.pop("techRequirement", None)
+    assert _parse_sheet() == json.dumps(catalog, indent=2)
+
+
+def test_short_tabbed_rows_keep_tail_columns_right_anchored():
+    row = normalize_row(['Spinal', '1', '2', 'Pierce(3)', 'MHP', '40'])
+    assert row[-3:] == ['Pierce(3)', 'MHP', '40']
+    assert row[1:3] == ['1', '2'] and row[3:11] == [''] * 8
+
+
+def test_signed_range_cells_keep_their_text():
+    assert parse_range_cell('+1') == '+1'
+    assert parse_range_cell('-2') == '-2'
+    assert parse_range_cell('3') == 3
+    assert parse_range_cell('N/A') == 'N/A'
+    assert parse_range_cell('') is None
@@ -0,0 +1,115 @@
+import random
+import time
+
+import pytest
+
+from tools.weapon_query import QueryError, WeaponIndex, main, numeric
+
+from conftest import CATALOG_PATH
+
+
+def _in_range(value, bounds) -> bool:
+    low, high = bounds if isinstance(bounds, list) else (bounds, bounds)
+    return value is not None and (low is None or value >= low) and (high is None or value <= high)
+
+
+def _matches(weapon: dict, category: str, query: dict) -> bool:
+    """Linear-scan reference for ``WeaponIndex.mask``."""
+    all_notes = [note['name'] for note in weapon.get('notes') or []]
+    for key, value in (('hardpoint', weapon.get('hardpoint')), ('category', category), ('tech', weapon.get('techRequirement'))):
+        if key in query and value not in query[key]:
+            return False
+    if any(name not in all_notes for name in query.get('notes', [])):
+        return False
+    if any(name in all_notes for name in query.get('exclude_notes', [])):
+        return False
+    for name, spec in query.get('note_values', {}).items():
+        values = [numeric(note.get('value')) for note in weapon.get('notes') or [] if note['name'] == name]
+        if not any(_in_range(value, spec) for value in values):
+            return False
+    if 'cost' in query and not _in_range(numeric(weapon.get('cost')), query['cost']):
+        return False
+    for field in ('accuracy', 'damage'):
+        for band, bounds in query.get(field, {}).items():
+            if not _in_range(numeric(weapon['ranges'][int(band) - 1].get(field)), bounds):
+                return False
+    return True
+
+
+def _scan(catalog: dict, query: dict) -> list[str]:
+    return [weapon['id'] for category in catalog['categories'] for weapon in category['weapons']
+            if _matches(weapon, category['name'], query)]
+
+
+QUERIES = [
+    {},
+    {"hardpoint": ['PHP']},
+    {"hardpoint": ['UHP', 'SHP'], "notes": ['Antimissile']},
+    {"category": ['LASER'], "exclude_notes": ['Beam']},
+    {"notes": ['Beam'], "damage": {"3": [5, None]}, "cost": [None, 40]},
+    {"cost": [10, 10]},
+    {"cost": [None, None]},
+    {"accuracy": {"1": [-2, 0]}},
+    {"accuracy": {"1": [3, None], "5": [None, 8]}},
+    {"note_values": {"Energy": [3, 6]}},
+    {"note_values": {"Swarm": [10, None]}},
+    {"note_values": {"Charge": [1, 1]}},
+    {"hardpoint": ['MHP'], "note_values": {"Charge": [2, None]}, "damage": {"1": [1, None]}},
+    {"notes": ['Nonexistent']},
+]
+
+
+@pytest.fixture
+def index(catalog) -> WeaponIndex:
+    return WeaponIndex(catalog)
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_query_matches_linear_scan(index, catalog, query):
+    assert [weapon['id'] for weapon in index.query(query)] == _scan(catalog, query)
+
+
+def test_random_range_queries_match_linear_scan(index, catalog):
+    rng = random.Random(5)
+    for _ in range(200):
+        low = rng.choice((None, rng.randint(-3, 10)))
+        high = rng.choice((None, rng.randint(-3, 60)))
+        band = str(rng.randint(1, 5))
+        query = {rng.choice(('accuracy', 'damage')): {band: [low, high]}, "cost": [rng.choice((None, 5)), None]}
+        assert [weapon['id'] for weapon in index.query(query)] == _scan(catalog, query)
+
+
+def test_scalar_note_value_is_exact_match(index, catalog):
+    assert index.query({"note_values": {"Energy": 5}}) == index.query({"note_values": {"Energy": [5, 5]}})
+    assert index.query({"note_values": {"Energy": 5}})
+
+
+def test_query_many_matches_single_queries(index):
+    batch = QUERIES + QUERIES[:3]
+    assert index.query_many(batch) == [index.query(query) for query in batch]
+
+
+def test_bad_bounds_raise_query_error(index):
+    for query in ({"cost": ['a', 3]}, {"cost": [1, 2, 3]}, {"damage": {"9": [1, 2]}},
+                  {"damage": {"x": [1, 2]}}, {"accuracy": [1, 2]}, {"note_values": {"Energy": [True, None]}}):
+        with pytest.raises(QueryError):
+            index.mask(query)
+
+
+def test_compound_queries_are_sub_millisecond(index):
+    query = QUERIES[12]
+    runs = 2000
+    start = time.perf_counter()
+    for _ in range(runs):
+        index.mask(query)
+    assert (time.perf_counter() - start) / runs < 1e-3
+
+
+def test_cli_note_values_and_bad_bounds(capsys):
+    assert main([CATALOG_PATH, '--note-value', 'Energy(5)']) == 0
+    assert capsys.readouterr().out.splitlines()[0].startswith('light-multiplex-aperture\t')
+    assert main([CATALOG_PATH, '--note-value', 'Swarm=10:', '--hardpoint', 'SHP']) == 0
+    assert 'autocannon' in capsys.readouterr().out.split()
+    with pytest.raises(SystemExit):
+        main([CATALOG_PATH, '--cost', 'x:3'])
+    assert 'Range bounds must be numbers' in capsys.readouterr().err
@@ -0,0 +1,60 @@
+from tools.weapon_traits import TraitRegistry, TraitTable, _iter_sheet_notes
+
+from conftest import SHEET_PATH
+
+
+def test_real_sheet_has_no_unknown_fragments():
+    registry = TraitRegistry()
+    unknown = {weapon_id: registry.from_notes(notes)[1] for weapon_id, notes in _iter_sheet_notes(SHEET_PATH)}
+    assert {weapon_id: fragments for weapon_id, fragments in unknown.items() if fragments} == {}
+    assert not registry.unknown
+
+
+def test_catalog_has_no_unknown_fragments(catalog):
+    assert TraitTable(catalog).unknown == {}
+
+
+def test_tentative_and_prose_fragments():
+    registry = TraitRegistry()
+    traits, unknown = registry.parse('Hybrid, Durable(2), Reinforced?')
+    assert unknown == [] and 'Reinforced?' in traits and traits.value('Durable') == 2
+    assert registry.trait('Reinforced?').base is registry.trait('Reinforced')
+
+    traits, unknown = registry.parse('Charge(1), See Description, Pushes targets, could use')
+    assert unknown == [] and traits.value('See Description') == 'Pushes targets, could use'
+
+    assert registry.parse('Strafe, Stafe')[1] == ['Stafe']
+
+
+def test_prose_is_only_folded_after_see_description():
+    registry = TraitRegistry()
+
+    assert registry.parse('Charge(1), Charge to Stafe, Durable to Blast')[1] == ['Charge to Stafe', 'Durable to Blast']
+    assert registry.parse('Strafe, some loose rules text, See Description')[1] == ['some loose rules text']
+
+    traits, unknown = registry.parse('See Description, Pushes targets, Charge to Stafe, Frail(2), more text')
+    assert traits.value('See Description') == 'Pushes targets'
+    assert unknown == ['Charge to Stafe', 'Frail(2)', 'more text']
+
+    traits, unknown = registry.parse('See Description Drifts, slowly, Blast, not folded')
+    assert traits.value('See Description') == 'Drifts, slowly' and 'Blast' in traits
+    assert unknown == ['not folded']
+
+
+def test_select():
+    catalog = {"categories": [{"name": 'Test', "weapons": [
+        {"id": 'beam', "notes": [{"name": 'Beam'}]},
+        {"id": 'swarm', "notes": [{"name": 'Swarm', "value": 3}, {"name": 'Antimissile'}]},
+        {"id": 'plain', "notes": []}]}]}
+    table = TraitTable(catalog)
+
+    def ids(**filters):
+        return [table.weapons[row]['id'] for row in table.select(**filters)]
+
+    assert ids() == ['beam', 'swarm', 'plain']
+    assert ids(all_of=['Swarm']) == ['swarm']
+    assert ids(all_of=['Nonsense']) == []
+    assert ids(any_of=['Beam', 'Antimissile']) == ['beam', 'swarm']
+    assert ids(any_of=['Beam', 'Nonsense']) == ['beam']
+    assert ids(any_of=['Nonsense', 'Beem']) == []
+    assert ids(none_of=['Beam', 'Nonsense']) == ['swarm', 'plain']
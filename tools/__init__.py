@@ -0,0 +1 @@
+"""Offline data tooling for FV-Tactical catalogs (weapons, tech tree, empire files)."""
@@ -0,0 +1,304 @@
+"""Multi-process catalog sweep and balance report (requires NumPy).
+
+Every weapon is resolved with ``tools.combat_sim`` against a grid of target
+profiles over all five range bands, then ranked by damage per cost. The
+catalog is split into shards that run on a process pool; each finished shard
+is appended to ``<out>/results.jsonl`` followed by a ``done`` marker, so an
+interrupted sweep resumes by skipping shards whose marker is present. Sweep
+parameters are pinned in ``<out>/sweep.json`` and a resume with different
+parameters (or a changed catalog) is refused unless ``--fresh`` is given.
+
+The report (``<out>/report.json`` plus a text summary) lists:
+
+* the damage-per-cost ranking, where damage is the expected damage per volley
+  averaged over every resolvable band and target of the grid;
+* cost-efficiency outliers per ``(category, hardpoint)`` group, using a robust
+  z-score (median / MAD) so a single broken row cannot hide itself;
+* tiered families (``Spinal Coilgun 01``-``05`` ...) whose damage or
+  efficiency does not grow with the tier.
+
+    python -m tools.balance_sweep data/weapons.json --out sweep-out --workers 32 --volleys 200000 --seed 1
+"""
+import argparse
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from tools.combat_sim import all_weapons, parse_target, simulate
+from tools.fileutil import file_digest, open_atomic
+from tools.weapon_query import load_catalog, numeric
+
+RESULTS_FILE = 'results.jsonl'
+CONFIG_FILE = 'sweep.json'
+REPORT_FILE = 'report.json'
+
+# The default shard size aims for this many shards per worker, so the pool
+# stays busy until the end. It is pinned in sweep.json (each shard seeds its
+# own generator); a resume without --shard-size reuses the pinned size, so the
+# worker count may change between runs.
+SHARDS_PER_WORKER = 4
+DEFAULT_EVASIONS = (0, 2, 4)
+DEFAULT_ARMOURS = (0, 2, 4, 6)
+
+_TIER_RE = re.compile(r'^(.*\S)\s+(\d{2})$')
+
+
+class SweepConfigError(ValueError):
+    """Raised when ``out_dir`` holds a sweep run with different parameters."""
+
+
+def target_grid(evasions=DEFAULT_EVASIONS, armours=DEFAULT_ARMOURS) -> list[dict]:
+    return [{"name": f"e{evasion}a{armour}", "evasion": evasion, "armor": armour}
+            for evasion in evasions for armour in armours]
+
+
+def default_shard_size(weapon_count: int, workers: int) -> int:
+    """Weapons per shard giving about ``SHARDS_PER_WORKER`` shards per worker."""
+    return max(1, math.ceil(weapon_count / (workers * SHARDS_PER_WORKER)))
+
+
+def _sweep_shard(shard: int, weapons: list[dict], categories: list[str], targets: list[dict],
+                 volleys: int, seed: int | None, exact: bool) -> tuple[int, list[dict]]:
+    result = simulate(weapons, targets, volleys, None if seed is None else seed + shard, exact=exact)
+    records = []
+    for row, weapon in enumerate(weapons):
+        bands = result.mean[row]
+        resolved = bands[~np.isnan(bands)]
+        records.append({
+            "shard": shard,
+            "id": weapon['id'],
+            "name": weapon.get('name'),
+            "category": categories[row],
+            "hardpoint": weapon.get('hardpoint'),
+            "cost": numeric(weapon.get('cost')),
+            "damage": float(resolved.mean()) if resolved.size else None,
+            "bands": [[None if math.isnan(value) else round(float(value), 6) for value in band] for band in bands],
+        })
+    return shard, records
+
+
+def _load_progress(path: str) -> tuple[set[int], list[dict]]:
+    """Completed shard ids and their records from a (possibly torn) results file."""
+    done: set[int] = set()
+    pending: dict[int, list[dict]] = {}
+    records: list[dict] = []
+    if not os.path.exists(path):
+        return done, records
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn tail of an interrupted write
+            shard = record.get('shard')
+            if record.get('done'):
+                shard_records = pending.pop(shard, [])
+                if len(shard_records) == record.get('count'):
+                    done.add(shard)
+                    records.extend(shard_records)
+            else:
+                pending.setdefault(shard, []).append(record)
+    return done, records
+
+
+def _shard_lines(shard: int, records: list[dict]) -> str:
+    lines = [json.dumps(record) for record in records]
+    lines.append(json.dumps({"shard": shard, "done": True, "count": len(records)}))
+    return '\n'.join(lines) + '\n'
+
+
+def _write_results(path: str, records: list[dict]) -> None:
+    by_shard: dict[int, list[dict]] = {}
+    for record in records:
+        by_shard.setdefault(record['shard'], []).append(record)
+    with open_atomic(path) as handle:
+        for shard, shard_records in sorted(by_shard.items()):
+            handle.write(_shard_lines(shard, shard_records))
+
+
+def run_sweep(catalog_path: str, out_dir: str, targets: list[dict] | None = None, volleys: int = 100_000,
+              seed: int | None = None, exact: bool = False, workers: int | None = None,
+              shard_size: int | None = None, fresh: bool = False) -> list[dict]:
+    """Sweep the catalog (resuming a previous run in ``out_dir``) and return all records."""
+    targets = targets or target_grid()
+    catalog = load_catalog(catalog_path)
+    weapons = all_weapons(catalog)
+    categories = [category['name'] for category in catalog.get('categories', []) for _ in category.get('weapons', [])]
+    workers = workers or os.cpu_count() or 1
+    config_path = os.path.join(out_dir, CONFIG_FILE)
+    results_path = os.path.join(out_dir, RESULTS_FILE)
+    if fresh and os.path.exists(results_path):
+        os.remove(results_path)
+    previous = None
+    if os.path.exists(config_path) and os.path.exists(results_path):
+        with open(config_path, encoding='utf-8') as handle:
+            previous = json.load(handle)
+    if not shard_size:
+        shard_size = (previous or {}).get('shard_size') or default_shard_size(len(weapons), workers)
+
+    os.makedirs(out_dir, exist_ok=True)
+    config = {
+        "catalog": file_digest(catalog_path),
+        "targets": targets,
+        "volleys": volleys,
+        "seed": seed,
+        "exact": exact,
+        "shard_size": shard_size,
+    }
+    if previous is not None and previous != config:
+        raise SweepConfigError(f'{out_dir} holds a sweep with different parameters; use --fresh to restart')
+    with open(config_path, 'w', encoding='utf-8') as handle:
+        json.dump(config, handle, indent=2)
+
+    done, records = _load_progress(results_path)
+    if os.path.exists(results_path):
+        # Drop torn lines and half-written shards before appending again.
+        _write_results(results_path, records)
+    shards = [(index, start) for index, start in enumerate(range(0, len(weapons), shard_size)) if index not in done]
+    if not shards:
+        return records
+
+    with open(results_path, 'a', encoding='utf-8') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_sweep_shard, index, weapons[start:start + shard_size], categories[start:start + shard_size],
+                        targets, volleys, seed, exact)
+            for index, start in shards
+        ]
+        for future in as_completed(futures):
+            shard, shard_records = future.result()
+            out.write(_shard_lines(shard, shard_records))
+            out.flush()
+            records.extend(shard_records)
+            print(f'shard {shard} done ({len(shard_records)} weapons)', file=sys.stderr)
+    return records
+
+
+def _robust_outliers(entries: list[dict], threshold: float) -> list[dict]:
+    values = [entry['efficiency'] for entry in entries]
+    if len(values) < 3:
+        return []
+    median = statistics.median(values)
+    mad = statistics.median(abs(value - median) for value in values)
+    if mad == 0:
+        return []
+    outliers = []
+    for entry in entries:
+        score = 0.6745 * (entry['efficiency'] - median) / mad
+        if abs(score) >= threshold:
+            outliers.append({**entry, "z": round(score, 2), "groupMedian": round(median, 4)})
+    return sorted(outliers, key=lambda entry: -abs(entry['z']))
+
+
+def _family_issues(entries: list[dict]) -> list[dict]:
+    families: dict[str, list[tuple[int, dict]]] = {}
+    for entry in entries:
+        match = _TIER_RE.match(entry['name'] or '')
+        if match:
+            families.setdefault(match.group(1), []).append((int(match.group(2)), entry))
+    issues = []
+    for family, tiers in sorted(families.items()):
+        tiers.sort(key=lambda item: item[0])
+        for (tier_a, a), (tier_b, b) in zip(tiers, tiers[1:]):
+            problems = []
+            if b['damage'] < a['damage']:
+                problems.append('damage drops')
+            if a.get('efficiency') is not None and b.get('efficiency') is not None and b['efficiency'] < 0.9 * a['efficiency']:
+                problems.append('efficiency drops >10%')
+            if problems:
+                issues.append({
+                    "family": family,
+                    "from": tier_a,
+                    "to": tier_b,
+                    "problems": problems,
+                    "damage": [round(a['damage'], 3), round(b['damage'], 3)],
+                    "cost": [a['cost'], b['cost']],
+                })
+    return issues
+
+
+def build_report(records: list[dict], threshold: float = 3.5) -> dict:
+    """Rank weapons by damage per cost and flag outliers and broken progressions."""
+    entries = []
+    unpriced = []
+    for record in records:
+        if record['damage'] is None:
+            continue
+        entry = {key: record[key] for key in ('id', 'name', 'category', 'hardpoint', 'cost', 'damage')}
+        if not record['cost']:
+            unpriced.append(entry['id'])
+            entry['efficiency'] = None
+        else:
+            entry['efficiency'] = record['damage'] / record['cost']
+        entries.append(entry)
+
+    priced = [entry for entry in entries if entry['efficiency'] is not None]
+    ranking = sorted(priced, key=lambda entry: -entry['efficiency'])
+    groups: dict[tuple, list[dict]] = {}
+    for entry in priced:
+        groups.setdefault((entry['category'], entry['hardpoint']), []).append(entry)
+    outliers = []
+    for (category, hardpoint), members in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        flagged = _robust_outliers(members, threshold)
+        if flagged:
+            outliers.append({"category": category, "hardpoint": hardpoint, "weapons": flagged})
+    return {
+        "ranking": [{**entry, "efficiency": round(entry['efficiency'], 4)} for entry in ranking],
+        "outliers": outliers,
+        "progressions": _family_issues(entries),
+        "unpriced": sorted(unpriced),
+    }
+
+
+def format_report(report: dict, top: int = 15) -> str:
+    lines = ['Top damage per cost:']
+    for entry in report['ranking'][:top]:
+        lines.append(f"  {entry['efficiency']:8.3f}  {entry['id']:<36} {entry['hardpoint'] or '-':<4} cost {entry['cost']}")
+    lines.append('Cost-efficiency outliers:')
+    for group in report['outliers']:
+        lines.append(f"  {group['category']} / {group['hardpoint'] or '-'}:")
+        for entry in group['weapons']:
+            lines.append(f"    z={entry['z']:+6.2f}  {entry['id']:<36} {entry['efficiency']:.3f} vs median {entry['groupMedian']}")
+    lines.append('Tier progression issues:')
+    for issue in report['progressions']:
+        lines.append(f"  {issue['family']} {issue['from']:02d}->{issue['to']:02d}: {', '.join(issue['problems'])} "
+                     f"(damage {issue['damage'][0]}->{issue['damage'][1]}, cost {issue['cost'][0]}->{issue['cost'][1]})")
+    if report['unpriced']:
+        lines.append(f"Unpriced weapons skipped: {len(report['unpriced'])}")
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Sweep the weapon catalog over a target grid and report balance outliers.')
+    parser.add_argument('catalog', help='weapons.json or .fvwc catalog')
+    parser.add_argument('--out', required=True, help='directory for partial results, config and report')
+    parser.add_argument('--target', action='append', type=parse_target, help='NAME:EVASION:ARMOR (default: evasion x armour grid)')
+    parser.add_argument('--volleys', type=int, default=100_000)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--exact', action='store_true', help='exact distributions instead of sampling')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--shard-size', type=int, help=f'weapons per shard (default: about {SHARDS_PER_WORKER} shards per worker, '
+                        'or the size pinned by the sweep being resumed)')
+    parser.add_argument('--threshold', type=float, default=3.5, help='robust z-score that counts as an outlier')
+    parser.add_argument('--fresh', action='store_true', help='discard previous partial results')
+    args = parser.parse_args(argv)
+
+    try:
+        records = run_sweep(args.catalog, args.out, args.target, args.volleys, args.seed, args.exact,
+                            args.workers, args.shard_size, args.fresh)
+    except SweepConfigError as exc:
+        parser.error(str(exc))
+    report = build_report(records, args.threshold)
+    with open_atomic(os.path.join(args.out, REPORT_FILE)) as handle:
+        json.dump(report, handle, indent=2)
+    print(format_report(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
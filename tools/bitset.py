@@ -0,0 +1,10 @@
+"""Helpers for Python ints used as bitsets (weapon rows, tech-tree positions)."""
+from typing import Iterator
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the set bit positions of ``mask`` in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
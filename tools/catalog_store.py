@@ -0,0 +1,433 @@
+"""Content-addressed version store for catalog snapshots, with a change feed.
+
+Balance passes overwrite ``data/weapons.json`` and ``data/tech-tree.json`` in
+place. This store keeps every committed pair of them as a version, so any two
+versions can be compared and downstream caches can drop only what changed.
+
+Objects are compact JSON blobs named by their blake2b digest
+(``objects/ab/cdef...``) and written once, so unchanged entries are shared by
+every version. A version holds:
+
+* a weapon tree keyed by weapon id, whose entries are ``{category, weapon}``;
+* a tech tree keyed by tech id, whose entries are tech dicts;
+* a layout object (category order, weapon order and tech order plus any other
+  top-level fields) that is only read to rebuild the files.
+
+Each tree is a hash trie: a key goes down the nibbles of ``blake2b(key)``, a
+node holding at most ``LEAF_SIZE`` keys is a leaf (``key -> entry digest``) and
+a bigger node branches 16 ways. The same key set always gives the same tree,
+so two versions share every subtree they have in common. ``diff_trees`` skips
+equal digests, which makes a diff proportional to the number of changed
+entries (times the trie depth), not the catalog size.
+
+``diff`` turns changed entries into change records: JSON-pointer field
+changes (``/ranges/2/damage``, ``/cost``, ``/prerequisites``...) for weapons
+and techs (a weapon moved to another category also gets a ``/category``
+change), and one ``layout`` record when the order changed, because
+positional caches such as the tech bit index are stale then. ``feed`` writes
+the records of every version after a given one as JSON lines, so a consumer
+stores the last version it processed and invalidates only the listed ids.
+
+Refs are ``HEAD``, ``HEAD~N``, tag names and unique digest prefixes.
+
+    python -m tools.catalog_store --commit -m "balance pass 12"
+    python -m tools.catalog_store --log
+    python -m tools.catalog_store --diff HEAD~1 HEAD
+    python -m tools.catalog_store --feed pass-11 -o changes.jsonl
+    python -m tools.catalog_store --checkout pass-11 --weapons-out /tmp/weapons.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Iterable, Iterator
+
+from tools.fileutil import write_atomic
+
+STORE_VERSION = 1
+DEFAULT_STORE = '.catalog-store'
+LEAF_SIZE = 16
+
+WEAPON, TECH, LAYOUT = 'weapon', 'tech', 'layout'
+ADDED, REMOVED, CHANGED = 'added', 'removed', 'changed'
+
+
+class RefError(KeyError):
+    """Raised when a ref names no version of the store."""
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _encode(obj) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _key_path(key: str) -> str:
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _pointer(path: tuple) -> str:
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1') for part in path)
+
+
+def structural_diff(old, new, path: tuple = ()) -> Iterator[dict]:
+    """``{path, old, new}`` for every differing leaf; lists of unequal length are replaced whole."""
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in list(old) + [key for key in new if key not in old]:
+            if key not in new:
+                yield {"path": _pointer(path + (key,)), "old": old[key]}
+            elif key not in old:
+                yield {"path": _pointer(path + (key,)), "new": new[key]}
+            else:
+                yield from structural_diff(old[key], new[key], path + (key,))
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (left, right) in enumerate(zip(old, new)):
+            yield from structural_diff(left, right, path + (index,))
+    else:
+        yield {"path": _pointer(path), "old": old, "new": new}
+
+
+class CatalogStore:
+    """A store directory: ``objects/``, ``HEAD`` and ``tags.json``."""
+
+    def __init__(self, root: str = DEFAULT_STORE):
+        self.root = root
+        self._cache: dict[str, object] = {}
+
+    # Objects ---------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], digest[2:])
+
+    def put(self, obj) -> str:
+        """Store ``obj`` and return its digest (a no-op when it already exists)."""
+        data = _encode(obj)
+        digest = digest_bytes(data)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, data)
+        self._cache[digest] = obj
+        return digest
+
+    def get(self, digest: str):
+        try:
+            return self._cache[digest]
+        except KeyError:
+            pass
+        try:
+            with open(self._object_path(digest), 'rb') as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            raise KeyError(f'Unknown object {digest}') from None
+        obj = self._cache[digest] = json.loads(data)
+        return obj
+
+    # Hash tries --------------------------------------------------------------
+
+    def build_tree(self, entries: dict[str, object]) -> str:
+        """Store every entry and the trie over their ids; returns the root digest."""
+        items = sorted((_key_path(key), key, self.put(entry)) for key, entry in entries.items())
+        return self._build_node(items, 0)
+
+    def _build_node(self, items: list[tuple[str, str, str]], depth: int) -> str:
+        if len(items) <= LEAF_SIZE or depth == len(items[0][0]):
+            return self.put({"leaf": {key: digest for _, key, digest in sorted(items, key=lambda item: item[1])}})
+        children: dict[str, list] = {}
+        for item in items:
+            children.setdefault(item[0][depth], []).append(item)
+        return self.put({"branch": {nibble: self._build_node(group, depth + 1)
+                                    for nibble, group in sorted(children.items())}})
+
+    def iter_tree(self, root: str | None) -> Iterator[tuple[str, str]]:
+        """``(key, entry digest)`` of every entry under ``root``."""
+        if root is None:
+            return
+        node = self.get(root)
+        if 'leaf' in node:
+            yield from node['leaf'].items()
+        else:
+            for child in node['branch'].values():
+                yield from self.iter_tree(child)
+
+    def diff_trees(self, old: str | None, new: str | None) -> Iterator[tuple[str, str | None, str | None]]:
+        """``(key, old digest, new digest)`` of entries that differ; equal subtrees are skipped."""
+        if old == new:
+            return
+        old_node = self.get(old) if old is not None else None
+        new_node = self.get(new) if new is not None else None
+        if old_node is not None and new_node is not None and 'branch' in old_node and 'branch' in new_node:
+            old_children, new_children = old_node['branch'], new_node['branch']
+            for nibble in sorted(old_children.keys() | new_children.keys()):
+                yield from self.diff_trees(old_children.get(nibble), new_children.get(nibble))
+            return
+        # One side is a leaf (at most LEAF_SIZE keys) or missing: compare flat.
+        old_entries, new_entries = dict(self.iter_tree(old)), dict(self.iter_tree(new))
+        for key in sorted(old_entries.keys() | new_entries.keys()):
+            before, after = old_entries.get(key), new_entries.get(key)
+            if before != after:
+                yield key, before, after
+
+    def lookup(self, root: str | None, key: str) -> str | None:
+        """Entry digest of ``key`` under ``root``, following one trie path."""
+        path, depth = _key_path(key), 0
+        while root is not None:
+            node = self.get(root)
+            if 'leaf' in node:
+                return node['leaf'].get(key)
+            root = node['branch'].get(path[depth])
+            depth += 1
+        return None
+
+    # Versions ----------------------------------------------------------------
+
+    def snapshot(self, catalog: dict, techs: dict) -> dict:
+        """Store ``catalog`` and ``techs``; returns the version's ``weapons``/``techs``/``layout`` digests."""
+        weapons, categories = {}, []
+        for category in catalog.get('categories', []):
+            ids = []
+            for weapon in category.get('weapons', []):
+                weapon_id = weapon['id']
+                if weapon_id in weapons:
+                    raise ValueError(f'Duplicate weapon id {weapon_id!r}')
+                weapons[weapon_id] = {"category": category.get('name'), "weapon": weapon}
+                ids.append(weapon_id)
+            categories.append({key: ids if key == 'weapons' else value for key, value in category.items()})
+        # Same key order as the files, with weapons and techs replaced by their ids.
+        layout = {"catalog": {key: categories if key == 'categories' else value for key, value in catalog.items()},
+                  "techs": list(techs)}
+        return {"weapons": self.build_tree(weapons), "techs": self.build_tree(techs), "layout": self.put(layout)}
+
+    def commit(self, catalog: dict, techs: dict, message: str = '') -> tuple[str, bool]:
+        """``(version digest, created)``; nothing is created when HEAD already has this content."""
+        parent = self.head()
+        trees = self.snapshot(catalog, techs)
+        if parent is not None:
+            previous = self.get(parent)
+            if all(previous[key] == value for key, value in trees.items()):
+                return parent, False
+        version = {"store": STORE_VERSION, **trees, "parent": parent, "message": message,
+                   "created": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+        digest = self.put(version)
+        write_atomic(os.path.join(self.root, 'HEAD'), (digest + '\n').encode('ascii'))
+        return digest, True
+
+    def checkout(self, ref: str) -> tuple[dict, dict]:
+        """``(catalog, techs)`` exactly as committed."""
+        version = self.get(self.resolve(ref))
+        layout = self.get(version['layout'])
+        weapon_root, tech_root = version['weapons'], version['techs']
+        catalog = dict(layout['catalog'])
+        if 'categories' in catalog:
+            catalog['categories'] = [
+                {**category, "weapons": [self.get(self.lookup(weapon_root, weapon_id))['weapon']
+                                         for weapon_id in category['weapons']]}
+                if 'weapons' in category else category
+                for category in catalog['categories']]
+        techs = {tech_id: self.get(self.lookup(tech_root, tech_id)) for tech_id in layout['techs']}
+        return catalog, techs
+
+    # Refs --------------------------------------------------------------------
+
+    def head(self) -> str | None:
+        try:
+            with open(os.path.join(self.root, 'HEAD'), encoding='ascii') as handle:
+                return handle.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def tags(self) -> dict[str, str]:
+        try:
+            with open(os.path.join(self.root, 'tags.json'), encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+
+    def tag(self, name: str, ref: str = 'HEAD') -> str:
+        tags = self.tags()
+        tags[name] = self.resolve(ref)
+        write_atomic(os.path.join(self.root, 'tags.json'), json.dumps(tags, indent=2).encode('utf-8'))
+        return tags[name]
+
+    def resolve(self, ref: str) -> str:
+        """Version digest of ``HEAD``, ``HEAD~N``, a tag or a unique digest prefix."""
+        base, tilde, back = ref.partition('~')
+        if tilde and not (back or '1').isdigit():
+            raise RefError(f'Bad ancestor count in {ref!r}')
+        steps = int(back or 1) if tilde else 0
+        tags = self.tags()
+        if base == 'HEAD':
+            digest = self.head()
+            if digest is None:
+                raise RefError('The store has no versions yet')
+        elif base in tags:
+            digest = tags[base]
+        else:
+            folder = os.path.join(self.root, 'objects', base[:2])
+            matches = [base[:2] + name for name in (os.listdir(folder) if len(base) >= 4 and os.path.isdir(folder) else [])
+                       if name.startswith(base[2:]) and not name.endswith('.tmp')]
+            matches = [match for match in matches if 'parent' in self.get(match)]
+            if len(matches) != 1:
+                raise RefError(f'Unknown or ambiguous version {ref!r}')
+            digest = matches[0]
+        for _ in range(steps):
+            digest = self.get(digest)['parent']
+            if digest is None:
+                raise RefError(f'{ref!r} goes past the first version')
+        return digest
+
+    def log(self, ref: str = 'HEAD') -> Iterator[tuple[str, dict]]:
+        """``(digest, version)`` from ``ref`` back to the first version."""
+        digest = self.resolve(ref) if self.head() is not None else None
+        while digest is not None:
+            version = self.get(digest)
+            yield digest, version
+            digest = version['parent']
+
+    # Diffs -------------------------------------------------------------------
+
+    def diff(self, old_ref: str, new_ref: str) -> Iterator[dict]:
+        """Change records between two versions (see the module docstring)."""
+        old_digest, new_digest = self.resolve(old_ref), self.resolve(new_ref)
+        old, new = self.get(old_digest), self.get(new_digest)
+        header = {"from": old_digest, "to": new_digest}
+        for key, before, after in self.diff_trees(old['weapons'], new['weapons']):
+            before = self.get(before) if before else None
+            after = self.get(after) if after else None
+            change = {**header, **_entry_change(WEAPON, key, before and before['weapon'], after and after['weapon']),
+                      "category": (after or before)['category']}
+            if before and after and before['category'] != after['category']:
+                change['previousCategory'] = before['category']
+                change['fields'] = sorted(change['fields'] + ['category'])
+                change['changes'].append({"path": "/category", "old": before['category'], "new": after['category']})
+            yield change
+        for key, before, after in self.diff_trees(old['techs'], new['techs']):
+            yield {**header, **_entry_change(TECH, key, before and self.get(before), after and self.get(after))}
+        if old['layout'] != new['layout']:
+            yield {**header, "kind": LAYOUT, "op": CHANGED}
+
+    def feed(self, since: str | None, until: str = 'HEAD') -> Iterator[dict]:
+        """Change records of every version after ``since`` up to ``until``, oldest first."""
+        stop = self.resolve(since) if since else None
+        chain = []
+        for digest, version in self.log(until):
+            if digest == stop:
+                break
+            chain.append((digest, version))
+        else:
+            if stop is not None:
+                raise RefError(f'{since!r} is not an ancestor of {until!r}')
+        for digest, version in reversed(chain):
+            if version['parent'] is None:
+                for change in self._initial(digest, version):
+                    yield change
+            else:
+                for change in self.diff(version['parent'], digest):
+                    yield {**change, "message": version['message']}
+
+    def _initial(self, digest: str, version: dict) -> Iterator[dict]:
+        header = {"from": None, "to": digest, "message": version['message']}
+        for key, entry in self.iter_tree(version['weapons']):
+            yield {**header, "kind": WEAPON, "id": key, "op": ADDED, "category": self.get(entry)['category']}
+        for key, _ in self.iter_tree(version['techs']):
+            yield {**header, "kind": TECH, "id": key, "op": ADDED}
+        yield {**header, "kind": LAYOUT, "op": CHANGED}
+
+
+def _entry_change(kind: str, key: str, before: dict | None, after: dict | None) -> dict:
+    if before is None:
+        return {"kind": kind, "id": key, "op": ADDED}
+    if after is None:
+        return {"kind": kind, "id": key, "op": REMOVED}
+    changes = list(structural_diff(before, after))
+    fields = sorted({change['path'].split('/')[1] for change in changes if change['path'].count('/')})
+    return {"kind": kind, "id": key, "op": CHANGED, "fields": fields, "changes": changes}
+
+
+def affected_ids(changes: Iterable[dict]) -> dict[str, set[str]]:
+    """Weapon and tech ids touched by ``changes``, for cache invalidation."""
+    affected = {WEAPON: set(), TECH: set()}
+    for change in changes:
+        if change['kind'] in affected:
+            affected[change['kind']].add(change['id'])
+    return affected
+
+
+def _read_json(path: str):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def _write_json(path: str, obj) -> None:
+    write_atomic(path, json.dumps(obj, indent=2).encode('utf-8'))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Version catalog snapshots and emit structural change feeds.')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='store directory')
+    parser.add_argument('--weapons', default='data/weapons.json')
+    parser.add_argument('--tech-tree', default='data/tech-tree.json')
+    parser.add_argument('--commit', action='store_true', help='record the current catalog files as a version')
+    parser.add_argument('-m', '--message', default='', help='version message for --commit')
+    parser.add_argument('--tag', metavar='NAME', help='tag HEAD (after --commit, if given)')
+    parser.add_argument('--log', action='store_true', help='list versions, newest first')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), help='change records between two versions')
+    parser.add_argument('--feed', nargs='?', const='', metavar='SINCE',
+                        help='change records of every version after SINCE (all versions when omitted)')
+    parser.add_argument('--checkout', metavar='REF', help='rebuild the catalog files of a version')
+    parser.add_argument('--weapons-out', help='where --checkout writes weapons.json (default: --weapons)')
+    parser.add_argument('--tech-tree-out', help='where --checkout writes the tech tree (default: --tech-tree)')
+    parser.add_argument('-o', '--output', help='write --diff/--feed JSON lines here instead of stdout')
+    args = parser.parse_args(argv)
+
+    store = CatalogStore(args.store)
+    try:
+        return _run(store, args)
+    except RefError as error:
+        parser.error(str(error))
+
+
+def _run(store: CatalogStore, args: argparse.Namespace) -> int:
+    if args.commit:
+        digest, created = store.commit(_read_json(args.weapons), _read_json(args.tech_tree), args.message)
+        print(digest)
+        print('New version' if created else 'No changes since HEAD', file=sys.stderr)
+    if args.tag:
+        store.tag(args.tag)
+    if args.log:
+        tags = {}
+        for name, digest in store.tags().items():
+            tags.setdefault(digest, []).append(name)
+        for digest, version in store.log():
+            labels = f" ({', '.join(tags[digest])})" if digest in tags else ''
+            print(f"{digest[:12]}  {version['created']}  {version['message']}{labels}")
+    if args.checkout:
+        catalog, techs = store.checkout(args.checkout)
+        _write_json(args.weapons_out or args.weapons, catalog)
+        _write_json(args.tech_tree_out or args.tech_tree, techs)
+    if args.diff or args.feed is not None:
+        changes = store.diff(*args.diff) if args.diff else store.feed(args.feed or None)
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        count = 0
+        try:
+            for change in changes:
+                out.write(json.dumps(change, ensure_ascii=False) + '\n')
+                count += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f'{count} change records', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""Vectorized combat resolution for weapon range bands (requires NumPy).
+
+Every ``(weapon, band)`` cell of the catalog is resolved against every target
+profile at once. One volley of a cell works like this:
+
+* **Hit roll** -- each attack hits when a d``HIT_DIE`` roll is at most
+  ``accuracy - target evasion``. ``Swarm`` weapons list accuracy as a modifier
+  (``+0``, ``-2``...), so their attacks hit on ``SWARM_BASE + accuracy``
+  instead. ``N/A`` accuracy (area weapons such as the Vortex Cannons) always
+  hits.
+* **Attacks** -- ``Swarm(n)`` fires ``n`` independent attacks and ``Salvo(n)``
+  multiplies the attack count by ``n``. ``Repeat(n)`` lets every attack that
+  hits attack again, up to ``n`` extra times, stopping at the first miss.
+* **Damage per hit** -- the band damage minus the target's armour, never below
+  zero. ``Blast`` halves the armour (rounding down) and ``Durable(n)`` then
+  ignores ``n`` more points. Dice expressions are rolled per hit: ``8d6`` is
+  eight d6, and ``6-4d6`` (damage falling off across the band) rolls a count of
+  d6 drawn uniformly from 4 to 6.
+
+Cells with constant damage are sampled with NumPy in chunks of volleys. Only
+hit counts are random, so cells are grouped by ``(hit chance, attacks,
+chain)``; each group's hit count is drawn once per volley by inverse CDF from
+its hit-count distribution, and the cells of a group share those draws
+(common random numbers) and scale them by their own damage. Cells with dice
+damage take an exact fast path: the hit-count distribution is convolved with
+the per-hit dice distribution, so their damage distributions carry no sampling
+noise (``exact=True`` extends this to every cell). Pass a ``seed`` for
+reproducible runs (results are deterministic for a given seed, catalog, target
+list and ``chunk`` size).
+
+    python -m tools.combat_sim data/weapons.json --volleys 200000 --seed 7 --target line:0:0 --target armoured:2:4
+"""
+import argparse
+import json
+import re
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from tools.weapon_parser import RANGE_BANDS
+from tools.weapon_query import load_catalog, numeric
+
+HIT_DIE = 10
+SWARM_BASE = 5
+AUTO_HIT = 'N/A'
+
+DEFAULT_TARGETS = (
+    {"name": "unarmoured", "evasion": 0, "armor": 0},
+    {"name": "evasive", "evasion": 3, "armor": 0},
+    {"name": "armoured", "evasion": 0, "armor": 3},
+    {"name": "hardened", "evasion": 2, "armor": 6},
+)
+
+_DICE_RE = re.compile(r'^(\d+)(?:-(\d+))?d(\d+)$', re.IGNORECASE)
+
+
+def parse_dice(expr) -> tuple[int, int, int] | None:
+    """``"8d6"`` -> ``(8, 8, 6)``; ``"6-4d6"`` -> ``(4, 6, 6)``; else None."""
+    if not isinstance(expr, str):
+        return None
+    match = _DICE_RE.match(expr.strip())
+    if not match:
+        return None
+    first = int(match.group(1))
+    second = int(match.group(2)) if match.group(2) else first
+    return min(first, second), max(first, second), int(match.group(3))
+
+
+@lru_cache(maxsize=None)
+def _sum_pmf(count: int, faces: int) -> np.ndarray:
+    """Distribution of the total of ``count`` d``faces`` (index = total)."""
+    if count == 0:
+        return np.ones(1)
+    die = np.concatenate(([0.0], np.full(faces, 1.0 / faces)))
+    pmf = die
+    for _ in range(count - 1):
+        pmf = np.convolve(pmf, die)
+    pmf.setflags(write=False)
+    return pmf
+
+
+def dice_pmf(low: int, high: int, faces: int) -> np.ndarray:
+    """Distribution of a dice expression with a uniformly drawn dice count."""
+    pmf = np.zeros(high * faces + 1)
+    for count in range(low, high + 1):
+        part = _sum_pmf(count, faces)
+        pmf[:len(part)] += part
+    return pmf / (high - low + 1)
+
+
+def _armour_shift(pmf: np.ndarray, armour: int) -> np.ndarray:
+    """Apply ``max(0, damage - armour)`` to a damage distribution."""
+    if armour <= 0:
+        return pmf
+    if armour >= len(pmf):
+        return np.ones(1)
+    shifted = pmf[armour:].copy()
+    shifted[0] += pmf[:armour].sum()
+    return shifted
+
+
+def hit_count_pmf(p: float, attacks: int, chain: int) -> np.ndarray:
+    """Distribution of hits for ``attacks`` chains of up to ``chain`` attacks."""
+    per_attack = np.array([p ** k * (1 - p) for k in range(chain)] + [p ** chain])
+    pmf = np.ones(1)
+    for _ in range(attacks):
+        pmf = np.convolve(pmf, per_attack)
+    return pmf
+
+
+def _compound(hits: np.ndarray, per_hit: np.ndarray) -> np.ndarray:
+    """Distribution of the sum of ``H ~ hits`` i.i.d. ``per_hit`` draws."""
+    total = np.zeros((len(hits) - 1) * (len(per_hit) - 1) + 1)
+    power = np.ones(1)
+    for h, weight in enumerate(hits):
+        if weight:
+            total[:len(power)] += weight * power
+        power = np.convolve(power, per_hit)
+    return total
+
+
+def _scaled(hit_pmf: np.ndarray, damage: int) -> np.ndarray:
+    """Damage distribution when every hit deals exactly ``damage``."""
+    if damage == 0:
+        return np.ones(1)
+    pmf = np.zeros((len(hit_pmf) - 1) * damage + 1)
+    pmf[::damage] = hit_pmf
+    return pmf
+
+
+def _note_map(weapon: dict) -> dict:
+    notes = {}
+    for note in weapon.get('notes') or []:
+        notes.setdefault(note['name'], note.get('value'))
+    return notes
+
+
+def _count(notes: dict, name: str, default: int) -> int:
+    value = numeric(notes.get(name))
+    return int(value) if value is not None and value >= 0 else default
+
+
+def compile_cells(weapons: list[dict]) -> list[dict]:
+    """Resolve each usable ``(weapon, band)`` cell into its combat parameters.
+
+    Bands without damage, with ``N/A`` damage, or with no accuracy are skipped.
+    """
+    cells = []
+    for row, weapon in enumerate(weapons):
+        notes = _note_map(weapon)
+        attacks = max(1, _count(notes, 'Swarm', 1)) * max(1, _count(notes, 'Salvo', 1))
+        chain = 1 + _count(notes, 'Repeat', 0)
+        durable = _count(notes, 'Durable', 0)
+        blast = 'Blast' in notes
+        base = SWARM_BASE if 'Swarm' in notes else 0
+        for band, cell in enumerate((weapon.get('ranges') or [])[:RANGE_BANDS]):
+            raw_accuracy, raw_damage = cell.get('accuracy'), cell.get('damage')
+            accuracy = AUTO_HIT if raw_accuracy == AUTO_HIT else numeric(raw_accuracy)
+            if accuracy is None:
+                continue
+            dice = parse_dice(raw_damage)
+            damage = numeric(raw_damage)
+            if dice is None and (damage is None or damage != int(damage)):
+                continue
+            cells.append({
+                "row": row,
+                "band": band,
+                "accuracy": accuracy,
+                "base": base,
+                "damage": dice if dice else int(damage),
+                "dice": dice is not None,
+                "attacks": attacks,
+                "chain": chain,
+                "durable": durable,
+                "blast": blast,
+            })
+    return cells
+
+
+def hit_probability(accuracy, evasion: int, base: int = 0) -> float:
+    if accuracy == AUTO_HIT:
+        return 1.0
+    return min(1.0, max(0.0, (base + accuracy - evasion) / HIT_DIE))
+
+
+def effective_armour(cell: dict, armour: int) -> int:
+    if cell["blast"]:
+        armour //= 2
+    return max(0, armour - cell["durable"])
+
+
+class SimulationResult:
+    """Per ``(weapon, band, target)`` damage statistics of one run.
+
+    ``mean`` and ``variance`` are ``(weapons, 5, targets)`` arrays (NaN where
+    a band cannot be resolved); ``distribution()`` returns the probability of
+    each total damage per volley; ``exact`` flags cells from the exact path.
+    """
+
+    def __init__(self, weapons: list[dict], targets: list[dict], volleys: int):
+        shape = (len(weapons), RANGE_BANDS, len(targets))
+        self.weapon_ids = [weapon['id'] for weapon in weapons]
+        self.targets = list(targets)
+        self.volleys = volleys
+        self.mean = np.full(shape, np.nan)
+        self.variance = np.full(shape, np.nan)
+        self.exact = np.zeros(shape, dtype=bool)
+        self._distributions: dict[tuple[int, int, int], np.ndarray] = {}
+        self._rows = {weapon_id: row for row, weapon_id in enumerate(self.weapon_ids)}
+
+    def _store(self, row: int, band: int, target: int, pmf: np.ndarray, exact: bool) -> None:
+        support = np.arange(len(pmf))
+        mean = float(support @ pmf)
+        self.mean[row, band, target] = mean
+        self.variance[row, band, target] = max(0.0, float((support ** 2) @ pmf) - mean * mean)
+        self.exact[row, band, target] = exact
+        self._distributions[row, band, target] = pmf
+
+    def distribution(self, weapon_id: str, band: int, target: int = 0) -> np.ndarray | None:
+        """Damage distribution for 0-based ``band`` against target index ``target``."""
+        return self._distributions.get((self._rows[weapon_id], band, target))
+
+    def to_records(self) -> list[dict]:
+        records = []
+        for row, weapon_id in enumerate(self.weapon_ids):
+            bands = []
+            for band in range(RANGE_BANDS):
+                bands.append([
+                    None if np.isnan(self.mean[row, band, t]) else {
+                        "target": target["name"],
+                        "mean": round(float(self.mean[row, band, t]), 6),
+                        "variance": round(float(self.variance[row, band, t]), 6),
+                        "exact": bool(self.exact[row, band, t]),
+                    }
+                    for t, target in enumerate(self.targets)
+                ])
+            records.append({"id": weapon_id, "bands": bands})
+        return records
+
+
+def _sample_hits(rng: np.random.Generator, n: int, cdfs: list[np.ndarray]) -> np.ndarray:
+    """Draw ``(n, groups)`` hit counts by inverse CDF from each group's distribution.
+
+    ``X > k`` exactly when ``u >= P(X <= k)``, so a hit count is the number of
+    CDF steps a uniform draw clears. Steps at 0 (always cleared) and at 1
+    (never cleared, as ``u < 1``) are folded out before comparing.
+    """
+    hits = np.empty((n, len(cdfs)), dtype=np.int64)
+    by_width: dict[int, list[tuple[int, int, np.ndarray]]] = {}
+    for g, cdf in enumerate(cdfs):
+        steps = cdf[:-1]
+        floor = int(np.count_nonzero(steps <= 0.0))
+        steps = steps[floor:]
+        steps = steps[steps < 1.0]
+        by_width.setdefault(len(steps), []).append((g, floor, steps))
+    for width, members in by_width.items():
+        columns = [g for g, _, _ in members]
+        counts = np.tile(np.array([floor for _, floor, _ in members], dtype=np.int64), (n, 1))
+        if width:
+            thresholds = np.stack([steps for _, _, steps in members])
+            draws = rng.random((n, len(members)))
+            for k in range(width):
+                counts += draws >= thresholds[:, k]
+        hits[:, columns] = counts
+    return hits
+
+
+def simulate(weapons: list[dict], targets=DEFAULT_TARGETS, volleys: int = 100_000, seed: int | None = None,
+             chunk: int = 16384, exact: bool = False) -> SimulationResult:
+    """Resolve ``volleys`` volleys of every weapon band against every target.
+
+    With ``exact=True`` constant-damage cells skip sampling as well and every
+    distribution is computed exactly.
+    """
+    targets = list(targets)
+    result = SimulationResult(weapons, targets, volleys)
+    rng = np.random.default_rng(seed)
+
+    groups: dict[tuple[float, int, int], list[tuple[dict, int, int]]] = {}
+    for cell in compile_cells(weapons):
+        for t, target in enumerate(targets):
+            p = hit_probability(cell["accuracy"], target.get("evasion", 0), cell["base"])
+            armour = effective_armour(cell, target.get("armor", 0))
+            hits = None
+            if cell["dice"] or exact:
+                hits = hit_count_pmf(p, cell["attacks"], cell["chain"])
+            if cell["dice"]:
+                per_hit = _armour_shift(dice_pmf(*cell["damage"]), armour)
+                result._store(cell["row"], cell["band"], t, _compound(hits, per_hit), exact=True)
+                continue
+            damage = max(0, cell["damage"] - armour)
+            if exact:
+                result._store(cell["row"], cell["band"], t, _scaled(hits, damage), exact=True)
+            elif damage == 0 or p in (0.0, 1.0):
+                # Deterministic outcome: no hits, no damage, or every attack hits.
+                pmf = np.zeros(cell["attacks"] * cell["chain"] * damage + 1 if p == 1.0 else 1)
+                pmf[-1] = 1.0
+                result._store(cell["row"], cell["band"], t, pmf, exact=True)
+            else:
+                groups.setdefault((p, cell["attacks"], cell["chain"]), []).append((cell, t, damage))
+    if not groups:
+        return result
+
+    keys = list(groups)
+    cdfs = [np.cumsum(hit_count_pmf(*key)) for key in keys]
+    sizes = np.array([len(cdf) for cdf in cdfs])
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    counts = np.zeros(int(sizes.sum()), dtype=np.int64)
+
+    done = 0
+    while done < volleys:
+        n = min(chunk, volleys - done)
+        hits = _sample_hits(rng, n, cdfs)
+        counts += np.bincount((hits + offsets).ravel(), minlength=len(counts))
+        done += n
+
+    for g, key in enumerate(keys):
+        hit_pmf = counts[offsets[g]:offsets[g] + sizes[g]] / volleys
+        for cell, t, damage in groups[key]:
+            result._store(cell["row"], cell["band"], t, _scaled(hit_pmf, damage), exact=False)
+    return result
+
+
+def parse_target(spec: str) -> dict:
+    """``"name:evasion:armor"`` -> target profile dict."""
+    name, evasion, armor = (spec.split(':') + ['0', '0'])[:3]
+    return {"name": name, "evasion": int(evasion or 0), "armor": int(armor or 0)}
+
+
+def all_weapons(catalog: dict) -> list[dict]:
+    return [weapon for category in catalog.get('categories', []) for weapon in category.get('weapons', [])]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Simulate weapon volleys per range band and target profile.')
+    parser.add_argument('catalog', help='weapons.json or .fvwc catalog')
+    parser.add_argument('--target', action='append', type=parse_target, help='NAME:EVASION:ARMOR (repeatable)')
+    parser.add_argument('--volleys', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, help='seed for reproducible runs')
+    parser.add_argument('--chunk', type=int, default=16384, help='volleys sampled per batch')
+    parser.add_argument('--exact', action='store_true', help='compute every distribution exactly instead of sampling')
+    args = parser.parse_args(argv)
+
+    weapons = all_weapons(load_catalog(args.catalog))
+    result = simulate(weapons, args.target or DEFAULT_TARGETS, args.volleys, args.seed, args.chunk, args.exact)
+    for record in result.to_records():
+        print(json.dumps(record))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""Local asyncio server for the app and its catalog data.
+
+Serves the app (``PUBLIC_FILES`` and the files under ``PUBLIC_DIRS``) the way
+GitHub Pages does -- hidden paths such as ``.git/`` or ``.catalog-store/`` and
+the tooling around the app are not served -- plus:
+
+* precompression -- every compressible file is gzip- (and, when the optional
+  ``brotli`` package is installed, brotli-) compressed once when it is loaded
+  or changes, and the smallest encoding the client accepts is sent;
+* strong ETags -- one per representation (``"<digest>"``, ``"<digest>-gzip"``,
+  ``"<digest>-br"``) with ``Cache-Control: no-cache``, so a warm load is a
+  round of ``304 Not Modified`` responses without bodies;
+* sliced weapon endpoints backed by an in-memory index (``WeaponIndex`` plus
+  ``TechResolver``) that is rebuilt when ``weapons.json`` or the tech tree
+  changes on disk (checked with one ``stat`` per request).
+
+Endpoints (repeated parameters and comma-separated values are any-of)::
+
+    GET /api/weapons?category=LASER&hardpoint=MHP      catalog-shaped slice
+    GET /api/weapons?researched=light-coilgun,heavy-coilgun[&strict=1]
+    GET /api/index                                     categories and hardpoints with counts
+
+``hardpoint`` takes a hardpoint value (``MH2``) or an outfit class (``MHP``
+matches ``MHP``/``MH2``/``MH4``...). ``researched`` keeps the weapons unlocked by
+those techs (``Empire.hasTech`` semantics; ``strict=1`` also requires every
+prerequisite); its presence is the filter, so an empty ``researched=`` keeps
+only what needs no research. Slices keep the ``{"categories": [...]}`` shape of
+``weapons.json``, so ``OutfitWidget`` can consume them unchanged.
+
+``--precompress`` writes ``.gz``/``.br`` siblings of the data files for other
+static servers and exits.
+
+    python -m tools.data_server --port 8000
+    python -m tools.data_server --precompress
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import traceback
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from tools.bitset import iter_bits
+from tools.fileutil import write_atomic
+from tools.hardpoints import HARDPOINTS, class_masks
+from tools.tech_index import TechResolver, load_index
+from tools.weapon_query import WeaponIndex
+
+DATA_FILES = ('data/weapons.json', 'data/tech-tree.json')
+PUBLIC_FILES = ('index.html', 'debug.html')
+PUBLIC_DIRS = ('js', 'css', 'data')
+COMPRESSIBLE = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+MIN_COMPRESS = 256
+SLICE_CACHE_SIZE = 256
+MAX_HEADER = 16 * 1024
+KEEPALIVE_TIMEOUT = 15.0
+
+_REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class Representation:
+    """One response body with its precompressed variants and strong ETags."""
+
+    __slots__ = ('content_type', 'bodies', 'etags')
+
+    def __init__(self, body: bytes, content_type: str):
+        self.content_type = content_type
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.bodies = {'identity': body}
+        self.etags = {'identity': f'"{digest}"'}
+        if len(body) >= MIN_COMPRESS and content_type.startswith(COMPRESSIBLE):
+            variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            brotli = _brotli()
+            if brotli is not None:
+                variants['br'] = brotli.compress(body, quality=11)
+            for encoding, data in variants.items():
+                if len(data) < len(body):
+                    self.bodies[encoding] = data
+                    self.etags[encoding] = f'"{digest}-{encoding}"'
+
+    def select(self, accept_encoding: str) -> str:
+        """The smallest encoding ``accept_encoding`` allows (``identity`` otherwise)."""
+        accepted = accepted_encodings(accept_encoding)
+        choices = [encoding for encoding in self.bodies if encoding != 'identity'
+                   and accepted.get(encoding, accepted.get('*', 0)) > 0]
+        return min(choices, key=lambda encoding: len(self.bodies[encoding])) if choices else 'identity'
+
+
+def accepted_encodings(header: str) -> dict[str, float]:
+    """``'gzip, br;q=0.5'`` -> ``{'gzip': 1.0, 'br': 0.5}``."""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, *params = part.strip().split(';')
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def _compact(obj) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _file_key(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CatalogData:
+    """Weapon/tech indexes and cached slices, rebuilt when the files change."""
+
+    def __init__(self, weapons_path: str, tech_path: str):
+        self.weapons_path = weapons_path
+        self.tech_path = tech_path
+        self.key = None
+        self.index: WeaponIndex | None = None
+        self.resolver: TechResolver | None = None
+        self.hardpoint_classes: dict[str, int] = {}
+        self.slices: OrderedDict[tuple, Representation] = OrderedDict()
+
+    def refresh(self) -> None:
+        """Reload when either file changed; a half-written file keeps the old data."""
+        key = (_file_key(self.weapons_path), _file_key(self.tech_path))
+        if key == self.key:
+            return
+        try:
+            with open(self.weapons_path, encoding='utf-8') as handle:
+                catalog = json.load(handle)
+            resolver = TechResolver(load_index(self.tech_path, write=False), catalog)
+        except (OSError, ValueError) as error:
+            if self.index is None:
+                raise
+            print(f'Keeping the previous catalog: {error}', file=sys.stderr)
+            return
+        self.index = WeaponIndex(catalog)
+        self.resolver = resolver
+        self.hardpoint_classes = class_masks(self.index.by_hardpoint)
+        self.slices.clear()
+        self.key = key
+
+    def _hardpoint_mask(self, values: list[str]) -> int:
+        mask = 0
+        for value in values:
+            mask |= self.hardpoint_classes.get(value, 0) if value in HARDPOINTS else self.index.by_hardpoint.get(value, 0)
+        return mask
+
+    def weapon_slice(self, categories: list[str], hardpoints: list[str], researched: list[str] | None,
+                     strict: bool = False) -> Representation:
+        """Catalog-shaped JSON of the weapons matching every given filter."""
+        key = (tuple(sorted(categories)), tuple(sorted(hardpoints)),
+               None if researched is None else tuple(sorted(researched)), strict)
+        cached = self.slices.get(key)
+        if cached is not None:
+            self.slices.move_to_end(key)
+            return cached
+        index = self.index
+        mask = index.mask({"category": categories} if categories else {})
+        if hardpoints:
+            mask &= self._hardpoint_mask(hardpoints)
+        if researched is not None:
+            # Both indexes number rows in catalog order.
+            mask &= self.resolver.unlocked_weapon_mask(researched, strict)
+        grouped: dict[str, list[dict]] = {}
+        for row in iter_bits(mask):
+            grouped.setdefault(index.categories[row], []).append(index.weapons[row])
+        body = _compact({"categories": [{"name": name, "weapons": weapons} for name, weapons in grouped.items()]})
+        representation = self.slices[key] = Representation(body, 'application/json')
+        if len(self.slices) > SLICE_CACHE_SIZE:
+            self.slices.popitem(last=False)
+        return representation
+
+    def summary(self) -> Representation:
+        cached = self.slices.get(('index',))
+        if cached is None:
+            index = self.index
+            counts = lambda masks: {name: mask.bit_count() for name, mask in masks.items()}
+            cached = self.slices[('index',)] = Representation(_compact({
+                "weapons": len(index),
+                "categories": counts(index.by_category),
+                "hardpoints": counts(index.by_hardpoint),
+                "hardpointClasses": counts(self.hardpoint_classes),
+            }), 'application/json')
+        return cached
+
+
+class DataServer:
+    """Request handling (``respond``) and the asyncio connection loop."""
+
+    def __init__(self, root: str = '.', weapons_path: str | None = None, tech_path: str | None = None):
+        self.root = os.path.realpath(root)
+        self.data = CatalogData(weapons_path or os.path.join(self.root, DATA_FILES[0]),
+                                tech_path or os.path.join(self.root, DATA_FILES[1]))
+        self.files: dict[str, tuple[tuple[int, int], Representation]] = {}
+
+    def static(self, path: str) -> Representation | None:
+        """The file at URL ``path`` under the root, reloaded and recompressed when it changes."""
+        relative = unquote(path).lstrip('/') or 'index.html'
+        parts = relative.split('/')
+        if any(part.startswith('.') for part in parts):
+            return None
+        if relative not in PUBLIC_FILES and (len(parts) < 2 or parts[0] not in PUBLIC_DIRS):
+            return None
+        full = os.path.realpath(os.path.join(self.root, relative))
+        if not full.startswith(self.root + os.sep) or not os.path.isfile(full):
+            return None
+        key = _file_key(full)
+        cached = self.files.get(full)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(full, 'rb') as handle:
+            body = handle.read()
+        content_type = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/json', 'application/javascript'):
+            content_type += '; charset=utf-8'
+        representation = Representation(body, content_type)
+        self.files[full] = (key, representation)
+        return representation
+
+    def route(self, target: str) -> Representation | None:
+        url = urlsplit(target)
+        if not url.path.startswith('/api/'):
+            return self.static(url.path)
+        self.data.refresh()
+        if url.path == '/api/index':
+            return self.data.summary()
+        if url.path == '/api/weapons':
+            query = parse_qs(url.query, keep_blank_values=True)
+            values = lambda name: [value for raw in query.get(name, []) for value in raw.split(',') if value]
+            researched = values('researched') if 'researched' in query else None
+            return self.data.weapon_slice(values('category'), values('hardpoint'), researched,
+                                          query.get('strict', ['0'])[-1] not in ('0', 'false', ''))
+        return None
+
+    def respond(self, method: str, target: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+        """``(status, headers, body)`` for one request."""
+        if method not in ('GET', 'HEAD'):
+            return 405, {"Allow": 'GET, HEAD', "Content-Length": '0'}, b''
+        try:
+            representation = self.route(target)
+        except Exception:
+            # An unreadable file or a bug in one handler must not take the connection task down.
+            print(f'{method} {target}: request failed', file=sys.stderr)
+            traceback.print_exc()
+            return 500, {"Content-Length": '0'}, b''
+        if representation is None:
+            return 404, {"Content-Type": 'text/plain; charset=utf-8', "Content-Length": '9'}, b'Not found'
+        encoding = representation.select(headers.get('accept-encoding', ''))
+        response = {"ETag": representation.etags[encoding], "Cache-Control": 'no-cache', "Vary": 'Accept-Encoding'}
+        if etag_matches(headers.get('if-none-match', ''), response['ETag']):
+            return 304, response, b''
+        body = representation.bodies[encoding]
+        response['Content-Type'] = representation.content_type
+        response['Content-Length'] = str(len(body))
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+        return 200, response, b'' if method == 'HEAD' else body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+                request_line, *lines = head.decode('latin-1').rstrip('\r\n').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ')
+                except ValueError:
+                    await self._send(writer, 400, {"Content-Length": '0', "Connection": 'close'}, b'')
+                    break
+                headers = {}
+                for line in lines:
+                    name, _, value = line.partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                status, response, body = self.respond(method, target, headers)
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                              and status != 405)
+                if not keep_alive:
+                    response['Connection'] = 'close'
+                await self._send(writer, status, response, body)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, headers: dict[str, str], body: bytes) -> None:
+        lines = [f'HTTP/1.1 {status} {_REASONS[status]}'] + [f'{name}: {value}' for name, value in headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host: str, port: int) -> None:
+        self.data.refresh()
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER)
+        print(f'Serving {self.root} on http://{host}:{port}/', file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def precompress(paths: list[str]) -> list[str]:
+    """Write ``.gz`` (and ``.br`` with brotli installed) next to each file."""
+    written = []
+    brotli = _brotli()
+    for path in paths:
+        with open(path, 'rb') as handle:
+            body = handle.read()
+        variants = {'.gz': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(body, quality=11)
+        for suffix, data in variants.items():
+            write_atomic(path + suffix, data)
+            written.append(f'{path}{suffix} ({len(body):,} -> {len(data):,} bytes)')
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Serve the app with precompressed, ETag-cached catalog data.')
+    parser.add_argument('--root', default='.', help='app directory (default: current directory)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--weapons', help='weapons.json for /api (default: <root>/data/weapons.json)')
+    parser.add_argument('--tech-tree', help='tech tree for /api (default: <root>/data/tech-tree.json)')
+    parser.add_argument('--precompress', action='store_true', help='write .gz/.br siblings of the data files and exit')
+    args = parser.parse_args(argv)
+
+    if args.precompress:
+        paths = [args.weapons or os.path.join(args.root, DATA_FILES[0]),
+                 args.tech_tree or os.path.join(args.root, DATA_FILES[1])]
+        for line in precompress(paths):
+            print(line, file=sys.stderr)
+        if _brotli() is None:
+            print('brotli is not installed; wrote gzip only', file=sys.stderr)
+        return 0
+    try:
+        asyncio.run(DataServer(args.root, args.weapons, args.tech_tree).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,427 @@
+"""Headless preflight validation for exported empire files.
+
+Re-implements the core rules of ``js/core/PreflightCheck.js`` over the JSON
+written by ``DataManager.exportToFile`` (``{fileVersion, empire, widgets,
+connections}``), so archived empires can be re-validated after a catalog or
+tech-tree update:
+
+* tech requirements of components, foundations, saved designs and outfit
+  weapons against the researched (plus auto-unlocked) techs;
+* power balance of component-based ships;
+* outfit hardpoints: remaining hardpoints per class, weapon ids missing from
+  the catalog, weapons in the wrong slot (spinal / point defence / offensive)
+  and mounted weapons exceeding the hardpoints of their class;
+* connections to missing widgets and the required node links per widget type
+  (counted from the exported connection list, as nodes are not serialized).
+
+Files are checked on a process pool and reported as JSON lines, one per file.
+Results are cached in ``<dir>/.preflight-cache.json`` keyed by path; a file is
+re-checked only when its content or the catalog/tech tree changed.
+
+    python -m tools.empire_preflight saves/ --weapons data/weapons.json --tech-tree data/tech-tree.json -o preflight.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.fileutil import file_digest, open_atomic
+from tools.hardpoints import HARDPOINTS, hardpoint_demand
+from tools.tech_index import TechResolver, load_index
+from tools.weapon_query import load_catalog, numeric
+
+RULES_VERSION = 1
+CACHE_FILE = '.preflight-cache.json'
+ATTACHMENTS = ('clamp', 'tether', 'adapter')
+
+
+def rules_key(weapons_path: str, tech_path: str) -> str:
+    """Identifies the rule inputs; cached results are valid only under the same key."""
+    return f'{RULES_VERSION}:{file_digest(weapons_path)}:{file_digest(tech_path)}'
+
+
+class Preflight:
+    """Runs the preflight rules for one exported empire file."""
+
+    def __init__(self, resolver: TechResolver, export: dict):
+        self.resolver = resolver
+        self.weapons = {weapon['id']: weapon for weapon in resolver.weapons}
+        empire = export.get('empire') or {}
+        self.empire = empire
+        self.researched = resolver.researched_mask(empire.get('researchedTech') or [])
+        self.widgets = {widget.get('id'): widget for widget in export.get('widgets') or []}
+        self.connections = export.get('connections') or []
+        self.links: dict[tuple, int] = {}
+        for connection in self.connections:
+            for side in ('source', 'target'):
+                key = (connection.get(side + 'WidgetId'), connection.get(side + 'NodeType'),
+                       connection.get(side + 'Direction'))
+                self.links[key] = self.links.get(key, 0) + 1
+        self.issues: list[dict] = []
+
+    # Issue collection -------------------------------------------------
+
+    def add(self, kind: str, message: str, source: str | None, tech: str | None = None) -> None:
+        issue = {"type": kind, "message": message, "source": source}
+        if tech is not None:
+            issue['tech'] = tech
+        self.issues.append(issue)
+
+    def has_tech(self, tech_id: str) -> bool:
+        bit = self.resolver.position.get(tech_id)
+        return bit is not None and self.researched >> bit & 1 == 1
+
+    def require_techs(self, techs, message: str, source: str | None) -> None:
+        for tech in techs or []:
+            if not self.has_tech(tech):
+                self.add('tech', message.format(tech=tech), source, tech)
+
+    def count_links(self, widget: dict, node_type: str, direction: str) -> int:
+        return self.links.get((widget.get('id'), node_type, direction), 0)
+
+    def parent_of_type(self, widget: dict, *types: str) -> dict | None:
+        for parent_id in widget.get('parents') or []:
+            parent = self.widgets.get(parent_id)
+            if parent and parent.get('type') in types:
+                return parent
+        return None
+
+    # Rules ------------------------------------------------------------
+
+    def run(self) -> list[dict]:
+        for widget in self.widgets.values():
+            check = getattr(self, 'check_' + str(widget.get('type')), None)
+            if check:
+                check(widget, widget.get('data') or {})
+        self.check_connections()
+        self.check_empire_designs()
+        return self.issues
+
+    def check_ship(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        if data.get('shipData'):
+            self.check_hull_ship(widget, data['shipData'])
+            return
+        components = data.get('components') or []
+        if not components:
+            self.add('warning', f'Ship "{title}" has no components', source)
+            return
+        types = {component.get('type') for component in components}
+        consumption = sum(component.get('powerConsumption') or 0 for component in components)
+        generation = sum(component.get('powerOutput') or 0 for component in components)
+        mass = sum(component.get('mass') or 0 for component in components)
+        if not data.get('ignoreTechRequirements'):
+            for component in components:
+                self.require_techs(component.get('requiredTech'),
+                                   f'Ship "{title}" component "{component.get("name")}" requires {{tech}}', source)
+        if 'hull' not in types:
+            self.add('error', f'Ship "{title}" requires a hull component', source)
+        if 'engine' not in types:
+            self.add('error', f'Ship "{title}" requires an engine component', source)
+        if 'reactor' not in types and consumption > 0:
+            self.add('error', f'Ship "{title}" requires power generation for its components', source)
+        if consumption > generation:
+            self.add('error', f'Ship "{title}" has insufficient power: {generation} generated, {consumption} required', source)
+        elif consumption < generation * 0.5:
+            self.add('warning', f'Ship "{title}" has excess power generation', source)
+        if mass > 1000:
+            self.add('warning', f'Ship "{title}" is very heavy ({mass} mass units)', source)
+
+    def check_hull_ship(self, widget: dict, ship: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        hulls = ship.get('hullComposition') or {}
+        if self.count_links(widget, 'Class', 'output') == 0:
+            self.add('warning', f'Ship "{title}" requires an Outfit connection', source)
+        if (hulls.get('magazine') or 0) + (hulls.get('hangar') or 0) > 0 and self.count_links(widget, 'loadout', 'output') == 0:
+            self.add('warning', f'Ship "{title}" has magazine or hangar hulls without a Loadout connection', source)
+        parent = self.parent_of_type(widget, 'ship', 'shipPrototype')
+        if parent:
+            parent_ship = (parent.get('data') or {}).get('shipData') or {}
+            parent_total = sum((parent_ship.get('hullComposition') or {}).values())
+            total = sum(hulls.values())
+            if total != parent_total:
+                self.add('error', f'Ship "{title}" inherits from "{parent.get("title")}" and must keep '
+                                  f'{parent_total} hulls (currently {total}).', source)
+            parent_foundations = parent_ship.get('foundations') or {}
+            foundations = ship.get('foundations') or {}
+            mismatched = [key for key in parent_foundations if bool(parent_foundations[key]) != bool(foundations.get(key))]
+            if mismatched:
+                self.add('error', f'Ship "{title}" foundations must match parent "{parent.get("title")}" '
+                                  f'({", ".join(mismatched)}).', source)
+        if not ship.get('ignoreTechRequirements'):
+            enabled = [tech for tech, on in (ship.get('foundations') or {}).items() if on]
+            self.require_techs(enabled, f'Ship "{title}" foundation "{{tech}}" requires technology', source)
+
+    def check_craft(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        components = data.get('components') or []
+        if not components:
+            self.add('warning', f'Craft "{title}" has no components', source)
+            return
+        for component in components:
+            self.require_techs(component.get('requiredTech'),
+                               f'Craft "{title}" component "{component.get("name")}" requires {{tech}}', source)
+        mass = sum(component.get('mass') or 0 for component in components)
+        if mass > 200:
+            self.add('warning', f'Craft "{title}" is heavy for a small craft ({mass} mass units)', source)
+        if self.count_links(widget, 'craft', 'output') == 0:
+            self.add('alert', f'Craft "{title}" is not assigned to any loadout', source)
+
+    def check_troops(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        equipment = data.get('equipment') or []
+        if not equipment:
+            self.add('warning', f'Troop unit "{title}" has no equipment', source)
+        for item in equipment:
+            self.require_techs(item.get('requiredTech'),
+                               f'Troop unit "{title}" equipment "{item.get("name")}" requires {{tech}}', source)
+        if self.count_links(widget, 'troop', 'output') == 0:
+            self.add('alert', f'Troop unit "{title}" is not assigned to any berth plan', source)
+
+    def check_missiles(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        if not data.get('warhead') and not data.get('guidance'):
+            self.add('error', f'Missile "{title}" requires warhead and guidance systems', source)
+        for component in filter(None, (data.get('warhead'), data.get('guidance'), data.get('propulsion'))):
+            self.require_techs(component.get('requiredTech'),
+                               f'Missile "{title}" component "{component.get("name")}" requires {{tech}}', source)
+        if self.count_links(widget, 'weapon', 'output') == 0:
+            self.add('alert', f'Missile design "{title}" is not assigned to any loadout', source)
+
+    def check_outfit(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        if self.count_links(widget, 'Class', 'input') == 0:
+            self.add('error', f'Outfit "{title}" must connect to a Ship Class', source)
+        if self.count_links(widget, 'Core', 'input') == 0:
+            self.add('error', f'Outfit "{title}" requires at least one Ship Core', source)
+        if self.count_links(widget, 'outfit-hull', 'output') == 0:
+            self.add('alert', f'Outfit "{title}" is not assigned to any Hull plan', source)
+        self.check_outfit_weapons(widget, data.get('outfitData') or {}, bool(data.get('ignoreTechRequirements')))
+
+    def check_outfit_weapons(self, widget: dict, outfit: dict, ignore_tech: bool) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        hardpoints = outfit.get('hardpoints') or {}
+        attachments = outfit.get('attachments') or {}
+        remaining = {}
+        for key in HARDPOINTS:
+            remaining[key] = ((hardpoints.get('base') or {}).get(key, 0) or 0) \
+                - ((hardpoints.get('merge') or {}).get(key, 0) or 0) \
+                + ((hardpoints.get('split') or {}).get(key, 0) or 0) \
+                - sum((attachments.get(kind) or {}).get(key, 0) or 0 for kind in ATTACHMENTS)
+        if any(value < 0 for value in remaining.values()):
+            self.add('error', 'Widget does not meet hardpoint requirements', source)
+
+        weapons = outfit.get('weapons') or {}
+        rows = [('spinal', {"weaponId": weapons.get('spinal'), "count": 1})] if weapons.get('spinal') else []
+        rows += [(slot, row) for slot in ('offensive', 'defensive') for row in weapons.get(slot) or []]
+        demand = dict.fromkeys(HARDPOINTS, 0)
+        for slot, row in rows:
+            weapon_id = row.get('weaponId')
+            if not weapon_id:
+                continue
+            weapon = self.weapons.get(weapon_id)
+            if weapon is None:
+                self.add('error', f'Outfit "{title}" uses unknown weapon "{weapon_id}"', source)
+                continue
+            name = weapon.get('name') or weapon_id
+            spinal = 'spinal' in (weapon.get('techRequirement') or '')
+            point_defence = 'pd' in name.lower()
+            expected = 'spinal' if spinal else 'defensive' if point_defence else 'offensive'
+            if slot != expected:
+                self.add('error', f'Outfit "{title}" mounts {expected} weapon "{name}" as {slot}', source)
+            tech = weapon.get('techRequirement')
+            if tech and not ignore_tech and not self.has_tech(tech):
+                self.add('tech', f'Outfit "{title}" weapon "{name}" requires {tech}', source, tech)
+            size = hardpoint_demand(weapon.get('hardpoint'))
+            if size and slot != 'spinal':
+                demand[size[0]] += size[1] * int(numeric(row.get('count')) or 0)
+        for key in HARDPOINTS:
+            if demand[key] > max(remaining[key], 0):
+                self.add('error', f'Outfit "{title}" mounts weapons needing {demand[key]} {key} '
+                                  f'but has {remaining[key]}', source)
+
+    def check_shipBerth(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        if self.count_links(widget, 'berth', 'input') == 0:
+            self.add('alert', f'Berth plan "{title}" is not linked to an Outfit', source)
+        if self.count_links(widget, 'troop', 'input') == 0:
+            self.add('alert', f'Berth plan "{title}" has unused berth capacity', source)
+        if self.count_links(widget, 'staff', 'output') == 0:
+            self.add('alert', f'Berth plan "{title}" does not produce a staff plan', source)
+
+    def check_shipHulls(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        if self.count_links(widget, 'outfit-hull', 'input') == 0:
+            self.add('error', f'Hull plan "{title}" requires an Outfit connection', source)
+        outfit = self.parent_of_type(widget, 'outfit')
+        ship = self.parent_of_type(outfit, 'ship', 'shipPrototype') if outfit else None
+        if ship:
+            hulls = ((ship.get('data') or {}).get('shipData') or {}).get('hullComposition') or {}
+            if (hulls.get('magazine') or 0) + (hulls.get('hangar') or 0) > 0 \
+                    and self.count_links(widget, 'loadout-hull', 'input') == 0:
+                self.add('alert', f'Hull plan "{title}" has magazine or hangar capacity without a Loadout connection', source)
+        if outfit:
+            modules = (((outfit.get('data') or {}).get('outfitData') or {}).get('systemsData') or {}).get('modules') or []
+            berthing = any('berth' in str(module.get('moduleId') or module.get('name') or '').lower() for module in modules)
+            if berthing and self.count_links(widget, 'staff', 'input') == 0:
+                self.add('alert', f'Hull plan "{title}" has berthing systems but no Staff plan connection', source)
+
+    def check_loadouts(self, widget: dict, data: dict) -> None:
+        title, source = widget.get('title'), widget.get('id')
+        items = data.get('items') or []
+        if not items:
+            self.add('warning', f'Loadout "{title}" is empty', source)
+        kinds = [item.get('type') for item in items]
+        if 'weapon' in kinds and 'ammunition' not in kinds:
+            self.add('warning', f'Loadout "{title}" has weapons but no ammunition', source)
+        for node_type, direction, message in (
+                ('loadout', 'input', 'is not linked to a ship class'),
+                ('craft', 'input', 'has unused hangar bays'),
+                ('weapon', 'input', 'has unused magazines'),
+                ('loadout-hull', 'output', 'is not assigned to a hull plan')):
+            if self.count_links(widget, node_type, direction) == 0:
+                self.add('alert', f'Loadout "{title}" {message}', source)
+
+    def check_connections(self) -> None:
+        for number, connection in enumerate(self.connections):
+            source, target = connection.get('sourceWidgetId'), connection.get('targetWidgetId')
+            if source not in self.widgets or target not in self.widgets:
+                self.add('error', 'Invalid connection: missing node',
+                         f'connection-{number}:{connection.get("sourceNodeId")}->{connection.get("targetNodeId")}')
+
+    def check_empire_designs(self) -> None:
+        for kind, designs in (self.empire.get('designs') or {}).items():
+            for design in designs or []:
+                for component in design.get('components') or []:
+                    self.require_techs(component.get('requiredTech'),
+                                       f'Saved {kind} design "{design.get("name")}" uses unavailable technology {{tech}}',
+                                       design.get('id'))
+
+
+def validate_export(resolver: TechResolver, export: dict) -> dict:
+    """Run every rule over one export and summarize the issues."""
+    issues = Preflight(resolver, export).run()
+    counts = {kind: 0 for kind in ('error', 'warning', 'alert', 'tech')}
+    for issue in issues:
+        counts[issue['type']] += 1
+    return {"ok": counts['error'] == 0 and counts['tech'] == 0, "counts": counts, "issues": issues}
+
+
+_worker_resolver: TechResolver | None = None
+
+
+def _init_worker(weapons_path: str, tech_path: str) -> None:
+    global _worker_resolver
+    _worker_resolver = TechResolver(load_index(tech_path, write=False), load_catalog(weapons_path))
+
+
+def _check_file(path: str) -> dict:
+    digest = file_digest(path)
+    try:
+        with open(path, encoding='utf-8') as handle:
+            export = json.load(handle)
+        if not isinstance(export, dict):
+            raise ValueError('not an exported empire object')
+    except (ValueError, UnicodeDecodeError) as error:
+        return {"path": path, "hash": digest, "ok": False, "invalid": str(error)}
+    try:
+        result = validate_export(_worker_resolver, export)
+        empire = (export.get('empire') or {}).get('name')
+    except Exception as error:  # a wrongly structured export must not sink the whole pool
+        return {"path": path, "hash": digest, "ok": False, "invalid": f'{type(error).__name__}: {error}'}
+    return {"path": path, "hash": digest, "empire": empire, **result}
+
+
+def _load_cache(path: str, key: str) -> dict:
+    try:
+        with open(path, encoding='utf-8') as handle:
+            cache = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return cache.get('files', {}) if cache.get('rules') == key else {}
+
+
+def iter_export_paths(root: str) -> list[str]:
+    if os.path.isfile(root):
+        return [root]
+    paths = []
+    for directory, _, names in os.walk(root):
+        paths.extend(os.path.join(directory, name) for name in names
+                     if name.endswith('.json') and name != CACHE_FILE)
+    return sorted(paths)
+
+
+def validate_tree(root: str, weapons_path: str, tech_path: str, workers: int | None = None,
+                  use_cache: bool = True) -> tuple[list[dict], dict]:
+    """Validate every export under ``root``; returns ``(results, stats)``."""
+    key = rules_key(weapons_path, tech_path)
+    cache_path = os.path.join(root if os.path.isdir(root) else os.path.dirname(root) or '.', CACHE_FILE)
+    cache = _load_cache(cache_path, key) if use_cache else {}
+    paths = iter_export_paths(root)
+
+    results: dict[str, dict] = {}
+    stale = []
+    for path in paths:
+        stat = os.stat(path)
+        entry = cache.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            results[path] = entry['result']
+        else:
+            stale.append((path, stat))
+    # Touched but unchanged files: a content hash match still reuses the result.
+    hashed = []
+    for path, stat in stale:
+        entry = cache.get(path)
+        if entry and entry['result'].get('hash') == file_digest(path):
+            results[path] = entry['result']
+            cache[path] = {**entry, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+        else:
+            hashed.append((path, stat))
+
+    if hashed:
+        load_index(tech_path)  # build the index once, before the workers read it
+        chunksize = max(1, len(hashed) // ((workers or os.cpu_count() or 1) * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(weapons_path, tech_path)) as pool:
+            for (path, stat), result in zip(hashed, pool.map(_check_file, [path for path, _ in hashed],
+                                                             chunksize=chunksize)):
+                results[path] = result
+                cache[path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "result": result}
+
+    if use_cache:
+        files = {path: cache[path] for path in paths if path in cache}
+        with open_atomic(cache_path) as handle:
+            json.dump({"rules": key, "files": files}, handle)
+    stats = {"files": len(paths), "checked": len(hashed), "cached": len(paths) - len(hashed),
+             "failed": sum(1 for path in paths if not results[path]['ok'])}
+    return [results[path] for path in paths], stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Validate exported empire files against the catalog and tech tree.')
+    parser.add_argument('root', help='exported empire file or directory of them')
+    parser.add_argument('--weapons', default='data/weapons.json', help='weapons.json or .fvwc catalog')
+    parser.add_argument('--tech-tree', default='data/tech-tree.json')
+    parser.add_argument('-o', '--output', default='-', help='JSON-lines report ("-" for stdout)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--no-cache', action='store_true', help='re-check every file')
+    parser.add_argument('--failed-only', action='store_true', help='only report files with errors')
+    args = parser.parse_args(argv)
+
+    results, stats = validate_tree(args.root, args.weapons, args.tech_tree, args.workers, not args.no_cache)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for result in results:
+            if not (args.failed_only and result['ok']):
+                out.write(json.dumps(result) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{stats['files']} files: {stats['checked']} checked, {stats['cached']} cached, "
+          f"{stats['failed']} failing", file=sys.stderr)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
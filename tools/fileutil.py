@@ -0,0 +1,41 @@
+"""File helpers shared by the tools: content digests and atomic writes.
+
+Writes go to a ``<path>.<pid>.tmp`` sibling that is renamed over ``path`` with
+``os.replace``, so readers (and an interrupted run) only ever see the old or
+the new file, and concurrent writers never share a temporary file.
+"""
+import contextlib
+import hashlib
+import os
+from typing import IO, Iterator
+
+
+def file_digest(path: str) -> str:
+    """Hex blake2b (16 bytes) of the file content, read in 1 MiB blocks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def open_atomic(path: str, mode: str = 'w') -> Iterator[IO]:
+    """Open a temporary sibling of ``path`` and move it over ``path`` on success."""
+    if mode not in ('w', 'wb'):
+        raise ValueError(f'open_atomic only writes, got mode {mode!r}')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, mode, **({} if 'b' in mode else {"encoding": 'utf-8'})) as handle:
+            yield handle
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def write_atomic(path: str, data: bytes | str) -> None:
+    """Replace ``path`` with ``data`` (text is written as UTF-8)."""
+    with open_atomic(path, 'wb') as handle:
+        handle.write(data.encode('utf-8') if isinstance(data, str) else data)
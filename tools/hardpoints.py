@@ -0,0 +1,33 @@
+"""Outfit hardpoint classes shared by the preflight, optimizer and server tools.
+
+Outfits count free hardpoints per class (``OutfitWidget``): Utility, Secondary,
+Primary and Main. Catalog weapons name the class they mount on (``PHP``) or,
+for weapons spanning several Main hardpoints, the class letter and a count
+(``MH2`` takes two ``MHP``). Other hardpoint values (spinal and troop mounts)
+do not use outfit hardpoints.
+"""
+import re
+
+HARDPOINTS = ('UHP', 'SHP', 'PHP', 'MHP')
+
+_MULTI_HARDPOINT_RE = re.compile(r'^([A-Z])H(\d+)$')  # MH2 = two Main hardpoints
+
+
+def hardpoint_demand(hardpoint: str | None) -> tuple[str, int] | None:
+    """``'PHP'`` -> ``('PHP', 1)``, ``'MH4'`` -> ``('MHP', 4)``; None for other classes."""
+    if hardpoint in HARDPOINTS:
+        return hardpoint, 1
+    match = _MULTI_HARDPOINT_RE.match(hardpoint or '')
+    if match and match.group(1) + 'HP' in HARDPOINTS:
+        return match.group(1) + 'HP', int(match.group(2))
+    return None
+
+
+def class_masks(by_hardpoint: dict[str, int]) -> dict[str, int]:
+    """Fold per-hardpoint weapon bitsets (``WeaponIndex.by_hardpoint``) into one per class."""
+    masks: dict[str, int] = {}
+    for hardpoint, mask in by_hardpoint.items():
+        demand = hardpoint_demand(hardpoint)
+        if demand is not None:
+            masks[demand[0]] = masks.get(demand[0], 0) | mask
+    return masks
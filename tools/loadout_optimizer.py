@@ -0,0 +1,292 @@
+"""Loadout optimizer for outfit hardpoints under cost and tech constraints.
+
+Given the free hardpoints of an outfit (``UHP``/``SHP``/``PHP``/``MHP``), a
+cost budget and the researched techs, picks the multiset of catalog weapons
+that maximizes an objective:
+
+* ``damage:BAND[:EVASION:ARMOR]`` -- exact expected damage per volley at a
+  range band (1-5) against a target profile, from ``tools.combat_sim``;
+* ``antimissile[:EVASION]`` -- point defence coverage: expected intercepting
+  hits per turn of ``Antimissile`` weapons (attacks x chain x hit chance at
+  band 1; unrated accuracy counts as one sure intercept per attack).
+
+Weapons are mountable when their tech is researched (``Empire.hasTech``
+semantics, via ``tools.tech_index``), their hardpoint maps to an outfit class
+(``MH2`` takes two ``MHP``) and they are not spinal. The search is exact:
+
+1. weapons dominated within their class (another one is no larger, no more
+   expensive and at least as valuable) are dropped;
+2. a Pareto front of ``(cost, value)`` over used slots is built per hardpoint
+   class by an unbounded-knapsack DP, pruned by the budget;
+3. the class fronts are merged alternately into two halves and the best
+   pair of half entries within budget is found in one linear scan.
+
+Without a budget the classes are independent and each is filled with its most
+valuable weapons by a plain knapsack over slots (milliseconds for any size).
+With a budget, fronts only hold non-dominated ``(cost, value)`` pairs within
+it and every DP step and merge stops at the budget, so the run time grows with
+the number of distinct affordable costs rather than with the slots: on the
+full catalog a budget of 150 solves in milliseconds, while a budget of 1000
+over 48 slots per class takes about 0.2 s. Both objectives need NumPy
+(``combat_sim``).
+
+    python -m tools.loadout_optimizer --slots UHP=6 SHP=4 PHP=2 MHP=8 --budget 150 --objective damage:2 --researched light-coilgun heavy-coilgun
+"""
+import argparse
+import json
+import sys
+from typing import Callable
+
+from tools.hardpoints import HARDPOINTS, hardpoint_demand
+from tools.tech_index import TechResolver
+from tools.weapon_query import numeric
+
+Objective = Callable[[list[dict]], list[float]]
+
+
+def _note_count(weapon: dict, name: str, default: int) -> int:
+    for note in weapon.get('notes') or []:
+        if note['name'] == name:
+            value = numeric(note.get('value'))
+            return int(value) if value is not None and value >= 0 else default
+    return default
+
+
+def damage_objective(band: int, evasion: int = 0, armour: int = 0) -> Objective:
+    """Expected damage per volley at 1-based ``band`` against one target."""
+    def values(weapons: list[dict]) -> list[float]:
+        import numpy as np
+        from tools.combat_sim import simulate
+        target = {"name": "target", "evasion": evasion, "armor": armour}
+        mean = simulate(weapons, [target], volleys=1, exact=True).mean[:, band - 1, 0]
+        return [0.0 if np.isnan(value) else float(value) for value in mean]
+    return values
+
+
+def antimissile_objective(evasion: int = 0) -> Objective:
+    """Expected intercepting hits per turn of ``Antimissile`` weapons."""
+    def values(weapons: list[dict]) -> list[float]:
+        from tools.combat_sim import AUTO_HIT, SWARM_BASE, hit_probability
+        result = []
+        for weapon in weapons:
+            if not any(note['name'] == 'Antimissile' for note in weapon.get('notes') or []):
+                result.append(0.0)
+                continue
+            swarm = any(note['name'] == 'Swarm' for note in weapon.get('notes') or [])
+            attacks = max(1, _note_count(weapon, 'Swarm', 1)) * max(1, _note_count(weapon, 'Salvo', 1))
+            chain = 1 + _note_count(weapon, 'Repeat', 0)
+            raw = ((weapon.get('ranges') or [{}])[0] or {}).get('accuracy')
+            accuracy = AUTO_HIT if raw == AUTO_HIT else numeric(raw)
+            p = 1.0 if accuracy is None else hit_probability(accuracy, evasion, SWARM_BASE if swarm else 0)
+            # Expected hits of a repeat chain: p + p^2 + ... + p^chain per attack.
+            result.append(attacks * sum(p ** k for k in range(1, chain + 1)))
+        return result
+    return values
+
+
+def parse_objective(spec: str) -> Objective:
+    """``damage:2``, ``damage:2:1:3`` (band, evasion, armour) or ``antimissile[:evasion]``."""
+    name, *args = spec.split(':')
+    numbers = [int(arg) for arg in args if arg]
+    if name == 'damage' and numbers and 1 <= numbers[0] <= 5:
+        return damage_objective(*numbers[:3])
+    if name == 'antimissile':
+        return antimissile_objective(*numbers[:1])
+    raise ValueError(f'Unknown objective {spec!r} (use damage:BAND[:EVASION:ARMOR] or antimissile[:EVASION])')
+
+
+def candidates(resolver: TechResolver, researched, objective: Objective,
+               require_prerequisites: bool = False) -> list[dict]:
+    """Mountable, unlocked weapons with a positive objective value."""
+    mountable = []
+    for weapon in resolver.unlocked_weapons(researched, require_prerequisites):
+        demand = hardpoint_demand(weapon.get('hardpoint'))
+        cost = numeric(weapon.get('cost'))
+        if demand and cost is not None and cost >= 0 and 'spinal' not in (weapon.get('techRequirement') or ''):
+            mountable.append((weapon, demand, cost))
+    values = objective([weapon for weapon, _, _ in mountable]) if mountable else []
+    return [{"weapon": weapon, "class": demand[0], "size": demand[1], "cost": cost, "value": value}
+            for (weapon, demand, cost), value in zip(mountable, values) if value > 0]
+
+
+def prune_dominated(items: list[dict]) -> list[dict]:
+    """Drop items for which another item of the same class is no larger, no
+    more expensive and at least as valuable (keeping one of exact ties)."""
+    kept = []
+    for item in sorted(items, key=lambda i: (i['size'], i['cost'], -i['value'])):
+        if not any(other['class'] == item['class'] and other['size'] <= item['size']
+                   and other['cost'] <= item['cost'] and other['value'] >= item['value'] for other in kept):
+            kept.append(item)
+    return kept
+
+
+# A front entry is (cost, value, picks) where picks is a linked list
+# (item index, previous picks) shared between entries to keep DP steps cheap.
+
+def _pareto(entries: list[tuple]) -> list[tuple]:
+    """Keep entries whose value beats every cheaper entry (sorted by cost)."""
+    front = []
+    best = -1.0
+    for entry in sorted(entries, key=lambda e: (e[0], -e[1])):
+        if entry[1] > best + 1e-12:
+            front.append(entry)
+            best = entry[1]
+    return front
+
+
+def class_front(items: list[tuple[int, dict]], slots: int, budget: float | None) -> list[tuple]:
+    """Pareto front of ``(cost, value)`` using at most ``slots`` hardpoints."""
+    fronts = [[(0, 0.0, None)]]
+    for used in range(1, slots + 1):
+        entries = list(fronts[used - 1])
+        for index, item in items:
+            if item['size'] > used:
+                continue
+            for cost, value, picks in fronts[used - item['size']]:
+                total = cost + item['cost']
+                if budget is not None and total > budget:
+                    break  # fronts are sorted by cost
+                entries.append((total, value + item['value'], (index, picks)))
+        fronts.append(_pareto(entries))
+    return fronts[slots]
+
+
+def best_fill(items: list[tuple[int, dict]], slots: int) -> tuple:
+    """Most valuable (then cheapest) entry using at most ``slots`` hardpoints,
+    ignoring cost: an unbounded knapsack over slots alone."""
+    best = [(0.0, 0, None)]  # (value, -cost, picks) so max() prefers cheaper ties
+    for used in range(1, slots + 1):
+        options = [best[used - 1]]
+        for index, item in items:
+            if item['size'] <= used:
+                value, neg_cost, picks = best[used - item['size']]
+                options.append((value + item['value'], neg_cost - item['cost'], (index, picks)))
+        best.append(max(options, key=lambda option: (option[0], option[1])))
+    value, neg_cost, picks = best[slots]
+    return -neg_cost, value, picks
+
+
+def merge_fronts(left: list[tuple], right: list[tuple], budget: float | None) -> list[tuple]:
+    """Pareto front of every left + right pair within ``budget`` (fronts are sorted by cost)."""
+    entries = []
+    for cost_l, value_l, picks_l in left:
+        if budget is not None and cost_l > budget:
+            break
+        for cost_r, value_r, picks_r in right:
+            if budget is not None and cost_l + cost_r > budget:
+                break
+            entries.append((cost_l + cost_r, value_l + value_r, (picks_l, picks_r)))
+    return _pareto(entries)
+
+
+def best_pair(left: list[tuple], right: list[tuple], budget: float) -> tuple:
+    """Best left + right pair within ``budget``: on a front value grows with
+    cost, so each left entry pairs with the dearest affordable right entry."""
+    best = left[0][0] + right[0][0], left[0][1] + right[0][1], (left[0][2], right[0][2])
+    position = len(right) - 1
+    for cost_l, value_l, picks_l in left:
+        while position >= 0 and cost_l + right[position][0] > budget:
+            position -= 1
+        if position < 0:
+            break
+        cost_r, value_r, picks_r = right[position]
+        if value_l + value_r > best[1] + 1e-12:
+            best = cost_l + cost_r, value_l + value_r, (picks_l, picks_r)
+    return best
+
+
+def _collect(picks, counts: dict[int, int]) -> None:
+    stack = [picks]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        head, tail = node
+        if isinstance(head, int):
+            counts[head] = counts.get(head, 0) + 1
+            stack.append(tail)
+        else:  # merged fronts: a pair of pick lists
+            stack.extend(node)
+
+
+def optimize(items: list[dict], slots: dict[str, int], budget: float | None = None) -> dict:
+    """Best loadout for ``slots`` and ``budget`` among ``items`` (see ``candidates``)."""
+    items = prune_dominated(items)
+    classes = []
+    for hardpoint in HARDPOINTS:
+        members = [(index, item) for index, item in enumerate(items) if item['class'] == hardpoint]
+        if slots.get(hardpoint, 0) > 0 and members:
+            classes.append((members, slots[hardpoint]))
+
+    if budget is None:
+        # Without a budget the classes are independent: fill each one with its
+        # most valuable weapons, no fronts needed.
+        cost, value, picks = 0, 0.0, None
+        for members, count in classes:
+            fill_cost, fill_value, fill_picks = best_fill(members, count)
+            cost, value, picks = cost + fill_cost, value + fill_value, (picks, fill_picks)
+        front = 1
+    else:
+        # Merge the classes in two halves and pair the halves in one scan:
+        # two small merges instead of folding every class into a growing front.
+        fronts = [class_front(members, count, budget) for members, count in classes]
+        halves = [[(0, 0.0, None)], [(0, 0.0, None)]]
+        for number, front in enumerate(fronts):
+            halves[number % 2] = merge_fronts(halves[number % 2], front, budget)
+        cost, value, picks = best_pair(halves[0], halves[1], budget)
+        front = len(halves[0]) + len(halves[1])
+    counts: dict[int, int] = {}
+    _collect(picks, counts)
+
+    weapons, used = [], dict.fromkeys(HARDPOINTS, 0)
+    for index, count in sorted(counts.items(), key=lambda pair: HARDPOINTS.index(items[pair[0]]['class'])):
+        item = items[index]
+        used[item['class']] += item['size'] * count
+        weapons.append({"id": item['weapon']['id'], "name": item['weapon'].get('name'), "hardpoint": item['weapon'].get('hardpoint'),
+                        "count": count, "cost": item['cost'] * count, "value": round(item['value'] * count, 6)})
+    return {"value": round(value, 6), "cost": cost, "budget": budget, "slots": slots, "used": used,
+            "weapons": weapons, "candidates": len(items), "front": front}
+
+
+def outfit_weapons(loadout: dict) -> dict:
+    """The loadout as ``OutfitWidget`` ``outfitData.weapons`` rows."""
+    rows = {"spinal": '', "offensive": [], "defensive": []}
+    for weapon in loadout['weapons']:
+        slot = 'defensive' if 'pd' in (weapon['name'] or '').lower() else 'offensive'
+        rows[slot].append({"mount": 'Single', "weaponId": weapon['id'], "arc": '', "count": weapon['count']})
+    return rows
+
+
+def _parse_slots(values: list[str]) -> dict[str, int]:
+    slots = {}
+    for value in values:
+        key, _, count = value.partition('=')
+        if key not in HARDPOINTS:
+            raise ValueError(f'Unknown hardpoint class {key!r} (use {", ".join(HARDPOINTS)})')
+        slots[key] = int(count)
+    return slots
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Find the best weapon loadout for a set of outfit hardpoints.')
+    parser.add_argument('--weapons', default='data/weapons.json', help='weapons.json or .fvwc catalog')
+    parser.add_argument('--tech-tree', default='data/tech-tree.json')
+    parser.add_argument('--slots', nargs='+', required=True, help='free hardpoints, e.g. UHP=6 MHP=4')
+    parser.add_argument('--budget', type=float, help='maximum total cost (default: unlimited)')
+    parser.add_argument('--objective', default='damage:2', help='damage:BAND[:EVASION:ARMOR] or antimissile[:EVASION]')
+    parser.add_argument('--researched', nargs='*', default=[], help='researched tech ids')
+    parser.add_argument('--all-tech', action='store_true', help='ignore tech requirements')
+    parser.add_argument('--strict-tech', action='store_true', help='also require every prerequisite of a weapon tech')
+    args = parser.parse_args(argv)
+
+    resolver = TechResolver.from_paths(args.tech_tree, args.weapons)
+    researched = resolver.order if args.all_tech else args.researched
+    items = candidates(resolver, researched, parse_objective(args.objective), args.strict_tech)
+    loadout = optimize(items, _parse_slots(args.slots), args.budget)
+    loadout['outfitWeapons'] = outfit_weapons(loadout)
+    print(json.dumps(loadout, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
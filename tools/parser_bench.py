@@ -0,0 +1,239 @@
+"""Benchmark suite for the weapon sheet ingestion pipeline.
+
+Generates synthetic sheets with the layout of ``data/weapon-sheet.tsv`` (real
+rows are used as templates: same ragged tab layout, range cells, notes,
+hardpoints and costs, with category headers interleaved) and times each stage
+of ``tools.weapon_parser`` on its own -- ``split_line``, ``normalize_row``,
+``parse_numeric``, ``parse_notes``, ``slugify``, category detection and JSON
+emission -- plus the streaming end-to-end ``ingest``. Every stage reports
+rows/sec; the end-to-end run also reports peak traced allocations
+(``tracemalloc``, in a separate pass so it does not skew the timings). The
+trace is restarted for every size, so each peak belongs to its own sheet;
+process-wide RSS is not reported, as it only ever grows across sizes and its
+unit differs between platforms.
+
+The parser's only state that grows with its input is the slug counter per
+distinct weapon name, so synthetic names are drawn from a pool of
+``DISTINCT_NAMES`` per template row. Peak memory then levels off as the row
+count grows instead of tracking it, which is what shows that rows are
+streamed; a real sheet with more distinct names will use more.
+
+The default sizes finish in seconds; large runs are opt-in (``--rows
+1000000`` takes several minutes).
+
+``--save`` stores the report as JSON and ``--baseline`` compares a run to a
+saved report, failing when a stage lost more than ``--tolerance`` of its
+throughput.
+
+    python -m tools.parser_bench --save bench.json
+    python -m tools.parser_bench --rows 10000 100000 1000000
+    python -m tools.parser_bench --baseline bench.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from tools import weapon_parser as wp
+
+DEFAULT_ROWS = (1_000, 10_000)
+DISTINCT_NAMES = 4
+CHUNK = 20_000
+HEADER_EVERY = 25
+TEMPLATE_SHEET = os.path.join(os.path.dirname(__file__), '..', 'data', 'weapon-sheet.tsv')
+
+STAGES = ('split_line', 'normalize_row', 'parse_numeric', 'parse_notes', 'slugify', 'category_detection',
+          'json_emission')
+
+
+def _templates(path: str) -> list[list[str]]:
+    """Raw weapon rows of the template sheet, as tab-split cells."""
+    templates = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            cells = line.rstrip('\n').split('\t')
+            row = wp.normalize_row([cell.strip() for cell in cells])
+            if not wp.is_skipped_row(row[0]) and not wp.is_category_row(row):
+                templates.append(cells)
+    return templates
+
+
+def _jitter(cell: str, rng: random.Random) -> str:
+    value = wp.parse_numeric(cell)
+    if isinstance(value, int) and rng.random() < 0.3:
+        shifted = value + rng.choice((-1, 1))
+        return f'{shifted:+d}' if cell[:1] in '+-' else str(max(0, shifted))
+    return cell
+
+
+def synthetic_lines(rows: int, seed: int = 0, template_path: str = TEMPLATE_SHEET):
+    """Yield ``rows`` sheet lines (weapons plus a header every ``HEADER_EVERY`` rows)."""
+    rng = random.Random(seed)
+    templates = _templates(template_path)
+    headers = sorted(wp.CATEGORY_HEADERS)
+    for index in range(rows):
+        if index % HEADER_EVERY == 0:
+            yield headers[(index // HEADER_EVERY) % len(headers)] + '\t' * (wp.ROW_WIDTH - 2) + '\t0\n'
+            continue
+        cells = list(rng.choice(templates))
+        notes_at = len(cells) - 3
+        cells[0] = f'{cells[0]} Mk{rng.randrange(DISTINCT_NAMES)}'
+        cells[1:notes_at] = [_jitter(cell, rng) for cell in cells[1:notes_at]]
+        cells[-1] = _jitter(cells[-1], rng)
+        yield '\t'.join(cells) + '\n'
+
+
+def write_sheet(path: str, rows: int, seed: int = 0) -> None:
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.writelines(synthetic_lines(rows, seed))
+
+
+def _chunks(path: str):
+    chunk = []
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            chunk.append(line)
+            if len(chunk) == CHUNK:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def time_stages(path: str) -> dict[str, float]:
+    """Seconds spent in each stage over the whole sheet."""
+    wp._note_fragment.cache_clear()
+    totals = dict.fromkeys(STAGES, 0.0)
+    clock = time.perf_counter
+    with open(os.devnull, 'w', encoding='utf-8') as sink:
+        for lines in _chunks(path):
+            start = clock()
+            split = [wp.split_line(line) for line in lines]
+            totals['split_line'] += clock() - start
+
+            start = clock()
+            rows = [wp.normalize_row(parts, '\t' in line) for parts, line in zip(split, lines) if parts and parts[0]]
+            totals['normalize_row'] += clock() - start
+
+            cells = [cell for row in rows for cell in row[1:wp.RANGE_COLUMNS + 1]] + [row[-1] for row in rows]
+            notes = [row[wp.RANGE_COLUMNS + 1] for row in rows]
+            names = [row[0] for row in rows]
+
+            start = clock()
+            for cell in cells:
+                wp.parse_numeric(cell)
+            totals['parse_numeric'] += clock() - start
+
+            start = clock()
+            for cell in notes:
+                wp.parse_notes(cell)
+            totals['parse_notes'] += clock() - start
+
+            start = clock()
+            for name in names:
+                wp.slugify(name)
+            totals['slugify'] += clock() - start
+
+            start = clock()
+            for row in rows:
+                wp.is_skipped_row(row[0]) or wp.is_category_row(row)
+            totals['category_detection'] += clock() - start
+
+            records = list(wp.iter_records(rows))
+            start = clock()
+            wp.write_catalog(records, sink)
+            totals['json_emission'] += clock() - start
+    return totals
+
+
+def run_end_to_end(path: str, trace_memory: bool = False) -> tuple[float, int | None]:
+    """``(seconds, peak traced bytes or None)`` of a full streaming ingest."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, 'w', encoding='utf-8') as sink:
+        wp.ingest([path], sink)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark(rows: int, seed: int = 0, memory: bool = True) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'sheet-{rows}.tsv')
+        write_sheet(path, rows, seed)
+        stages = time_stages(path)
+        elapsed, _ = run_end_to_end(path)
+        peak = run_end_to_end(path, trace_memory=True)[1] if memory else None
+    result = {"rows": rows, "stages": {}}
+    for stage, seconds in list(stages.items()) + [('end_to_end', elapsed)]:
+        result['stages'][stage] = {"seconds": round(seconds, 6),
+                                   "rows_per_sec": round(rows / seconds) if seconds else None}
+    result['peak_traced_mb'] = None if peak is None else round(peak / 2**20, 2)
+    return result
+
+
+def compare(report: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Stages whose throughput fell below ``(1 - tolerance)`` of the baseline."""
+    previous = {entry['rows']: entry for entry in baseline}
+    regressions = []
+    for entry in report:
+        old = previous.get(entry['rows'])
+        if not old:
+            continue
+        for stage, stats in entry['stages'].items():
+            before = old['stages'].get(stage, {}).get('rows_per_sec')
+            now = stats['rows_per_sec']
+            if before and now and now < before * (1 - tolerance):
+                regressions.append(f"{stage} @ {entry['rows']} rows: {now:,} rows/s vs {before:,} baseline")
+    return regressions
+
+
+def format_report(report: list[dict]) -> str:
+    stages = list(STAGES) + ['end_to_end']
+    lines = [f"{'stage':<20}" + ''.join(f"{entry['rows']:>14,}" for entry in report) + '   (rows/sec)']
+    for stage in stages:
+        lines.append(f'{stage:<20}' + ''.join(f"{entry['stages'][stage]['rows_per_sec'] or 0:>14,}" for entry in report))
+    lines.append(f"{'peak traced MB':<20}" + ''.join(f"{entry['peak_traced_mb'] if entry['peak_traced_mb'] is not None else '-':>14}"
+                                                      for entry in report))
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the weapon sheet parser on synthetic sheets.')
+    parser.add_argument('--rows', type=int, nargs='+', default=list(DEFAULT_ROWS), help=f'sheet sizes to run (default: {" ".join(map(str, DEFAULT_ROWS))})')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--save', help='write the JSON report here')
+    parser.add_argument('--baseline', help='JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed throughput loss vs. the baseline')
+    parser.add_argument('--write-sheet', metavar='PATH', help='only write a synthetic sheet of --rows[0] rows')
+    args = parser.parse_args(argv)
+
+    if args.write_sheet:
+        write_sheet(args.write_sheet, args.rows[0], args.seed)
+        return 0
+
+    report = [benchmark(rows, args.seed, not args.no_memory) for rows in args.rows]
+    print(format_report(report))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION', regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
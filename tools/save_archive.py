@@ -0,0 +1,364 @@
+"""Deduplicating archive for exported empire saves and backups.
+
+Exported empires (``DataManager.exportToFile``: ``{fileVersion, timestamp,
+empire, widgets, connections}``) repeat the same payloads over and over:
+identical outfits, loadouts and hull plans across ships and across saves.
+The archive stores each save as a tree of content-addressed chunks
+(zlib-compressed compact JSON under ``chunks/ab/cdef...``, named by the
+blake2b digest of the uncompressed JSON), so a payload that appears in many
+saves is stored once:
+
+* a container whose compact JSON is at least ``CHUNK_MIN`` bytes (a widget,
+  its ``data``, an ``outfitData``...) becomes its own chunk, and its parent
+  keeps a reference in its place (``{"t": template, "r": [[key, digest]]}``);
+* a long list (``widgets``, ``connections``) is cut into segments at
+  content-defined boundaries -- after an element whose hash has its low
+  ``SEGMENT_BITS`` bits clear -- so adding or removing a widget or
+  connection only changes the segments around it (``{"s": [digests]}``).
+
+A save is rebuilt exactly by streaming the chunk tree back out in the layout
+it was read in (``JSON.stringify(data, null, 2)`` for exports, compact for
+``localStorage`` backups); ingestion renders every save once and compares
+digests, and a file no layout reproduces is kept as raw text chunks instead.
+
+``saves.jsonl`` lists every save with its empire name, researched techs and
+the weapon ids its outfits use, so listing and searching read this one file
+and never touch the chunks.
+
+    python -m tools.save_archive --ingest exports/ backups/
+    python -m tools.save_archive --list --empire Terran --weapon heavy-coilgun
+    python -m tools.save_archive --extract 3f2a9c -o restored.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator
+
+from tools.empire_preflight import iter_export_paths
+from tools.fileutil import write_atomic
+
+ARCHIVE_VERSION = 1
+DEFAULT_ARCHIVE = 'saves.archive'
+INDEX_FILE = 'saves.jsonl'
+CHUNK_MIN = 512
+SEGMENT_BITS = 3
+SEGMENT_MAX = 64
+RAW_CHUNK = 1 << 16
+CACHE_SIZE = 4096
+
+# (format name, indent, trailing newline), most common first.
+LAYOUTS = (('indent2', 2, False), ('compact', None, False), ('indent2', 2, True), ('compact', None, True))
+RAW = 'raw'
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _dumps(value, indent: int | None, level: int) -> str:
+    if indent is None:
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+    return json.dumps(value, indent=indent, ensure_ascii=False).replace('\n', '\n' + ' ' * (indent * level))
+
+
+def _segments(items: list) -> list[list]:
+    """Cut ``items`` after elements whose hash ends in ``SEGMENT_BITS`` zero bits."""
+    segments, current = [], []
+    mask = (1 << SEGMENT_BITS) - 1
+    for item in items:
+        current.append(item)
+        boundary = hashlib.blake2b(_encode(item), digest_size=4).digest()[-1] & mask == 0
+        if boundary or len(current) >= SEGMENT_MAX:
+            segments.append(current)
+            current = []
+    if current:
+        segments.append(current)
+    return segments
+
+
+def weapon_ids(widgets: Iterable[dict]) -> list[str]:
+    """Weapon ids used by outfit rows (``weaponId``) and spinal mounts."""
+    found = set()
+    stack = [widget.get('data') for widget in widgets]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            weapon_id = value.get('weaponId')
+            if isinstance(weapon_id, str) and weapon_id:
+                found.add(weapon_id)
+            weapons = value.get('weapons')
+            if isinstance(weapons, dict) and isinstance(weapons.get('spinal'), str) and weapons['spinal']:
+                found.add(weapons['spinal'])
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return sorted(found)
+
+
+def describe(export: dict) -> dict:
+    """Searchable fields of one save."""
+    empire = export.get('empire') if isinstance(export.get('empire'), dict) else {}
+    widgets = [widget for widget in export.get('widgets') or [] if isinstance(widget, dict)]
+    return {"empire": empire.get('name'), "fileVersion": export.get('fileVersion'),
+            "timestamp": export.get('timestamp'), "widgets": len(widgets),
+            "connections": len(export.get('connections') or []),
+            "weapons": weapon_ids(widgets), "techs": sorted(empire.get('researchedTech') or [])}
+
+
+class SaveArchive:
+    """An archive directory: ``chunks/`` and the ``saves.jsonl`` index."""
+
+    def __init__(self, root: str = DEFAULT_ARCHIVE):
+        self.root = root
+        self._cache: OrderedDict[str, object] = OrderedDict()
+        self.written = 0  # compressed bytes of chunks added by this instance
+
+    # Chunks ------------------------------------------------------------------
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'chunks', digest[:2], digest[2:])
+
+    def put_chunk(self, obj) -> str:
+        data = _encode(obj)
+        digest = _digest(data)
+        path = self._chunk_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            packed = zlib.compress(data, 6)
+            write_atomic(path, packed)
+            self.written += len(packed)
+        return digest
+
+    def get_chunk(self, digest: str):
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._cache.move_to_end(digest)
+            return cached
+        try:
+            with open(self._chunk_path(digest), 'rb') as handle:
+                obj = json.loads(zlib.decompress(handle.read()))
+        except FileNotFoundError:
+            raise KeyError(f'Missing chunk {digest}') from None
+        self._cache[digest] = obj
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return obj
+
+    def store_value(self, value, segment: bool = True) -> str:
+        """Store ``value`` as a chunk tree; returns the root digest."""
+        if segment and isinstance(value, list) and len(value) > 1 and len(_encode(value)) >= CHUNK_MIN:
+            segments = _segments(value)
+            if len(segments) > 1:
+                return self.put_chunk({"s": [self.store_value(part, segment=False) for part in segments]})
+        if not isinstance(value, (dict, list)):
+            return self.put_chunk({"t": value})
+        template = dict(value) if isinstance(value, dict) else list(value)
+        refs = []
+        for key, child in (value.items() if isinstance(value, dict) else enumerate(value)):
+            if isinstance(child, (dict, list)) and child and len(_encode(child)) >= CHUNK_MIN:
+                refs.append([key, self.store_value(child)])
+                template[key] = None
+        return self.put_chunk({"t": template, "r": refs} if refs else {"t": template})
+
+    def load_value(self, digest: str):
+        """The value stored under ``digest``, fully materialized."""
+        chunk = self.get_chunk(digest)
+        if 's' in chunk:
+            return [item for part in chunk['s'] for item in self.load_value(part)]
+        value = chunk['t']
+        if 'r' in chunk:
+            value = dict(value) if isinstance(value, dict) else list(value)
+            for key, ref in chunk['r']:
+                value[key] = self.load_value(ref)
+        return value
+
+    # Streaming rendering -----------------------------------------------------
+
+    def _items(self, chunk: dict) -> Iterator[tuple[object, object, str | None]]:
+        """``(key, literal, ref digest)`` of a container chunk's children, in order."""
+        if 's' in chunk:
+            for part in chunk['s']:
+                yield from self._items(self.get_chunk(part))
+            return
+        refs = dict((key, ref) for key, ref in chunk.get('r', ()))
+        template = chunk['t']
+        for key, value in (template.items() if isinstance(template, dict) else enumerate(template)):
+            yield key, value, refs.get(key)
+
+    def render(self, digest: str, indent: int | None, level: int = 0) -> Iterator[str]:
+        """JSON text of the value under ``digest``, piece by piece, as ``json.dumps`` lays it out."""
+        chunk = self.get_chunk(digest)
+        if 'b' in chunk:
+            for part in chunk['b']:
+                yield self.get_chunk(part)['t']
+            return
+        if 's' not in chunk and not isinstance(chunk['t'], (dict, list)):
+            yield _dumps(chunk['t'], indent, level)
+            return
+        is_list = 's' in chunk or isinstance(chunk['t'], list)
+        opening, closing = '[]' if is_list else '{}'
+        separator = '' if indent is None else '\n' + ' ' * (indent * (level + 1))
+        empty = True
+        for key, value, ref in self._items(chunk):
+            yield (opening if empty else ',') + separator
+            empty = False
+            if not is_list:
+                yield json.dumps(key, ensure_ascii=False) + (':' if indent is None else ': ')
+            if ref is None:
+                yield _dumps(value, indent, level + 1)
+            else:
+                yield from self.render(ref, indent, level + 1)
+        if empty:
+            yield opening + closing
+        else:
+            yield ('' if indent is None else '\n' + ' ' * (indent * level)) + closing
+
+    def _raw(self, text: str) -> str:
+        parts = [self.put_chunk({"t": text[start:start + RAW_CHUNK]}) for start in range(0, len(text), RAW_CHUNK)]
+        return self.put_chunk({"b": parts})
+
+    def stream(self, entry: dict) -> Iterator[str]:
+        """The original text of the save described by index ``entry``."""
+        layout = {name: indent for name, indent, _ in LAYOUTS}
+        yield from self.render(entry['root'], layout.get(entry['format']))
+        if entry.get('newline'):
+            yield '\n'
+
+    def _rendered_digest(self, entry: dict) -> str | None:
+        hasher = hashlib.blake2b(digest_size=16)
+        try:
+            for piece in self.stream(entry):
+                hasher.update(piece.encode('utf-8'))
+        except UnicodeEncodeError:
+            return None
+        return hasher.hexdigest()
+
+    # Saves -------------------------------------------------------------------
+
+    def index(self) -> list[dict]:
+        try:
+            with open(os.path.join(self.root, INDEX_FILE), encoding='utf-8') as handle:
+                return [json.loads(line) for line in handle if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def ingest(self, path: str, known: set[str] | None = None) -> tuple[dict | None, bool]:
+        """Archive one file; returns ``(index entry, added)``. Non-export files give ``(None, False)``."""
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        save_id = _digest(data)
+        if known is not None and save_id in known:
+            return {"id": save_id, "path": path}, False
+        try:
+            text = data.decode('utf-8')
+            export = json.loads(text)
+        except ValueError:
+            return None, False
+        if not isinstance(export, dict) or not ('widgets' in export or 'empire' in export):
+            return None, False
+
+        root = self.store_value(export)
+        entry = None
+        for name, _, newline in LAYOUTS:
+            candidate = {"format": name, "newline": newline, "root": root}
+            if self._rendered_digest(candidate) == save_id:
+                entry = candidate
+                break
+        if entry is None:
+            entry = {"format": RAW, "newline": False, "root": self._raw(text)}
+        entry = {"id": save_id, "path": path, "size": len(data), **entry, **describe(export),
+                 "archived": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, INDEX_FILE), 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        if known is not None:
+            known.add(save_id)
+        return entry, True
+
+    def find(self, save_id: str) -> dict:
+        """Index entry of a save id or unique id prefix."""
+        matches = {entry['id']: entry for entry in self.index() if entry['id'].startswith(save_id)}
+        if len(matches) != 1:
+            raise KeyError(f'Unknown or ambiguous save {save_id!r}')
+        return next(iter(matches.values()))
+
+    def verify(self, entry: dict) -> bool:
+        return self._rendered_digest(entry) == entry['id']
+
+
+def search(entries: Iterable[dict], empire: str | None = None, weapons: Iterable[str] = (),
+           techs: Iterable[str] = ()) -> list[dict]:
+    """Entries whose empire name contains ``empire`` (case-insensitive) and
+    that use every weapon in ``weapons`` and researched every tech in ``techs``."""
+    weapons, techs = set(weapons), set(techs)
+    needle = empire.lower() if empire else None
+    return [entry for entry in entries
+            if (needle is None or needle in (entry.get('empire') or '').lower())
+            and weapons <= set(entry.get('weapons', ())) and techs <= set(entry.get('techs', ()))]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Deduplicating archive for exported empire saves.')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE, help='archive directory')
+    parser.add_argument('--ingest', nargs='+', metavar='PATH', help='export files or directories to archive')
+    parser.add_argument('--list', action='store_true', help='list archived saves (filtered by the options below)')
+    parser.add_argument('--empire', help='empire name contains this (case-insensitive)')
+    parser.add_argument('--weapon', nargs='*', default=[], help='saves whose outfits use all of these weapon ids')
+    parser.add_argument('--tech', nargs='*', default=[], help='saves that researched all of these techs')
+    parser.add_argument('--extract', metavar='ID', help='rebuild a save (id or unique prefix)')
+    parser.add_argument('-o', '--output', help='where --extract writes (default: stdout)')
+    parser.add_argument('--verify', action='store_true', help='rebuild every save and check its digest')
+    args = parser.parse_args(argv)
+
+    archive = SaveArchive(args.archive)
+    if args.ingest:
+        known = {entry['id'] for entry in archive.index()}
+        stats = {"files": 0, "added": 0, "duplicates": 0, "skipped": 0, "raw": 0, "bytes": 0}
+        for root in args.ingest:
+            for path in iter_export_paths(root):
+                stats['files'] += 1
+                entry, added = archive.ingest(path, known)
+                if entry is None:
+                    stats['skipped'] += 1
+                    print(f'Skipped {path}: not an exported empire', file=sys.stderr)
+                elif not added:
+                    stats['duplicates'] += 1
+                else:
+                    stats['added'] += 1
+                    stats['bytes'] += entry['size']
+                    stats['raw'] += entry['format'] == RAW
+        print(f"{stats['files']} files: {stats['added']} added ({stats['bytes']:,} bytes -> {archive.written:,} "
+              f"new chunk bytes), {stats['duplicates']} already archived, {stats['skipped']} skipped, "
+              f"{stats['raw']} kept as raw text", file=sys.stderr)
+    if args.list or args.empire or args.weapon or args.tech:
+        for entry in search(archive.index(), args.empire, args.weapon, args.tech):
+            print(entry['id'][:12], entry.get('timestamp') or '-', entry.get('empire') or '-', entry['path'], sep='\t')
+    if args.extract:
+        entry = archive.find(args.extract)
+        out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            for piece in archive.stream(entry):
+                out.write(piece)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    if args.verify:
+        failed = [entry for entry in archive.index() if not archive.verify(entry)]
+        for entry in failed:
+            print(f"Mismatch: {entry['id']} ({entry['path']})", file=sys.stderr)
+        print(f'{len(archive.index()) - len(failed)} saves verified, {len(failed)} failed', file=sys.stderr)
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
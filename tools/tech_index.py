@@ -0,0 +1,302 @@
+"""Precomputed tech-tree closure index and fast availability resolver.
+
+The build step validates ``data/tech-tree.json`` (unknown prerequisite ids,
+cycles), orders it topologically and gives every tech one bit in that order.
+For each tech it stores the transitive prerequisite closure (the tech itself
+plus everything it needs) as a bitset and the cumulative research cost of that
+closure. The result is exported next to the source as
+``data/tech-tree.index.json`` together with the source digest, so stale
+indexes are detected and rebuilt.
+
+Prerequisites follow ``TechTree.getEffectivePrerequisites``: the
+``prerequisites`` list plus ``specialRequirement`` when it names a tech.
+Empire-level gates (``Tier3``) are not techs; they are kept as metadata.
+
+``TechResolver`` answers availability questions with bitset operations only:
+which weapons a researched set unlocks, and the cheapest research path to a
+weapon. Every prerequisite is mandatory, so the cheapest path to a tech is its
+closure minus what is already researched, in topological order.
+
+    python -m tools.tech_index data/tech-tree.json
+    python -m tools.tech_index data/tech-tree.json --weapons data/weapons.json --path-to spinal-coilgun-03 --researched light-coilgun
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Iterable
+
+from tools.bitset import iter_bits
+
+INDEX_VERSION = 2
+LEVEL_REQUIREMENTS = {'Tier3'}
+
+
+class TechGraphError(ValueError):
+    """Raised when the tech graph has unknown prerequisites or cycles."""
+
+    def __init__(self, problems: list[str]):
+        super().__init__('; '.join(problems))
+        self.problems = problems
+
+
+def index_path_for(tech_path: str) -> str:
+    root, _ = os.path.splitext(tech_path)
+    return root + '.index.json'
+
+
+def effective_prerequisites(tech: dict) -> list[str]:
+    prerequisites = list(tech.get('prerequisites') or [])
+    special = tech.get('specialRequirement')
+    if special and special not in LEVEL_REQUIREMENTS:
+        prerequisites.append(special)
+    return prerequisites
+
+
+def check_graph(techs: dict) -> list[str]:
+    """Describe every unknown prerequisite id and cycle (``a -> b``: a requires b)."""
+    problems = []
+    for tech_id, tech in techs.items():
+        for prerequisite in effective_prerequisites(tech):
+            if prerequisite not in techs:
+                problems.append(f'{tech_id} requires unknown tech {prerequisite!r}')
+
+    state: dict[str, int] = {}  # 1 = on the DFS stack, 2 = finished
+    for root in techs:
+        if root in state:
+            continue
+        stack = [(root, iter(effective_prerequisites(techs[root])))]
+        path = [root]
+        state[root] = 1
+        while stack:
+            tech_id, children = stack[-1]
+            for child in children:
+                if child not in techs:
+                    continue
+                if state.get(child) == 1:
+                    cycle = path[path.index(child):] + [child]
+                    problems.append('prerequisite cycle: ' + ' -> '.join(cycle))
+                elif child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(effective_prerequisites(techs[child]))))
+                    path.append(child)
+                    break
+            else:
+                state[tech_id] = 2
+                stack.pop()
+                path.pop()
+    return problems
+
+
+def topological_order(techs: dict) -> list[str]:
+    """Prerequisites before dependents, otherwise in file order."""
+    problems = check_graph(techs)
+    if problems:
+        raise TechGraphError(problems)
+    order: list[str] = []
+    placed: set[str] = set()
+
+    def place(tech_id: str) -> None:
+        stack = [tech_id]
+        while stack:
+            current = stack[-1]
+            pending = [p for p in effective_prerequisites(techs[current]) if p not in placed]
+            if pending:
+                stack.extend(reversed(pending))
+                continue
+            stack.pop()
+            if current not in placed:
+                placed.add(current)
+                order.append(current)
+
+    for tech_id in techs:
+        place(tech_id)
+    return order
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def build_index(techs: dict, source_digest: str | None = None) -> dict:
+    order = topological_order(techs)
+    position = {tech_id: bit for bit, tech_id in enumerate(order)}
+    closures: list[int] = []
+    costs: list[int] = []
+    for bit, tech_id in enumerate(order):
+        closure = 1 << bit
+        for prerequisite in effective_prerequisites(techs[tech_id]):
+            closure |= closures[position[prerequisite]]
+        closures.append(closure)
+    # A missing cost stays None: it adds nothing to research totals, but unlike
+    # an explicit 0 it does not make a tech auto-unlocked.
+    own_cost = [techs[tech_id].get('cost') for tech_id in order]
+    for closure in closures:
+        costs.append(sum(own_cost[bit] or 0 for bit in iter_bits(closure)))
+    return {
+        "version": INDEX_VERSION,
+        "source": source_digest,
+        "order": order,
+        "cost": own_cost,
+        "closure": [format(closure, 'x') for closure in closures],
+        "cumulativeCost": costs,
+        "levelRequirements": {
+            tech_id: techs[tech_id]['specialRequirement'] for tech_id in order
+            if techs[tech_id].get('specialRequirement') in LEVEL_REQUIREMENTS
+        },
+    }
+
+
+def load_index(tech_path: str, write: bool = True) -> dict:
+    """Load the exported index for ``tech_path``, rebuilding it when stale or unreadable."""
+    with open(tech_path, encoding='utf-8') as handle:
+        text = handle.read()
+    digest = _digest(text)
+    index_path = index_path_for(tech_path)
+    try:
+        with open(index_path, encoding='utf-8') as handle:
+            index = json.load(handle)
+        if index.get('version') == INDEX_VERSION and index.get('source') == digest:
+            return index
+    except (FileNotFoundError, ValueError, AttributeError):
+        # Missing, truncated (JSONDecodeError is a ValueError) or not an object.
+        pass
+    index = build_index(json.loads(text), digest)
+    if write:
+        with open(index_path, 'w', encoding='utf-8') as handle:
+            json.dump(index, handle, indent=2)
+    return index
+
+
+class TechResolver:
+    """Bitset queries over a tech index and (optionally) a weapon catalog."""
+
+    def __init__(self, index: dict, catalog: dict | None = None):
+        self.order: list[str] = index['order']
+        self.position = {tech_id: bit for bit, tech_id in enumerate(self.order)}
+        self.cost: list[int | None] = index['cost']
+        self.closure: list[int] = [int(value, 16) for value in index['closure']]
+        self.cumulative_cost: list[int] = index['cumulativeCost']
+        self.level_requirements: dict[str, str] = index.get('levelRequirements', {})
+        # Empire.initializeAutoUnlockedTechs: techs with ``cost === 0`` and no
+        # requirements at all.
+        self.auto_unlocked = 0
+        for bit, tech_id in enumerate(self.order):
+            if self.closure[bit] == 1 << bit and self.cost[bit] == 0 and tech_id not in self.level_requirements:
+                self.auto_unlocked |= 1 << bit
+
+        self.weapons: list[dict] = []
+        self.free_weapons = 0  # weapons without a (known) tech requirement
+        self.weapons_by_tech: dict[int, int] = {}
+        for category in (catalog or {}).get('categories', []):
+            for weapon in category.get('weapons', []):
+                row = len(self.weapons)
+                self.weapons.append(weapon)
+                bit = self.position.get(weapon.get('techRequirement'))
+                if bit is None:
+                    self.free_weapons |= 1 << row
+                else:
+                    self.weapons_by_tech[bit] = self.weapons_by_tech.get(bit, 0) | 1 << row
+        self.weapon_rows = {weapon['id']: row for row, weapon in enumerate(self.weapons)}
+
+    @classmethod
+    def from_paths(cls, tech_path: str, weapons_path: str | None = None) -> 'TechResolver':
+        catalog = None
+        if weapons_path:
+            from tools.weapon_query import load_catalog
+            catalog = load_catalog(weapons_path)
+        return cls(load_index(tech_path), catalog)
+
+    def mask(self, tech_ids: Iterable[str]) -> int:
+        """Bitset of the known ids in ``tech_ids`` (unknown ids are ignored)."""
+        mask = 0
+        for tech_id in tech_ids:
+            bit = self.position.get(tech_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def ids(self, mask: int) -> list[str]:
+        """Tech ids of ``mask`` in topological order."""
+        return [self.order[bit] for bit in iter_bits(mask)]
+
+    def researched_mask(self, researched: Iterable[str]) -> int:
+        """``researched`` plus the auto-unlocked techs every empire starts with."""
+        return self.mask(researched) | self.auto_unlocked
+
+    def closure_of(self, tech_ids: Iterable[str]) -> int:
+        mask = 0
+        for bit in iter_bits(self.mask(tech_ids)):
+            mask |= self.closure[bit]
+        return mask
+
+    def missing_prerequisites(self, researched: Iterable[str]) -> int:
+        """Techs required by ``researched`` that are not in it."""
+        researched_mask = self.researched_mask(researched)
+        return self.closure_of(self.ids(researched_mask)) & ~researched_mask
+
+    def unlocked_weapon_mask(self, researched: Iterable[str], require_prerequisites: bool = False) -> int:
+        """Weapons whose tech is researched (and, optionally, its whole closure)."""
+        researched_mask = self.researched_mask(researched)
+        unlocked = self.free_weapons
+        for bit, weapons in self.weapons_by_tech.items():
+            if require_prerequisites:
+                if self.closure[bit] & ~researched_mask == 0:
+                    unlocked |= weapons
+            elif researched_mask >> bit & 1:
+                unlocked |= weapons
+        return unlocked
+
+    def unlocked_weapons(self, researched: Iterable[str], require_prerequisites: bool = False) -> list[dict]:
+        mask = self.unlocked_weapon_mask(researched, require_prerequisites)
+        return [self.weapons[row] for row in iter_bits(mask)]
+
+    def research_path(self, tech_id: str, researched: Iterable[str] = ()) -> tuple[list[str], int]:
+        """``(techs to research in order, their total cost)`` to reach ``tech_id``."""
+        needed = self.closure[self.position[tech_id]] & ~self.researched_mask(researched)
+        return self.ids(needed), sum(self.cost[bit] or 0 for bit in iter_bits(needed))
+
+    def cheapest_path_to_weapon(self, weapon_id: str, researched: Iterable[str] = ()) -> dict:
+        weapon = self.weapons[self.weapon_rows[weapon_id]]
+        tech_id = weapon.get('techRequirement')
+        if tech_id not in self.position:
+            return {"weapon": weapon_id, "tech": tech_id, "path": [], "cost": 0, "levelRequirements": []}
+        path, cost = self.research_path(tech_id, researched)
+        levels = sorted({self.level_requirements[t] for t in path if t in self.level_requirements})
+        return {"weapon": weapon_id, "tech": tech_id, "path": path, "cost": cost, "levelRequirements": levels}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Build the tech-tree closure index and answer availability queries.')
+    parser.add_argument('tech_tree', help='tech-tree.json')
+    parser.add_argument('--check', action='store_true', help='only validate the graph')
+    parser.add_argument('--weapons', help='weapons.json or .fvwc catalog for weapon queries')
+    parser.add_argument('--researched', nargs='*', default=[], help='researched tech ids')
+    parser.add_argument('--unlocked', action='store_true', help='list weapons unlocked by --researched')
+    parser.add_argument('--path-to', metavar='WEAPON_ID', help='cheapest research path to a weapon')
+    args = parser.parse_args(argv)
+
+    with open(args.tech_tree, encoding='utf-8') as handle:
+        techs = json.load(handle)
+    problems = check_graph(techs)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems or args.check:
+        return 1 if problems else 0
+
+    resolver = TechResolver.from_paths(args.tech_tree, args.weapons)
+    if args.unlocked:
+        for weapon in resolver.unlocked_weapons(args.researched):
+            print(weapon['id'])
+    if args.path_to:
+        if args.path_to not in resolver.weapon_rows:
+            parser.error(f'unknown weapon id {args.path_to!r}' + ('' if args.weapons else ' (pass --weapons)'))
+        print(json.dumps(resolver.cheapest_path_to_weapon(args.path_to, args.researched)))
+    if not (args.unlocked or args.path_to):
+        print('Wrote', index_path_for(args.tech_tree), 'for', len(resolver.order), 'techs', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
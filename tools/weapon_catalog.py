@@ -0,0 +1,437 @@
+"""Compact columnar weapon catalog (``.fvwc``) and its memory-mapped loader.
+
+The JSON catalog stores every band as an ``{accuracy, damage}`` dict and repeats
+the same names, hardpoints and note names on every weapon. The columnar file
+keeps the same data as:
+
+* fixed-width ``int16`` accuracy/damage arrays (``weapons x 5`` bands) and
+  ``int32`` cost / note value arrays, with sentinels for missing and ``N/A``;
+* one interned UTF-8 string table for ids, names, categories, hardpoints,
+  tech ids and note names;
+* the category blocks in file order (name plus first row), so a category
+  header that appears twice keeps its two blocks, as in ``weapons.json``;
+* one bitset per note name (Antimissile, Beam, Strafe, ...) over all weapons;
+* a small exception table for cells that are not plain integers (dice
+  expressions such as ``8d6``, fractional values), stored as JSON text.
+
+``WeaponCatalog`` maps the file read-only and casts each section in place, so
+opening a catalog copies nothing; strings are decoded only when asked for and
+many catalog variants can be open at once while sharing the page cache.
+Numeric strings such as ``"-2"`` or ``"+1"`` are normalized to integers.
+
+    python -m tools.weapon_catalog data/weapons.json -o data/weapons.fvwc
+"""
+import argparse
+import array
+import json
+import mmap
+import struct
+import sys
+from typing import Iterable, Iterator
+
+from tools.weapon_parser import RANGE_BANDS, WEAPON
+
+MAGIC = b'FVWC'
+VERSION = 2
+
+# Sentinels shared by the int16 and int32 columns (offset from the type minimum).
+_NONE, _NA, _EXTRA = 0, 1, 2
+_I16_MIN = -(1 << 15)
+_I32_MIN = -(1 << 31)
+NO_STRING = 0xFFFFFFFF
+
+# Columns that may spill into the exception table.
+COL_COST, COL_ACCURACY, COL_DAMAGE, COL_NOTE_VALUE = range(4)
+
+# (name, typecode) in file order.
+SECTIONS = (
+    ('string_offsets', 'I'),
+    ('string_blob', 'B'),
+    ('categories', 'I'),
+    ('category_offsets', 'I'),
+    ('weapon_id', 'I'),
+    ('weapon_name', 'I'),
+    ('weapon_category', 'I'),
+    ('weapon_hardpoint', 'I'),
+    ('weapon_tech', 'I'),
+    ('weapon_extra', 'I'),
+    ('cost', 'i'),
+    ('accuracy', 'h'),
+    ('damage', 'h'),
+    ('note_offsets', 'I'),
+    ('note_name', 'I'),
+    ('note_value', 'i'),
+    ('flag_names', 'I'),
+    ('flag_bits', 'Q'),
+    ('exceptions', 'I'),
+)
+_HEADER = struct.Struct('<4sHHIII')
+_SECTION = struct.Struct('<II')
+_KNOWN_FIELDS = ('id', 'name', 'ranges', 'notes', 'hardpoint', 'cost', 'techRequirement')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _as_int(value):
+    """Return ``value`` as an int when it is integral (incl. ``"+1"``), else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+class ColumnarBuilder:
+    """Accumulates catalog records into columns and writes a ``.fvwc`` file."""
+
+    def __init__(self):
+        self._strings: dict[str, int] = {}
+        self._categories: list[int] = []
+        self._category_offsets: list[int] = []
+        self._current_category: str | None = None
+        self._flags: dict[str, int] = {}
+        self._flag_members: list[list[int]] = []
+        self.columns = {name: array.array(code) for name, code in SECTIONS}
+        self.columns['note_offsets'].append(0)
+
+    def intern(self, text: str | None) -> int:
+        if text is None:
+            return NO_STRING
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self._strings)
+        return index
+
+    def _encode(self, value, column: int, index: int, minimum: int, maximum: int) -> int:
+        if value is None:
+            return minimum + _NONE
+        if value == 'N/A':
+            return minimum + _NA
+        number = _as_int(value)
+        if number is not None and minimum + _EXTRA < number <= maximum:
+            return number
+        self.columns['exceptions'].extend((column, index, self.intern(json.dumps(value))))
+        return minimum + _EXTRA
+
+    def add_category(self, name: str, new_block: bool = False) -> None:
+        """Open a category block unless ``name`` continues the current one.
+
+        Like ``weapon_parser.write_catalog``, consecutive records of one
+        category share a block; ``new_block`` always opens one (a catalog's
+        own blocks are kept as they are).
+        """
+        if new_block or name != self._current_category or not self._categories:
+            self._current_category = name
+            self._categories.append(self.intern(name))
+            self._category_offsets.append(len(self.columns['weapon_id']))
+
+    def add_weapon(self, category: str, weapon: dict) -> None:
+        self.add_category(category)
+        cols = self.columns
+        row = len(cols['weapon_id'])
+        cols['weapon_id'].append(self.intern(weapon['id']))
+        cols['weapon_name'].append(self.intern(weapon.get('name')))
+        cols['weapon_category'].append(self.intern(category))
+        cols['weapon_hardpoint'].append(self.intern(weapon.get('hardpoint')))
+        cols['weapon_tech'].append(self.intern(weapon.get('techRequirement')))
+        extra = {key: value for key, value in weapon.items() if key not in _KNOWN_FIELDS}
+        cols['weapon_extra'].append(self.intern(json.dumps(extra)) if extra else NO_STRING)
+        cols['cost'].append(self._encode(weapon.get('cost'), COL_COST, row, _I32_MIN, 0x7FFFFFFF))
+
+        ranges = list(weapon.get('ranges') or [])[:RANGE_BANDS]
+        ranges += [{}] * (RANGE_BANDS - len(ranges))
+        for band, cell in enumerate(ranges):
+            slot = row * RANGE_BANDS + band
+            cols['accuracy'].append(self._encode(cell.get('accuracy'), COL_ACCURACY, slot, _I16_MIN, 0x7FFF))
+            cols['damage'].append(self._encode(cell.get('damage'), COL_DAMAGE, slot, _I16_MIN, 0x7FFF))
+
+        for note in weapon.get('notes') or []:
+            slot = len(cols['note_name'])
+            cols['note_name'].append(self.intern(note['name']))
+            cols['note_value'].append(self._encode(note.get('value'), COL_NOTE_VALUE, slot, _I32_MIN, 0x7FFFFFFF))
+            flag = self._flags.get(note['name'])
+            if flag is None:
+                flag = self._flags[note['name']] = len(self._flag_members)
+                self._flag_members.append([])
+            members = self._flag_members[flag]
+            if not members or members[-1] != row:
+                members.append(row)
+        cols['note_offsets'].append(len(cols['note_name']))
+
+    def add_records(self, records: Iterable[tuple[str, str, dict | None]]) -> Iterator[tuple[str, str, dict | None]]:
+        """Pass ``weapon_parser`` records through while collecting them."""
+        for record in records:
+            kind, category, weapon = record
+            if kind == WEAPON:
+                self.add_weapon(category, weapon)
+            else:
+                self.add_category(category)
+            yield record
+
+    def add_catalog(self, catalog: dict) -> 'ColumnarBuilder':
+        for category in catalog.get('categories', []):
+            self.add_category(category['name'], new_block=True)
+            for weapon in category.get('weapons', []):
+                self.add_weapon(category['name'], weapon)
+        return self
+
+    def _finish(self) -> dict[str, array.array]:
+        cols = self.columns
+        cols['flag_names'] = array.array('I', (self._strings[name] for name in self._flags))
+        blob = bytearray()
+        cols['string_offsets'] = array.array('I', [0])
+        for text in self._strings:
+            blob += text.encode('utf-8')
+            cols['string_offsets'].append(len(blob))
+        cols['string_blob'] = array.array('B', bytes(blob))
+        cols['categories'] = array.array('I', self._categories)
+        cols['category_offsets'] = array.array('I', self._category_offsets + [len(cols['weapon_id'])])
+        words = (len(cols['weapon_id']) + 63) // 64
+        bits = array.array('Q', bytes(8 * words * len(self._flag_members)))
+        for flag, members in enumerate(self._flag_members):
+            for row in members:
+                bits[flag * words + row // 64] |= 1 << (row % 64)
+        cols['flag_bits'] = bits
+        return cols
+
+    def to_bytes(self) -> bytes:
+        cols = self._finish()
+        if sys.byteorder != 'little':
+            cols = {name: _swapped(values) for name, values in cols.items()}
+        offset = _align(_HEADER.size + _SECTION.size * len(SECTIONS))
+        table, chunks = [], []
+        for name, _ in SECTIONS:
+            data = cols[name].tobytes()
+            table.append(_SECTION.pack(offset, len(cols[name])))
+            chunks.append((offset, data))
+            offset = _align(offset + len(data))
+        out = bytearray(offset)
+        out[:_HEADER.size] = _HEADER.pack(MAGIC, VERSION, 0, len(cols['weapon_id']), len(cols['note_name']), len(self._flag_members))
+        out[_HEADER.size:_HEADER.size + _SECTION.size * len(SECTIONS)] = b''.join(table)
+        for start, data in chunks:
+            out[start:start + len(data)] = data
+        return bytes(out)
+
+    def write(self, path: str) -> None:
+        with open(path, 'wb') as handle:
+            handle.write(self.to_bytes())
+
+
+def _swapped(values: array.array) -> array.array:
+    values = array.array(values.typecode, values)
+    values.byteswap()
+    return values
+
+
+def write_columnar(catalog: dict, path: str) -> None:
+    ColumnarBuilder().add_catalog(catalog).write(path)
+
+
+class WeaponCatalog:
+    """Read-only, memory-mapped view of a ``.fvwc`` catalog."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, _, self.weapon_count, self.note_count, self.flag_count = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a version {VERSION} FVWC catalog')
+        self._sections = []
+        for position, (name, code) in enumerate(SECTIONS):
+            start, count = _SECTION.unpack_from(self._view, _HEADER.size + position * _SECTION.size)
+            raw = self._view[start:start + count * struct.calcsize(code)]
+            if sys.byteorder == 'little':
+                section = raw.cast(code)
+            else:
+                section = _swapped(array.array(code, raw.tobytes()))
+            self._sections.append(section)
+            setattr(self, '_' + name, section)
+        self._string_cache: dict[int, str] = {}
+        self._exception_map: dict[tuple[int, int], object] | None = None
+        self._id_map: dict[str, int] | None = None
+        self._flag_map: dict[str, int] | None = None
+        self._words = (self.weapon_count + 63) // 64
+
+    def close(self) -> None:
+        for section in getattr(self, '_sections', []):
+            if isinstance(section, memoryview):
+                section.release()
+        self._sections = []
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'WeaponCatalog':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.weapon_count
+
+    def string(self, index: int) -> str | None:
+        if index == NO_STRING:
+            return None
+        text = self._string_cache.get(index)
+        if text is None:
+            start, end = self._string_offsets[index], self._string_offsets[index + 1]
+            text = self._string_cache[index] = str(self._string_blob[start:end], 'utf-8')
+        return text
+
+    def _exceptions_lookup(self) -> dict[tuple[int, int], object]:
+        if self._exception_map is None:
+            flat = self._exceptions
+            self._exception_map = {
+                (flat[i], flat[i + 1]): json.loads(self.string(flat[i + 2]))
+                for i in range(0, len(flat), 3)
+            }
+        return self._exception_map
+
+    def _decode(self, raw: int, column: int, index: int, minimum: int):
+        if raw == minimum + _NONE:
+            return None
+        if raw == minimum + _NA:
+            return 'N/A'
+        if raw == minimum + _EXTRA:
+            return self._exceptions_lookup()[(column, index)]
+        return raw
+
+    # Column accessors -------------------------------------------------
+
+    def id(self, row: int) -> str:
+        return self.string(self._weapon_id[row])
+
+    def name(self, row: int) -> str | None:
+        return self.string(self._weapon_name[row])
+
+    def category(self, row: int) -> str:
+        return self.string(self._weapon_category[row])
+
+    def hardpoint(self, row: int) -> str | None:
+        return self.string(self._weapon_hardpoint[row])
+
+    def tech_requirement(self, row: int) -> str | None:
+        return self.string(self._weapon_tech[row])
+
+    def cost(self, row: int):
+        return self._decode(self._cost[row], COL_COST, row, _I32_MIN)
+
+    def band(self, row: int, band: int) -> tuple:
+        """``(accuracy, damage)`` for ``band`` (0-based) of weapon ``row``."""
+        slot = row * RANGE_BANDS + band
+        return (self._decode(self._accuracy[slot], COL_ACCURACY, slot, _I16_MIN),
+                self._decode(self._damage[slot], COL_DAMAGE, slot, _I16_MIN))
+
+    def notes(self, row: int) -> list[dict]:
+        notes = []
+        for slot in range(self._note_offsets[row], self._note_offsets[row + 1]):
+            note = {"name": self.string(self._note_name[slot])}
+            value = self._decode(self._note_value[slot], COL_NOTE_VALUE, slot, _I32_MIN)
+            if value is not None:
+                note["value"] = value
+            notes.append(note)
+        return notes
+
+    @property
+    def accuracy_column(self) -> memoryview:
+        """Raw int16 accuracies, ``weapon_count * 5`` long, sentinel-encoded."""
+        return self._accuracy
+
+    @property
+    def damage_column(self) -> memoryview:
+        """Raw int16 damages, ``weapon_count * 5`` long, sentinel-encoded."""
+        return self._damage
+
+    def index_of(self, weapon_id: str) -> int:
+        if self._id_map is None:
+            self._id_map = {self.id(row): row for row in range(self.weapon_count)}
+        return self._id_map[weapon_id]
+
+    # Note flags -------------------------------------------------------
+
+    def flag_names(self) -> list[str]:
+        return [self.string(index) for index in self._flag_names]
+
+    def _flag(self, name: str) -> int | None:
+        if self._flag_map is None:
+            self._flag_map = {self.string(index): flag for flag, index in enumerate(self._flag_names)}
+        return self._flag_map.get(name)
+
+    def flag_mask(self, name: str) -> int:
+        """Bitset (as an int) of the weapons carrying note ``name``."""
+        flag = self._flag(name)
+        if flag is None:
+            return 0
+        words = self._flag_bits[flag * self._words:(flag + 1) * self._words]
+        return int.from_bytes(words.tobytes(), 'little')
+
+    def has_flag(self, row: int, name: str) -> bool:
+        flag = self._flag(name)
+        if flag is None:
+            return False
+        return bool(self._flag_bits[flag * self._words + row // 64] >> (row % 64) & 1)
+
+    def rows_with_flag(self, name: str) -> list[int]:
+        mask = self.flag_mask(name)
+        rows = []
+        while mask:
+            low = mask & -mask
+            rows.append(low.bit_length() - 1)
+            mask ^= low
+        return rows
+
+    # Materialization --------------------------------------------------
+
+    def weapon(self, row: int) -> dict:
+        """Rebuild the JSON-shaped weapon entry for ``row``."""
+        entry = {
+            "id": self.id(row),
+            "name": self.name(row),
+            "ranges": [dict(zip(("accuracy", "damage"), self.band(row, band))) for band in range(RANGE_BANDS)],
+            "notes": self.notes(row),
+            "hardpoint": self.hardpoint(row),
+            "cost": self.cost(row),
+        }
+        tech = self.tech_requirement(row)
+        if tech is not None:
+            entry["techRequirement"] = tech
+        extra = self.string(self._weapon_extra[row])
+        if extra is not None:
+            entry.update(json.loads(extra))
+        return entry
+
+    def categories(self) -> list[str]:
+        return [self.string(index) for index in self._categories]
+
+    def to_catalog(self) -> dict:
+        """Rebuild the ``{"categories": [...]}`` JSON document, block by block."""
+        offsets = self._category_offsets
+        return {"categories": [
+            {"name": name, "weapons": [self.weapon(row) for row in range(offsets[block], offsets[block + 1])]}
+            for block, name in enumerate(self.categories())]}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Convert a weapons.json catalog to the columnar .fvwc format.')
+    parser.add_argument('catalog', help='JSON catalog to convert')
+    parser.add_argument('-o', '--output', required=True, help='.fvwc output path')
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, encoding='utf-8') as handle:
+        write_columnar(json.load(handle), args.output)
+    print('Wrote', args.output, file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
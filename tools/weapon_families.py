@@ -0,0 +1,379 @@
+"""Tiered weapon families: compact storage and on-demand tier expansion.
+
+Tiered rows (``Spinal Coilgun 01``-``05``, ``MASER Generator 01``-``05``...)
+are near-identical, so a family is stored once: the first tier as a full base
+row and every later tier as a delta against the tier before it -- changed
+top-level fields (``cost``; a ``techRequirement`` that just follows the tier
+suffix is marked instead of repeated), note changes (new values for
+``Charge``/``Repeat``/``Salvo``..., inserted and removed notes, or the full
+list when notes were reordered) and changed range bands only. ``expand()``
+rebuilds the exact catalog, and ``tier()`` expands a single tier (cached)
+without touching the rest.
+
+Generator rows are dropped by ``tools.weapon_parser`` because they are not
+weapons; ``read_generators`` recovers them from the sheet. Their first tier's
+range cells are per-band ``accuracy``/``damage`` offsets ("Modifies") for the
+matching MASER/UVASER/FEL/HASER weapons and later tiers only change the cost,
+so blank bands inherit the offsets of the tier below. ``with_generator``
+applies the offsets to a weapon when asked, and ``generator_variants``
+yields the modified weapons lazily.
+
+    python -m tools.weapon_families data/weapons.json --sheet data/weapon-sheet.tsv -o data/weapons.families.json
+    python -m tools.weapon_families data/weapons.families.json --tier "Spinal Coilgun" 03
+    python -m tools.weapon_families data/weapons.families.json --generator MASER 02
+"""
+import argparse
+import json
+import re
+import sys
+from typing import Iterable, Iterator
+
+from tools.weapon_parser import RANGE_BANDS, iter_lines, iter_rows, parse_weapon, slugify
+from tools.weapon_query import numeric
+
+FAMILIES_VERSION = 1
+GENERATOR_KINDS = ('MASER', 'UVASER', 'FEL', 'HASER')
+
+TIER_RE = re.compile(r'^(.*\S)\s+(\d{2})$')
+_GENERATOR_RE = re.compile(r'^(\S+) Generator$')
+_FIXED_KEYS = ('id', 'name', 'ranges', 'notes')
+
+
+class FamilyError(KeyError):
+    """Raised for an unknown family, generator kind or tier."""
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+def tier_of(name: str | None) -> tuple[str, str] | None:
+    """``'Spinal Coilgun 03'`` -> ``('Spinal Coilgun', '03')``."""
+    match = TIER_RE.match(name or '')
+    return (match.group(1), match.group(2)) if match else None
+
+
+# Deltas -------------------------------------------------------------------
+
+def _retier(value, previous_tier: str, tier: str):
+    """``'spinal-coilgun-01'`` -> ``'spinal-coilgun-02'``; None if ``value`` has no tier suffix."""
+    if not isinstance(value, str) or not value.endswith(previous_tier):
+        return None
+    stem = value[:-len(previous_tier)]
+    if stem and not stem[-1].isdigit():
+        return stem + tier
+    return None
+
+
+def _note_delta(old_notes: list[dict], new_notes: list[dict]) -> dict:
+    """Removed names, inserted notes and changed values, or the full list."""
+    old_names = [note['name'] for note in old_notes]
+    new_names = [note['name'] for note in new_notes]
+    common = [name for name in new_names if name in old_names]
+    if len(set(old_names)) != len(old_names) or len(set(new_names)) != len(new_names) \
+            or common != [name for name in old_names if name in new_names]:
+        return {"notes": new_notes}
+    old_by_name = {note['name']: note for note in old_notes}
+    delta = {}
+    removed = [name for name in old_names if name not in new_names]
+    if removed:
+        delta['removeNotes'] = removed
+    inserted = [[index, note] for index, note in enumerate(new_notes) if note['name'] not in old_by_name]
+    if inserted:
+        delta['insertNotes'] = inserted
+    for note in new_notes:
+        old = old_by_name.get(note['name'])
+        if old is not None and old != note:
+            if set(old) != set(note):
+                return {"notes": new_notes}
+            delta.setdefault('noteValues', {})[note['name']] = note.get('value')
+    return delta
+
+
+def tier_delta(previous: dict, weapon: dict, previous_tier: str, tier: str) -> dict:
+    """What changes from ``previous`` to ``weapon`` (``apply_delta`` inverts it)."""
+    delta = {}
+    if weapon['id'] != slugify(weapon['name']):
+        delta['id'] = weapon['id']
+    for key, value in weapon.items():
+        if key in _FIXED_KEYS or (key in previous and previous[key] == value):
+            continue
+        if key in previous and _retier(previous[key], previous_tier, tier) == value:
+            delta.setdefault('retier', []).append(key)
+        else:
+            delta.setdefault('set', {})[key] = value
+    dropped = [key for key in previous if key not in weapon]
+    if dropped:
+        delta['drop'] = dropped
+    if list(weapon) != [key for key in previous if key in weapon] + [key for key in weapon if key not in previous]:
+        delta['order'] = list(weapon)
+
+    bands = {}
+    for band in range(RANGE_BANDS):
+        old, new = _band(previous, band), _band(weapon, band)
+        if old != new:
+            bands[str(band + 1)] = new
+    if bands:
+        delta['bands'] = bands
+    delta.update(_note_delta(previous.get('notes') or [], weapon.get('notes') or []))
+    return delta
+
+
+def _band(weapon: dict, band: int) -> dict | None:
+    ranges = weapon.get('ranges') or []
+    return ranges[band] if band < len(ranges) else None
+
+
+def apply_delta(previous: dict, delta: dict, name: str, previous_tier: str, tier: str) -> dict:
+    """The next tier's weapon, built from ``previous`` and its ``delta``."""
+    weapon = {key: value for key, value in previous.items() if key not in delta.get('drop', ())}
+    weapon['id'] = delta.get('id', slugify(name))
+    weapon['name'] = name
+    if 'bands' in delta:
+        ranges = list(previous.get('ranges') or [])
+        for band, cell in delta['bands'].items():
+            ranges[int(band) - 1] = cell
+        weapon['ranges'] = ranges
+    if 'notes' in delta:
+        weapon['notes'] = delta['notes']
+    elif {'removeNotes', 'insertNotes', 'noteValues'} & delta.keys():
+        removed = set(delta.get('removeNotes', ()))
+        values = delta.get('noteValues', {})
+        notes = [{**note, "value": values[note['name']]} if note['name'] in values else note
+                 for note in previous.get('notes') or [] if note['name'] not in removed]
+        for index, note in delta.get('insertNotes', ()):
+            notes.insert(index, note)
+        weapon['notes'] = notes
+    for key in delta.get('retier', ()):
+        weapon[key] = _retier(previous[key], previous_tier, tier)
+    weapon.update(delta.get('set', {}))
+    if 'order' in delta:
+        weapon = {key: weapon[key] for key in delta['order']}
+    return weapon
+
+
+def encode_family(name: str, members: list[tuple[str, dict]]) -> dict:
+    """``members`` are ``(tier label, weapon)`` in sheet order."""
+    deltas = [tier_delta(previous, weapon, previous_tier, tier)
+              for (previous_tier, previous), (tier, weapon) in zip(members, members[1:])]
+    return {"family": name, "tiers": [tier for tier, _ in members], "base": members[0][1], "deltas": deltas}
+
+
+def compact_weapons(weapons: list[dict]) -> list[dict]:
+    """Replace runs of consecutive tiers of one family by a family entry."""
+    entries: list[dict] = []
+    run: list[tuple[str, dict]] = []
+    run_name = None
+
+    def flush() -> None:
+        if len(run) > 1:
+            entries.append(encode_family(run_name, run))
+        else:
+            entries.extend(weapon for _, weapon in run)
+        run.clear()
+
+    for weapon in weapons:
+        tiered = tier_of(weapon.get('name'))
+        if tiered is None or tiered[0] != run_name:
+            flush()
+            run_name = tiered[0] if tiered else None
+        if tiered is None:
+            entries.append(weapon)
+        else:
+            run.append((tiered[1], weapon))
+    flush()
+    return entries
+
+
+# Generators ----------------------------------------------------------------
+
+def read_generators(paths: Iterable[str]) -> list[dict]:
+    """Generator families (``MASER Generator 01``-``05``...) from weapon sheets."""
+    families: dict[str, list[tuple[str, dict]]] = {}
+    for parts in iter_rows(iter_lines(paths)):
+        tiered = tier_of(parts[0])
+        if tiered and _GENERATOR_RE.match(tiered[0]):
+            families.setdefault(tiered[0], []).append((tiered[1], parse_weapon(parts, slugify(parts[0]))))
+    return [{**encode_family(name, members), "kind": _GENERATOR_RE.match(name).group(1)}
+            for name, members in families.items()]
+
+
+def build_compact(catalog: dict, generator_sheets: Iterable[str] = ()) -> dict:
+    return {
+        "version": FAMILIES_VERSION,
+        "categories": [{"name": category['name'], "weapons": compact_weapons(category.get('weapons') or [])}
+                       for category in catalog.get('categories', [])],
+        "generators": read_generators(generator_sheets) if generator_sheets else [],
+    }
+
+
+class Family:
+    """One tiered family; tiers are expanded on first use and cached."""
+
+    __slots__ = ('name', 'tiers', 'base', 'deltas', 'kind', '_expanded')
+
+    def __init__(self, entry: dict):
+        self.name: str = entry['family']
+        self.tiers: list[str] = entry['tiers']
+        self.base: dict = entry['base']
+        self.deltas: list[dict] = entry['deltas']
+        self.kind: str | None = entry.get('kind')
+        self._expanded: list[dict] = [self.base]
+
+    def __len__(self) -> int:
+        return len(self.tiers)
+
+    def index(self, tier: str | int) -> int:
+        """0-based position of tier ``'03'`` (or position 3, 1-based)."""
+        if isinstance(tier, str):
+            if tier in self.tiers:
+                return self.tiers.index(tier)
+        elif 1 <= tier <= len(self.tiers):
+            return tier - 1
+        raise FamilyError(f'{self.name} has no tier {tier!r} (tiers {", ".join(self.tiers)})')
+
+    def tier(self, tier: str | int) -> dict:
+        """Weapon of tier ``'03'`` (or position 3, 1-based)."""
+        index = self.index(tier)
+        while len(self._expanded) <= index:
+            step = len(self._expanded)
+            previous_tier, tier = self.tiers[step - 1], self.tiers[step]
+            self._expanded.append(apply_delta(self._expanded[-1], self.deltas[step - 1],
+                                              f'{self.name} {tier}', previous_tier, tier))
+        return self._expanded[index]
+
+    def expand(self) -> list[dict]:
+        return [self.tier(position) for position in range(1, len(self.tiers) + 1)]
+
+    def offsets(self, tier: str | int) -> list[dict]:
+        """Numeric generator band offsets of ``tier``: blank bands inherit from lower tiers."""
+        index = self.index(tier)
+        bands = [None] * RANGE_BANDS
+        for position in range(index, -1, -1):
+            for band, cell in enumerate(self.tier(position + 1).get('ranges') or []):
+                if bands[band] is None and any(value is not None for value in cell.values()):
+                    # Signed cells are text ('-1'); offsets are applied as numbers.
+                    bands[band] = {key: numeric(value) for key, value in cell.items()}
+        return [cell or {"accuracy": None, "damage": None} for cell in bands]
+
+
+def _offset(value, delta):
+    if delta is None or value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and isinstance(delta, (int, float)):
+        return value + delta
+    if isinstance(value, str) and value[:1] in '+-' and value[1:].isdigit() and isinstance(delta, int):
+        return f'{int(value) + delta:+d}'
+    return value  # N/A and dice stay as they are
+
+
+class FamilyCatalog:
+    """A compact catalog (see ``build_compact``) with lazy family expansion."""
+
+    def __init__(self, compact: dict):
+        self.compact = compact
+        self.families: dict[str, Family] = {}
+        self.generators: dict[str, Family] = {}
+        for category in compact.get('categories', []):
+            for entry in category['weapons']:
+                if 'family' in entry:
+                    self.families[entry['family']] = Family(entry)
+        for entry in compact.get('generators', []):
+            self.generators[entry['kind']] = Family(entry)
+
+    @classmethod
+    def load(cls, path: str) -> 'FamilyCatalog':
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        if 'version' not in data:  # a plain weapons.json
+            data = build_compact(data)
+        return cls(data)
+
+    def family(self, name: str) -> Family:
+        try:
+            return self.families[name]
+        except KeyError:
+            raise FamilyError(f'Unknown family {name!r}') from None
+
+    def generator(self, kind: str) -> Family:
+        try:
+            return self.generators[kind]
+        except KeyError:
+            known = ', '.join(self.generators) or 'none loaded; pass --sheet'
+            raise FamilyError(f'Unknown generator kind {kind!r} ({known})') from None
+
+    def tier(self, family: str, tier: str | int) -> dict:
+        return self.family(family).tier(tier)
+
+    def iter_weapons(self) -> Iterator[tuple[str, dict]]:
+        """``(category, weapon)`` for every weapon, expanding families."""
+        for category in self.compact.get('categories', []):
+            for entry in category['weapons']:
+                if 'family' in entry:
+                    for weapon in self.families[entry['family']].expand():
+                        yield category['name'], weapon
+                else:
+                    yield category['name'], entry
+
+    def expand(self) -> dict:
+        """The full ``{"categories": [...]}`` catalog."""
+        categories = []
+        for category in self.compact.get('categories', []):
+            weapons = []
+            for entry in category['weapons']:
+                weapons.extend(self.families[entry['family']].expand() if 'family' in entry else [entry])
+            categories.append({"name": category['name'], "weapons": weapons})
+        return {"categories": categories}
+
+    def with_generator(self, weapon: dict, kind: str, tier: str | int) -> dict:
+        """``weapon`` with the band offsets of generator ``kind`` at ``tier``."""
+        offsets = self.generator(kind).offsets(tier)
+        ranges = [{"accuracy": _offset(cell.get('accuracy'), offset.get('accuracy')),
+                   "damage": _offset(cell.get('damage'), offset.get('damage'))}
+                  for cell, offset in zip(weapon.get('ranges') or [], offsets)]
+        return {**weapon, "ranges": ranges}
+
+    def generator_variants(self, kind: str, tier: str | int) -> Iterator[dict]:
+        """Lazily yield every ``kind`` weapon (``Light Optical MASER``...) with the generator applied."""
+        self.generator(kind).index(tier)  # fail before the first weapon, not on it
+        for _, weapon in self.iter_weapons():
+            if kind in (weapon.get('name') or '').split():
+                yield self.with_generator(weapon, kind, tier)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Compact tiered weapon families and expand tiers on demand.')
+    parser.add_argument('catalog', help='weapons.json (to compact) or a compact families file')
+    parser.add_argument('--sheet', action='append', default=[], help='weapon sheet to recover Generator rows from')
+    parser.add_argument('-o', '--output', help='write the compact families file')
+    parser.add_argument('--expand', metavar='PATH', help='write the fully expanded catalog')
+    parser.add_argument('--tier', nargs=2, metavar=('FAMILY', 'TIER'), help='print one expanded tier')
+    parser.add_argument('--generator', nargs=2, metavar=('KIND', 'TIER'), help='print weapons with a generator applied')
+    args = parser.parse_args(argv)
+
+    with open(args.catalog, encoding='utf-8') as handle:
+        data = json.load(handle)
+    compact = data if 'version' in data else build_compact(data, args.sheet)
+    families = FamilyCatalog(compact)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            json.dump(compact, out, indent=2)
+        expanded = sum(1 for _ in families.iter_weapons())
+        print('Wrote', args.output, 'with', len(families.families), 'families,', len(families.generators),
+              'generators and', expanded, 'weapons', file=sys.stderr)
+    if args.expand:
+        with open(args.expand, 'w', encoding='utf-8') as out:
+            json.dump(families.expand(), out, indent=2)
+    try:
+        if args.tier:
+            print(json.dumps(families.tier(*args.tier), indent=2))
+        if args.generator:
+            for weapon in families.generator_variants(*args.generator):
+                print(json.dumps(weapon))
+    except FamilyError as error:
+        parser.error(str(error))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Incremental rebuild of the weapon catalog.
+
+Every normalized sheet row is hashed and recorded in a sidecar manifest next to
+the catalog (``data/weapons.manifest.json``). On rebuild only rows whose hash is
+new get parsed; unchanged rows reuse their catalog entry verbatim. Parsed rows
+are merged into the entry they replace, so hand-added fields such as
+``techRequirement`` survive, and slug ids that were already handed out stay
+attached to their rows even when duplicates are inserted or removed around
+them. Entries that never came from the sheet are kept where they are.
+
+Without a manifest (the first run) every row is parsed, but a row whose parsed
+fields match its current entry counts as reused, so the catalog is left as is
+and the run only seeds the manifest.
+
+    python -m tools.weapon_parser data/weapon-sheet.tsv -o data/weapons.json --incremental
+"""
+import hashlib
+import json
+import os
+from typing import Iterable
+
+from tools.fileutil import write_atomic
+from tools.weapon_parser import (
+    is_category_row,
+    is_skipped_row,
+    iter_lines,
+    iter_rows,
+    parse_weapon,
+    slugify,
+)
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path_for(catalog_path: str) -> str:
+    root, _ = os.path.splitext(catalog_path)
+    return root + '.manifest.json'
+
+
+def row_hash(parts: list[str]) -> str:
+    """Content hash of a normalized row (independent of tab/space layout)."""
+    return hashlib.blake2b('\t'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _read_text(path: str) -> str | None:
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return handle.read()
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest(path: str) -> dict:
+    text = _read_text(path)
+    if text is None:
+        return {"version": MANIFEST_VERSION, "rows": []}
+    manifest = json.loads(text)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f'Unsupported manifest version in {path}: {manifest.get("version")!r}')
+    return manifest
+
+
+def _free_id(base_slug: str, claimed: set[str]) -> str:
+    weapon_id, n = base_slug, 1
+    while weapon_id in claimed:
+        n += 1
+        weapon_id = f"{base_slug}-{n}"
+    return weapon_id
+
+
+def rebuild(paths: Iterable[str], catalog_path: str, manifest_path: str | None = None) -> dict:
+    """Merge the sheets at ``paths`` into the catalog at ``catalog_path``.
+
+    Files are only rewritten when their content changes. Returns counts of
+    ``parsed``, ``reused``, ``removed`` and ``kept`` (hand-added) weapons.
+    """
+    manifest_path = manifest_path or manifest_path_for(catalog_path)
+    old_text = _read_text(catalog_path)
+    catalog = json.loads(old_text) if old_text else {"categories": []}
+    manifest = load_manifest(manifest_path)
+
+    existing_categories: dict[str, dict] = {}
+    existing: dict[str, tuple[str, dict]] = {}
+    for category in catalog.get('categories', []):
+        existing_categories.setdefault(category['name'], category)
+        for weapon in category.get('weapons', []):
+            existing[weapon['id']] = (category['name'], weapon)
+
+    previous: dict[str, list[str]] = {}
+    for row in manifest['rows']:
+        previous.setdefault(row['hash'], []).append(row['id'])
+    owned = {row['id'] for row in manifest['rows']}
+
+    # Pass 1: walk the sheet and let unchanged rows claim their ids first, so
+    # edited or inserted rows can never take an id that is still in use.
+    plan: list[tuple[str, list[str] | None, str | None, str | None]] = []
+    claimed: set[str] = set()
+    current_category_name: str | None = None
+    for parts in iter_rows(iter_lines(paths)):
+        if is_skipped_row(parts[0]):
+            continue
+        if is_category_row(parts):
+            current_category_name = parts[0]
+            plan.append((current_category_name, None, None, None))
+            continue
+        if current_category_name is None:
+            current_category_name = 'General'
+        digest = row_hash(parts)
+        weapon_id = None
+        candidates = previous.get(digest, [])
+        while candidates:
+            candidate = candidates.pop(0)
+            if candidate in existing and candidate not in claimed:
+                weapon_id = candidate
+                claimed.add(weapon_id)
+                break
+        plan.append((current_category_name, parts, digest, weapon_id))
+
+    # Pass 2: parse only the rows that changed and assemble in sheet order.
+    # Like weapon_parser.write_catalog, a header that reopens an earlier
+    # category name starts a new block rather than merging into the first.
+    stats = {"parsed": 0, "reused": 0, "removed": 0, "kept": 0}
+    blocks: list[tuple[str, list[dict]]] = []
+    rows: list[dict] = []
+    for category_name, parts, digest, weapon_id in plan:
+        if parts is None or not blocks or blocks[-1][0] != category_name:
+            blocks.append((category_name, []))
+        if parts is None:
+            continue
+        if weapon_id is not None:
+            entry = existing[weapon_id][1]
+            stats["reused"] += 1
+        else:
+            weapon_id = _free_id(slugify(parts[0]), claimed)
+            claimed.add(weapon_id)
+            previous_entry = existing[weapon_id][1] if weapon_id in existing else {}
+            entry = dict(previous_entry)
+            entry.update(parse_weapon(parts, weapon_id))
+            # Without a manifest entry (first run, or a manifest seeded from
+            # an older sheet) a row that parses to its current entry is
+            # unchanged, not edited.
+            stats["reused" if entry == previous_entry else "parsed"] += 1
+        blocks[-1][1].append(entry)
+        rows.append({"hash": digest, "id": weapon_id})
+
+    for weapon_id, (category_name, entry) in existing.items():
+        if weapon_id in claimed:
+            continue
+        if weapon_id in owned:
+            stats["removed"] += 1
+            continue
+        for name, weapons in blocks:
+            if name == category_name:
+                weapons.append(entry)
+                break
+        else:
+            blocks.append((category_name, [entry]))
+        stats["kept"] += 1
+
+    result = dict(catalog)
+    result["categories"] = []
+    for name, weapons in blocks:
+        category = dict(existing_categories.get(name, {"name": name}))
+        category["weapons"] = weapons
+        result["categories"].append(category)
+
+    text = json.dumps(result, indent=2)
+    if text != old_text:
+        os.makedirs(os.path.dirname(catalog_path) or '.', exist_ok=True)
+        write_atomic(catalog_path, text)
+    manifest_text = json.dumps({"version": MANIFEST_VERSION, "rows": rows}, indent=2)
+    if manifest_text != _read_text(manifest_path):
+        write_atomic(manifest_path, manifest_text)
+    return stats
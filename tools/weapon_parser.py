@@ -0,0 +1,355 @@
+"""Streaming weapon sheet ingester.
+
+Reads TSV or whitespace-delimited weapon sheets (files or stdin) and writes the
+``{"categories": [...]}`` catalog served as ``data/weapons.json``. Every stage is
+a generator, so rows are split, parsed and written one at a time and output
+starts before the input is drained. Memory does not depend on the number of
+rows; only the slug counters that keep ids unique grow, with the number of
+distinct weapon names.
+
+    python -m tools.weapon_parser data/weapon-sheet.tsv -o data/weapons.json
+    cat faction-*.tsv | python -m tools.weapon_parser > weapons.json
+"""
+import argparse
+import json
+import re
+import sys
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, TextIO
+
+RANGE_BANDS = 5
+RANGE_COLUMNS = RANGE_BANDS * 2
+# name, range cells, notes, hardpoint, cost
+ROW_WIDTH = 1 + RANGE_COLUMNS + 3
+
+CATEGORY_HEADERS = {'LASER', 'LASER/Kinetic', 'Kinetic', 'Kintetic/Particle', 'Particle', 'Particle/LASER', 'Troops'}
+
+_RANGE_CELL_RE = re.compile(r'^(?:[+-]?\d+(?:\.\d+)?|N/A|\d+(?:-\d+)?d\d+)$', re.IGNORECASE)
+_HARDPOINT_RE = re.compile(r'^[A-Za-z]{1,2}H(?:P|\d+)$')
+_COST_RE = re.compile(r'^(?:\d+(?:\.\d+)?|N/A)$', re.IGNORECASE)
+_NOTE_RE = re.compile(r'^([^()]+)\(([^()]+)\)$')
+_SIGNED_RE = re.compile(r'^[+-]\d+(?:\.\d+)?$')
+
+# Record kinds yielded by iter_records().
+CATEGORY = 'category'
+WEAPON = 'weapon'
+
+# Optional instrumentation hook, called as hook(event, **fields). Hot paths
+# only test this global, so leaving it unset costs nothing measurable.
+_trace: Callable[..., None] | None = None
+
+
+def set_trace(hook: Callable[..., None] | None) -> Callable[..., None] | None:
+    """Install (or with None, remove) the trace hook; returns the previous one.
+
+    Events: ``category_candidate`` (a known header name and the values the
+    category test looked at), ``header_row`` (a known header name's raw
+    cells) and ``category`` (a category block was opened).
+    """
+    global _trace
+    previous, _trace = _trace, hook
+    return previous
+
+
+def stderr_trace(event: str, **fields) -> None:
+    """Trace hook printing one line per event to stderr (``--trace``)."""
+    print('TRACE', event, ' '.join(f'{key}={value!r}' for key, value in fields.items()), file=sys.stderr)
+
+
+def split_line(line: str) -> list[str]:
+    """Split a row into columns while preserving empty cells."""
+    if '\t' in line:
+        parts = line.rstrip('\n').split('\t')
+    else:
+        parts = re.split(r'\s{2,}', line.strip())
+    return [p.strip() for p in parts]
+
+
+def parse_numeric(value: str | None):
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    if value.upper() == 'N/A':
+        return 'N/A'
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+
+
+@lru_cache(maxsize=4096)
+def _note_fragment(part: str) -> tuple:
+    match = _NOTE_RE.match(part)
+    if match:
+        return match.group(1).strip(), parse_numeric(match.group(2))
+    return (part,)
+
+
+def parse_notes(notes_str: str) -> list[dict]:
+    """Comma-separated notes as ``{"name", "value"?}`` dicts.
+
+    The sheet repeats a few dozen fragments, so each distinct fragment is
+    matched once; ``tools.weapon_traits`` gives the typed, interned view.
+    """
+    if not notes_str:
+        return []
+    parsed = []
+    for part in notes_str.split(','):
+        part = part.strip()
+        if part:
+            fragment = _note_fragment(part)
+            parsed.append({"name": fragment[0], "value": fragment[1]} if len(fragment) == 2 else {"name": part})
+    return parsed
+
+
+def slugify(name: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+    slug = re.sub(r'-{2,}', '-', slug)
+    return slug or 'weapon'
+
+
+def _fit(cells: list[str], width: int) -> list[str]:
+    if len(cells) >= width:
+        return cells[:width]
+    return cells + [''] * (width - len(cells))
+
+
+def normalize_row(parts: list[str], tabbed: bool = True) -> list[str]:
+    """Align a split row to ``ROW_WIDTH`` columns.
+
+    Sheet exports drop trailing empty range cells inconsistently, so for tabbed
+    rows the notes, hardpoint and cost columns are anchored to the right edge
+    and the range cells between them and the name are padded to
+    ``RANGE_COLUMNS``. Whitespace-delimited rows have no empty cells left, so
+    the leading range-like cells are taken as bands and the tail is classified
+    by shape (best effort).
+    """
+    name, cells = parts[0], parts[1:]
+    if tabbed:
+        if len(cells) < 3:
+            cells = [''] * (3 - len(cells)) + cells
+        ranges, tail = cells[:-3], cells[-3:]
+        return [name] + _fit(ranges, RANGE_COLUMNS) + tail
+
+    split_at = 0
+    while split_at < min(len(cells), RANGE_COLUMNS) and _RANGE_CELL_RE.match(cells[split_at]):
+        split_at += 1
+    ranges, tail = cells[:split_at], cells[split_at:]
+    notes = hardpoint = cost = ''
+    if tail and _COST_RE.match(tail[-1]):
+        cost = tail.pop()
+    if tail and _HARDPOINT_RE.match(tail[-1]):
+        hardpoint = tail.pop()
+    if tail:
+        notes = ', '.join(tail)
+    return [name] + _fit(ranges, RANGE_COLUMNS) + [notes, hardpoint, cost]
+
+
+def iter_lines(paths: Iterable[str]) -> Iterator[str]:
+    """Yield raw lines from each path in turn; ``-`` reads stdin."""
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+            continue
+        with open(path, encoding='utf-8') as handle:
+            yield from handle
+
+
+def iter_rows(lines: Iterable[str]) -> Iterator[list[str]]:
+    """Split and normalize non-blank lines into ``ROW_WIDTH`` cell lists."""
+    for line in lines:
+        if not line.strip():
+            continue
+        parts = split_line(line)
+        if not parts or not parts[0]:
+            continue
+        yield normalize_row(parts, tabbed='\t' in line)
+
+
+def parse_range_cell(value: str):
+    """Like ``parse_numeric``, but explicitly signed cells (``+1``, ``-2``) keep
+    their text: the catalog shows them as modifiers, not plain numbers."""
+    value = value.strip()
+    return value if _SIGNED_RE.match(value) else parse_numeric(value)
+
+
+def parse_ranges(range_cols: list[str]) -> list[dict]:
+    ranges = []
+    for i in range(0, RANGE_COLUMNS, 2):
+        acc = parse_range_cell(range_cols[i])
+        dmg = parse_range_cell(range_cols[i + 1])
+        ranges.append({"accuracy": acc, "damage": dmg})
+    return ranges
+
+
+def is_skipped_row(name: str) -> bool:
+    """Rows that never produce a catalog entry (sheet headers, generators)."""
+    return name.lower() == 'weapon' or 'generator' in name.lower()
+
+
+def is_category_row(parts: list[str]) -> bool:
+    """A header row: at most one stray cell, no notes/hardpoint, zero cost."""
+    notes_col, hp_col, cost_col = parts[RANGE_COLUMNS + 1:]
+    has_detail = notes_col or hp_col
+    non_empty_columns = sum(1 for col in parts[1:] if col)
+    if _trace is not None and parts[0] in CATEGORY_HEADERS:
+        _trace('category_candidate', name=parts[0], non_empty=non_empty_columns, cost=cost_col, has_detail=bool(has_detail))
+    return non_empty_columns <= 1 and cost_col in {'', '0'} and not has_detail
+
+
+def next_slug_id(base_slug: str, slug_counts: dict[str, int]) -> str:
+    count = slug_counts.get(base_slug, 0)
+    slug_counts[base_slug] = count + 1
+    return base_slug if count == 0 else f"{base_slug}-{count + 1}"
+
+
+def parse_weapon(parts: list[str], weapon_id: str) -> dict:
+    """Build the catalog entry for a normalized weapon row."""
+    range_cols = parts[1:RANGE_COLUMNS + 1]
+    notes_col, hp_col, cost_col = parts[RANGE_COLUMNS + 1:]
+    cost = parse_numeric(cost_col)
+    if cost == 'N/A':
+        cost = None
+    return {
+        "id": weapon_id,
+        "name": parts[0],
+        "ranges": parse_ranges(range_cols),
+        "notes": parse_notes(notes_col),
+        "hardpoint": hp_col or None,
+        "cost": cost,
+    }
+
+
+def iter_records(rows: Iterable[list[str]]) -> Iterator[tuple[str, str, dict | None]]:
+    """Turn normalized rows into ``(kind, category, weapon)`` records.
+
+    ``kind`` is ``CATEGORY`` when a header row opens a category (``weapon`` is
+    None) and ``WEAPON`` for every parsed weapon. Slug ids are kept unique
+    across the whole stream, so only the slug counters grow with the input.
+    """
+    current_category_name: str | None = None
+    slug_counts: dict[str, int] = {}
+
+    for parts in rows:
+        name = parts[0]
+        if _trace is not None and name in CATEGORY_HEADERS:
+            _trace('header_row', name=name, parts=parts)
+        if is_skipped_row(name):
+            continue
+        if is_category_row(parts):
+            current_category_name = name
+            if _trace is not None:
+                _trace('category', name=name)
+            yield CATEGORY, current_category_name, None
+            continue
+        if current_category_name is None:
+            current_category_name = 'General'
+            yield CATEGORY, current_category_name, None
+
+        weapon_id = next_slug_id(slugify(name), slug_counts)
+        yield WEAPON, current_category_name, parse_weapon(parts, weapon_id)
+
+
+def _indented(obj, level: int) -> str:
+    pad = ' ' * level
+    return pad + json.dumps(obj, indent=2).replace('\n', '\n' + pad)
+
+
+def write_catalog(records: Iterable[tuple[str, str, dict | None]], out: TextIO) -> tuple[int, int]:
+    """Stream records to ``out`` as the pretty-printed catalog JSON.
+
+    Output is byte-identical to ``json.dump(catalog, out, indent=2)``.
+    Consecutive records for the same category share one block; a header that
+    reopens an earlier category name starts a new block with that name.
+    Returns ``(weapon_count, category_count)``.
+    """
+    weapon_count = category_count = 0
+    current: str | None = None
+    block_weapons = 0
+
+    out.write('{\n  "categories": [')
+    for kind, category, weapon in records:
+        if category != current:
+            if current is not None:
+                out.write('\n      ]\n    }' if block_weapons else ']\n    }')
+            out.write(',\n' if category_count else '\n')
+            out.write(f'    {{\n      "name": {json.dumps(category)},\n      "weapons": [')
+            out.flush()
+            current = category
+            category_count += 1
+            block_weapons = 0
+        if kind == WEAPON:
+            out.write(',\n' if block_weapons else '\n')
+            out.write(_indented(weapon, 8))
+            block_weapons += 1
+            weapon_count += 1
+    if current is not None:
+        out.write('\n      ]\n    }' if block_weapons else ']\n    }')
+        out.write('\n  ]\n}')
+    else:
+        out.write(']\n}')
+    out.flush()
+    return weapon_count, category_count
+
+
+def ingest(paths: Iterable[str], out: TextIO, columnar_path: str | None = None) -> tuple[int, int]:
+    """Run the full pipeline from sheet paths to catalog JSON on ``out``.
+
+    With ``columnar_path`` the records are also collected into a ``.fvwc``
+    columnar catalog (see ``tools.weapon_catalog``).
+    """
+    records = iter_records(iter_rows(iter_lines(paths)))
+    if columnar_path is None:
+        return write_catalog(records, out)
+    from tools.weapon_catalog import ColumnarBuilder
+    builder = ColumnarBuilder()
+    counts = write_catalog(builder.add_records(records), out)
+    builder.write(columnar_path)
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Convert weapon sheets into the weapons.json catalog.')
+    parser.add_argument('inputs', nargs='*', default=['-'], help='TSV or whitespace-delimited sheets (default: stdin)')
+    parser.add_argument('-o', '--output', default='-', help='catalog path (default: stdout)')
+    parser.add_argument('--incremental', action='store_true', help='only re-parse changed rows and merge into the existing catalog')
+    parser.add_argument('--manifest', help='row-hash manifest for --incremental (default: <output>.manifest.json)')
+    parser.add_argument('--columnar', metavar='PATH', help='also write a compact columnar (.fvwc) catalog')
+    parser.add_argument('--trace', action='store_true', help='print parser trace events to stderr')
+    args = parser.parse_args(argv)
+    if args.trace:
+        set_trace(stderr_trace)
+
+    if args.incremental:
+        if args.output == '-':
+            parser.error('--incremental needs an --output catalog to merge into')
+        from tools.weapon_incremental import rebuild
+        stats = rebuild(args.inputs, args.output, args.manifest)
+        print('Rebuilt', args.output, ':', ', '.join(f'{count} {label}' for label, count in stats.items()), file=sys.stderr)
+        if args.columnar:
+            from tools.weapon_catalog import write_columnar
+            with open(args.output, encoding='utf-8') as handle:
+                write_columnar(json.load(handle), args.columnar)
+        return 0
+
+    if args.output == '-':
+        weapons, categories = ingest(args.inputs, sys.stdout, args.columnar)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            weapons, categories = ingest(args.inputs, out, args.columnar)
+    print('Wrote', args.output, 'with', weapons, 'weapons across', categories, 'categories', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Indexed query engine over the parsed weapon catalog.
+
+``WeaponIndex`` is built once from a catalog (``data/weapons.json`` or a
+``.fvwc`` columnar file) and keeps every weapon set as an int bitset over
+catalog rows:
+
+* equality indexes for hardpoint, category, tech requirement, note name and
+  ``(note name, value)`` pairs (``Energy(5)``, ``Swarm(3)``, ``Charge(1)``...);
+* sorted indexes for cost, per-band accuracy/damage and numeric note values,
+  with checkpointed prefix masks so a range turns into a bitset in
+  ``O(log n + STRIDE)``.
+
+A compound query is a handful of dict lookups and big-int ANDs, so typical
+queries run in microseconds. Queries are plain dicts (JSON friendly)::
+
+    {"hardpoint": "PHP", "notes": ["Beam"], "damage": {"3": [5, null]}, "cost": [null, 40]}
+
+Keys: ``hardpoint``/``category``/``tech`` (a value or a list, any-of),
+``notes`` (all required), ``exclude_notes``, ``note_values``
+(``{name: value}`` or ``{name: [min, max]}``), ``cost``, ``accuracy`` and
+``damage`` (``{band: [min, max]}``). Bands are numbered 1-5 as on the sheet;
+ranges are inclusive and ``null`` leaves a side open. Bounds must be numbers;
+anything else raises ``QueryError``.
+
+    python -m tools.weapon_query data/weapons.json --hardpoint PHP --note Beam --damage 3:5: --cost :40
+    python -m tools.weapon_query data/weapons.json --note-value 'Energy(5)' --note-value Swarm=3:
+    python -m tools.weapon_query data/weapons.json --batch queries.jsonl
+"""
+import argparse
+import bisect
+import json
+import re
+import sys
+from typing import Iterable
+
+from tools.bitset import iter_bits
+from tools.weapon_parser import RANGE_BANDS, parse_numeric
+
+STRIDE = 64
+
+_NOTE_VALUE_ARG_RE = re.compile(r'^([^=()]+?)\s*(?:=(.*)|\((.*)\))$')
+
+
+class QueryError(ValueError):
+    """Raised for a malformed query (bad band, non-numeric bound...)."""
+
+
+def load_catalog(path: str) -> dict:
+    """Load a JSON or ``.fvwc`` catalog as the ``{"categories": [...]}`` dict."""
+    if path.endswith('.fvwc'):
+        from tools.weapon_catalog import WeaponCatalog
+        with WeaponCatalog(path) as catalog:
+            return catalog.to_catalog()
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def numeric(value) -> int | float | None:
+    """Numeric value of a catalog cell (``"+1"`` -> 1); None for N/A, dice, blanks."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = parse_numeric(value)
+    if isinstance(value, (int, float)):
+        return value
+    return None
+
+
+class SortedIndex:
+    """Values sorted with their rows, plus prefix masks every ``STRIDE`` entries."""
+
+    __slots__ = ('values', 'rows', 'checkpoints')
+
+    def __init__(self, pairs: Iterable[tuple[float, int]]):
+        ordered = sorted(pairs)
+        self.values = [value for value, _ in ordered]
+        self.rows = [row for _, row in ordered]
+        self.checkpoints = [0]
+        mask = 0
+        for position, row in enumerate(self.rows, 1):
+            mask |= 1 << row
+            if position % STRIDE == 0:
+                self.checkpoints.append(mask)
+
+    def _prefix(self, position: int) -> int:
+        block = position // STRIDE
+        mask = self.checkpoints[block]
+        for row in self.rows[block * STRIDE:position]:
+            mask |= 1 << row
+        return mask
+
+    def range_mask(self, low=None, high=None) -> int:
+        start = 0 if low is None else bisect.bisect_left(self.values, low)
+        stop = len(self.values) if high is None else bisect.bisect_right(self.values, high)
+        if start >= stop:
+            return 0
+        return self._prefix(stop) & ~self._prefix(start)
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, (list, tuple)) else [value]
+
+
+def _bound(value):
+    if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    raise QueryError(f'Range bounds must be numbers or null, got {value!r}')
+
+
+def _bounds(spec) -> tuple:
+    if isinstance(spec, (list, tuple)):
+        if len(spec) > 2:
+            raise QueryError(f'A range is [min, max], got {spec!r}')
+        low, high = (list(spec) + [None, None])[:2]
+        return _bound(low), _bound(high)
+    return _bound(spec), _bound(spec)
+
+
+class WeaponIndex:
+    """Prebuilt bitset indexes over every weapon in a catalog."""
+
+    def __init__(self, catalog: dict):
+        self.weapons: list[dict] = []
+        self.categories: list[str] = []
+        self.by_id: dict[str, int] = {}
+        self.by_hardpoint: dict[str, int] = {}
+        self.by_category: dict[str, int] = {}
+        self.by_tech: dict[str, int] = {}
+        self.by_note: dict[str, int] = {}
+        self.by_note_value: dict[tuple[str, object], int] = {}
+
+        cost_pairs = []
+        accuracy_pairs = [[] for _ in range(RANGE_BANDS)]
+        damage_pairs = [[] for _ in range(RANGE_BANDS)]
+        note_pairs: dict[str, list] = {}
+
+        for category in catalog.get('categories', []):
+            for weapon in category.get('weapons', []):
+                row = len(self.weapons)
+                bit = 1 << row
+                self.weapons.append(weapon)
+                self.categories.append(category['name'])
+                self.by_id[weapon['id']] = row
+                self._add(self.by_category, category['name'], bit)
+                self._add(self.by_hardpoint, weapon.get('hardpoint'), bit)
+                self._add(self.by_tech, weapon.get('techRequirement'), bit)
+
+                cost = numeric(weapon.get('cost'))
+                if cost is not None:
+                    cost_pairs.append((cost, row))
+                for band, cell in enumerate((weapon.get('ranges') or [])[:RANGE_BANDS]):
+                    accuracy, damage = numeric(cell.get('accuracy')), numeric(cell.get('damage'))
+                    if accuracy is not None:
+                        accuracy_pairs[band].append((accuracy, row))
+                    if damage is not None:
+                        damage_pairs[band].append((damage, row))
+
+                for note in weapon.get('notes') or []:
+                    self._add(self.by_note, note['name'], bit)
+                    if 'value' in note:
+                        value = numeric(note['value'])
+                        self._add(self.by_note_value, (note['name'], note['value'] if value is None else value), bit)
+                        if value is not None:
+                            note_pairs.setdefault(note['name'], []).append((value, row))
+
+        self.all_mask = (1 << len(self.weapons)) - 1
+        self.cost_index = SortedIndex(cost_pairs)
+        self.accuracy_index = [SortedIndex(pairs) for pairs in accuracy_pairs]
+        self.damage_index = [SortedIndex(pairs) for pairs in damage_pairs]
+        self.note_value_index = {name: SortedIndex(pairs) for name, pairs in note_pairs.items()}
+
+    @classmethod
+    def from_path(cls, path: str) -> 'WeaponIndex':
+        return cls(load_catalog(path))
+
+    @staticmethod
+    def _add(index: dict, key, bit: int) -> None:
+        if key is not None:
+            index[key] = index.get(key, 0) | bit
+
+    def __len__(self) -> int:
+        return len(self.weapons)
+
+    # Query evaluation -------------------------------------------------
+
+    def _any_of(self, index: dict, keys) -> int:
+        mask = 0
+        for key in _as_list(keys):
+            mask |= index.get(key, 0)
+        return mask
+
+    def _band_mask(self, indexes: list[SortedIndex], spec: dict) -> int:
+        mask = self.all_mask
+        if not isinstance(spec, dict):
+            raise QueryError(f'Band ranges are {{band: [min, max]}}, got {spec!r}')
+        for band, bounds in spec.items():
+            try:
+                band = int(band)
+            except (TypeError, ValueError):
+                raise QueryError(f'Range band must be 1-{RANGE_BANDS}, got {band!r}') from None
+            if not 1 <= band <= RANGE_BANDS:
+                raise QueryError(f'Range band must be 1-{RANGE_BANDS}, got {band}')
+            mask &= indexes[band - 1].range_mask(*_bounds(bounds))
+        return mask
+
+    def _note_value_mask(self, name: str, spec) -> int:
+        if isinstance(spec, (list, tuple)):
+            index = self.note_value_index.get(name)
+            return index.range_mask(*_bounds(spec)) if index else 0
+        value = numeric(spec)
+        return self.by_note_value.get((name, spec if value is None else value), 0)
+
+    def mask(self, query: dict) -> int:
+        """Bitset of the rows matching ``query``."""
+        mask = self.all_mask
+        for key, index in (('hardpoint', self.by_hardpoint), ('category', self.by_category), ('tech', self.by_tech)):
+            if key in query:
+                mask &= self._any_of(index, query[key])
+        for name in _as_list(query.get('notes')):
+            mask &= self.by_note.get(name, 0)
+        for name in _as_list(query.get('exclude_notes')):
+            mask &= ~self.by_note.get(name, 0)
+        for name, spec in (query.get('note_values') or {}).items():
+            mask &= self._note_value_mask(name, spec)
+        if 'cost' in query:
+            mask &= self.cost_index.range_mask(*_bounds(query['cost']))
+        if 'accuracy' in query:
+            mask &= self._band_mask(self.accuracy_index, query['accuracy'])
+        if 'damage' in query:
+            mask &= self._band_mask(self.damage_index, query['damage'])
+        return mask
+
+    def rows(self, query: dict) -> list[int]:
+        return list(iter_bits(self.mask(query)))
+
+    def query(self, query: dict) -> list[dict]:
+        """Weapons matching ``query``, in catalog order (shared, not copied)."""
+        weapons = self.weapons
+        return [weapons[row] for row in iter_bits(self.mask(query))]
+
+    def query_many(self, queries: Iterable[dict]) -> list[list[dict]]:
+        """Run a batch of queries, reusing results for repeated queries."""
+        cache: dict[str, int] = {}
+        weapons = self.weapons
+        results = []
+        for query in queries:
+            key = json.dumps(query, sort_keys=True)
+            mask = cache.get(key)
+            if mask is None:
+                mask = cache[key] = self.mask(query)
+            results.append([weapons[row] for row in iter_bits(mask)])
+        return results
+
+
+def _parse_band_args(values: list[str]) -> dict:
+    """``["3:5:", "1:2:4"]`` -> ``{"3": [5, None], "1": [2, 4]}``."""
+    spec = {}
+    for value in values:
+        band, _, bounds = value.partition(':')
+        spec[band] = _parse_range_arg(bounds)
+    return spec
+
+
+def _parse_range_arg(value: str) -> list:
+    low, _, high = value.partition(':')
+    bounds = []
+    for side in (low, high):
+        number = numeric(side) if side else None
+        if side and number is None:
+            raise QueryError(f'Range bounds must be numbers, got {side!r}')
+        bounds.append(number)
+    return bounds
+
+
+def _parse_note_value_args(values: list[str]) -> dict:
+    """``["Energy(5)", "Swarm=3:"]`` -> ``{"Energy": 5, "Swarm": [3, None]}``."""
+    spec = {}
+    for value in values:
+        match = _NOTE_VALUE_ARG_RE.match(value.strip())
+        if not match:
+            raise QueryError(f'Note values are NAME(VALUE), NAME=VALUE or NAME=MIN:MAX, got {value!r}')
+        name, text = match.group(1).strip(), (match.group(2) if match.group(2) is not None else match.group(3)).strip()
+        spec[name] = _parse_range_arg(text) if ':' in text else parse_numeric(text)
+    return spec
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Query the weapon catalog.')
+    parser.add_argument('catalog', help='weapons.json or .fvwc catalog')
+    parser.add_argument('--hardpoint', action='append', help='hardpoint class (repeatable, any-of)')
+    parser.add_argument('--category', action='append', help='category name (repeatable, any-of)')
+    parser.add_argument('--tech', action='append', help='tech requirement id (repeatable, any-of)')
+    parser.add_argument('--note', action='append', default=[], help='required note name (repeatable)')
+    parser.add_argument('--exclude-note', action='append', default=[], help='forbidden note name (repeatable)')
+    parser.add_argument('--note-value', action='append', default=[],
+                        help='NAME(VALUE), NAME=VALUE or NAME=MIN:MAX, e.g. "Energy(5)" (repeatable)')
+    parser.add_argument('--cost', help='MIN:MAX (either side may be empty)')
+    parser.add_argument('--accuracy', action='append', default=[], help='BAND:MIN:MAX (bands 1-5)')
+    parser.add_argument('--damage', action='append', default=[], help='BAND:MIN:MAX (bands 1-5)')
+    parser.add_argument('--batch', help='JSON-lines file of queries ("-" for stdin); prints one id list per line')
+    args = parser.parse_args(argv)
+
+    index = WeaponIndex.from_path(args.catalog)
+    try:
+        if args.batch:
+            handle = sys.stdin if args.batch == '-' else open(args.batch, encoding='utf-8')
+            with handle:
+                queries = [json.loads(line) for line in handle if line.strip()]
+            for weapons in index.query_many(queries):
+                print(json.dumps([weapon['id'] for weapon in weapons]))
+            return 0
+        query = _query_from_args(args)
+        weapons = index.query(query)
+    except QueryError as error:
+        parser.error(str(error))
+    except json.JSONDecodeError as error:
+        parser.error(f'{args.batch}: {error}')
+    for weapon in weapons:
+        print(weapon['id'], weapon.get('hardpoint'), weapon.get('cost'), sep='\t')
+    return 0
+
+
+def _query_from_args(args: argparse.Namespace) -> dict:
+    query = {}
+    for key in ('hardpoint', 'category', 'tech'):
+        if getattr(args, key):
+            query[key] = getattr(args, key)
+    if args.note:
+        query['notes'] = args.note
+    if args.exclude_note:
+        query['exclude_notes'] = args.exclude_note
+    if args.note_value:
+        query['note_values'] = _parse_note_value_args(args.note_value)
+    if args.cost:
+        query['cost'] = _parse_range_arg(args.cost)
+    if args.accuracy:
+        query['accuracy'] = _parse_band_args(args.accuracy)
+    if args.damage:
+        query['damage'] = _parse_band_args(args.damage)
+    return query
+
+
+if __name__ == '__main__':
+    sys.exit(main())
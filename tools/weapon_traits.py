@@ -0,0 +1,338 @@
+"""Typed, interned weapon traits (the sheet's "notes" column).
+
+A ``TraitRegistry`` knows the sheet's trait vocabulary (``KNOWN_TRAITS``) and
+gives every trait one ``Trait`` object (``__slots__``, interned by name) and
+one bit. Fragments are matched with precompiled patterns and cached, and
+besides ``Name`` and ``Name(value)`` two structured forms are understood:
+
+* ``Charge to X`` -- a ``Charge`` variant converting into trait ``X``
+  (``Charge to Strafe``, ``Charge to Swarm(3)``): ``base`` is Charge and
+  ``target`` is X;
+* ``X?`` -- a tentative ``X`` (``tentative`` is set, ``base`` is X).
+
+``See Description <text>`` keeps the trailing text as its value. Sheet notes
+also hold free-text rules, and commas inside them split the text into
+fragments; unrecognised fragments directly following a ``See Description``
+note in the same cell are taken as description prose and appended to its
+value. Fragments shaped like a trait (``Name(value)``, ``Charge to X``) are
+never folded, so typos such as ``Charge to Stafe`` stay visible. Anything else
+is an unknown fragment: it is left out of the trait set and reported.
+
+A weapon's traits are a ``TraitSet``: the bitmask of its traits plus a small
+tuple holding the values of the valued ones in bit order. Identical sets are
+shared, so a catalog holds one object per distinct trait combination, and
+filtering is integer mask tests (``TraitTable.select``).
+
+    python -m tools.weapon_traits data/weapons.json
+    python -m tools.weapon_traits data/weapon-sheet.tsv --all Beam --none Antimissile
+"""
+import argparse
+import re
+import sys
+from collections import Counter
+from typing import Iterable, Iterator
+
+from tools.weapon_parser import parse_numeric
+
+# (name, takes a value) in sheet vocabulary order.
+KNOWN_TRAITS = (
+    ('Projectile', False), ('Beam', False), ('Energy', True), ('Swarm', True), ('Salvo', True),
+    ('Repeat', True), ('Charge', True), ('Strafe', False), ('Blast', False), ('Antimissile', False),
+    ('Antipersonnel', False), ('Steer', True), ('Hybrid', False), ('Multiuse', True), ('Safe', False),
+    ('Seek', False), ('Durable', True), ('Fragile', False), ('Reinforced', False), ('One-shot', False), ('Smart', False),
+    ('Terminal', False), ('Volume', True), ('Cascade', False), ('Area', False), ('Overload', False),
+    ('Modifies', False), ('See Description', False),
+)
+
+SEE_DESCRIPTION = 'See Description'
+
+_VALUE_RE = re.compile(r'^([^()]+)\(([^()]+)\)$')
+_CHARGE_TO_RE = re.compile(r'^Charge to (\S.*)$')
+_TENTATIVE_RE = re.compile(r'^(.*\S)\?$')
+_SEE_DESCRIPTION_RE = re.compile(r'^See Description\s+(\S.*)$')
+
+
+class Trait:
+    """One interned trait; compare by identity."""
+
+    __slots__ = ('name', 'bit', 'valued', 'base', 'target', 'tentative')
+
+    def __init__(self, name: str, bit: int, valued: bool, base: 'Trait | None' = None,
+                 target: 'Trait | None' = None, tentative: bool = False):
+        self.name = name
+        self.bit = bit
+        self.valued = valued
+        self.base = base
+        self.target = target
+        self.tentative = tentative
+
+    @property
+    def mask(self) -> int:
+        return 1 << self.bit
+
+    def __repr__(self) -> str:
+        return f'Trait({self.name!r})'
+
+
+class TraitSet:
+    """A weapon's traits: bitmask, mask of the valued ones and their values."""
+
+    __slots__ = ('registry', 'mask', 'valued', 'values')
+
+    def __init__(self, registry: 'TraitRegistry', mask: int, valued: int, values: tuple):
+        self.registry = registry
+        self.mask = mask
+        self.valued = valued
+        self.values = values
+
+    def __contains__(self, name: str) -> bool:
+        trait = self.registry.traits.get(name)
+        return trait is not None and self.mask >> trait.bit & 1 == 1
+
+    def value(self, name: str, default=None):
+        trait = self.registry.traits.get(name)
+        if trait is None or not self.valued >> trait.bit & 1:
+            return default
+        return self.values[(self.valued & (trait.mask - 1)).bit_count()]
+
+    def __iter__(self) -> Iterator[tuple[Trait, object]]:
+        """``(trait, value or None)`` in bit order."""
+        order = self.registry.order
+        mask, index = self.mask, 0
+        while mask:
+            low = mask & -mask
+            bit = low.bit_length() - 1
+            if self.valued & low:
+                yield order[bit], self.values[index]
+                index += 1
+            else:
+                yield order[bit], None
+            mask ^= low
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def to_notes(self) -> list[dict]:
+        """Catalog ``notes`` dicts (in bit order, not sheet order)."""
+        return [{"name": trait.name} if value is None else {"name": trait.name, "value": value}
+                for trait, value in self]
+
+    def __repr__(self) -> str:
+        return 'TraitSet(' + ', '.join(t.name if v is None else f'{t.name}({v})' for t, v in self) + ')'
+
+
+class TraitRegistry:
+    """Known traits, derived forms, fragment cache and interned trait sets."""
+
+    def __init__(self, known: Iterable[tuple[str, bool]] = KNOWN_TRAITS):
+        self.traits: dict[str, Trait] = {}
+        self.order: list[Trait] = []
+        self.unknown: Counter = Counter()
+        self._fragments: dict[str, tuple[Trait, object] | None] = {}
+        self._sets: dict[tuple, TraitSet] = {}
+        self._cells: dict[str, tuple[TraitSet, list[str]]] = {}
+        for name, valued in known:
+            self._register(name, valued)
+        self.empty = self._intern(0, 0, ())
+
+    def _register(self, name: str, valued: bool, **derived) -> Trait:
+        trait = Trait(name, len(self.order), valued, **derived)
+        self.traits[name] = trait
+        self.order.append(trait)
+        return trait
+
+    def trait(self, name: str) -> Trait | None:
+        """The interned trait called ``name``, deriving ``Charge to X``/``X?`` on first use."""
+        trait = self.traits.get(name)
+        if trait is not None:
+            return trait
+        match = _CHARGE_TO_RE.match(name)
+        if match:
+            target = self.trait(match.group(1))
+            if target is not None and 'Charge' in self.traits:
+                return self._register(name, True, base=self.traits['Charge'], target=target)
+            return None
+        match = _TENTATIVE_RE.match(name)
+        if match:
+            base = self.trait(match.group(1))
+            if base is not None:
+                return self._register(name, base.valued, base=base, tentative=True)
+        return None
+
+    def mask(self, names: Iterable[str]) -> int | None:
+        """Mask of ``names``; None if any of them is not a trait."""
+        mask = 0
+        for name in names:
+            trait = self.trait(name)
+            if trait is None:
+                return None
+            mask |= trait.mask
+        return mask
+
+    def fragment(self, text: str) -> tuple[Trait, object] | None:
+        """``(trait, value)`` for one comma-separated note, None when unknown."""
+        try:
+            return self._fragments[text]
+        except KeyError:
+            pass
+        parsed = None
+        match = _VALUE_RE.match(text)
+        if match:
+            trait = self.trait(match.group(1).strip())
+            if trait is not None:
+                parsed = (trait, parse_numeric(match.group(2)))
+        else:
+            trait = self.trait(text)
+            if trait is not None:
+                parsed = (trait, None)
+            else:
+                match = _SEE_DESCRIPTION_RE.match(text)
+                if match:
+                    parsed = (self.traits[SEE_DESCRIPTION], match.group(1))
+        self._fragments[text] = parsed
+        return parsed
+
+    def _intern(self, mask: int, valued: int, values: tuple) -> TraitSet:
+        key = (mask, valued, values)
+        found = self._sets.get(key)
+        if found is None:
+            found = self._sets[key] = TraitSet(self, mask, valued, values)
+        return found
+
+    def _build(self, pairs: Iterable[tuple[Trait, object]]) -> TraitSet:
+        mask = valued = 0
+        by_bit = {}
+        for trait, value in pairs:
+            if mask >> trait.bit & 1:
+                continue  # first occurrence wins, as in combat_sim's note map
+            mask |= trait.mask
+            if value is not None:
+                valued |= trait.mask
+                by_bit[trait.bit] = value
+        return self._intern(mask, valued, tuple(by_bit[bit] for bit in sorted(by_bit)))
+
+    def _collect(self, fragments: Iterable[tuple[str, tuple[Trait, object] | None]]) -> tuple[TraitSet, list[str]]:
+        """Trait set and unknown fragments from ``(text, parsed)`` pairs, folding prose into See Description."""
+        see_description = self.traits.get(SEE_DESCRIPTION)
+        pairs, unknown, prose = [], [], []
+        folding = False  # inside the run of fragments right after See Description
+        for text, parsed in fragments:
+            if parsed is not None:
+                pairs.append(parsed)
+                folding = see_description is not None and parsed[0] is see_description
+            elif folding and not (_VALUE_RE.match(text) or _CHARGE_TO_RE.match(text)):
+                prose.append(text)
+            else:
+                unknown.append(text)
+                folding = False
+        if prose:
+            for i, (trait, value) in enumerate(pairs):
+                if trait is see_description:
+                    pairs[i] = (trait, ', '.join(([] if value is None else [str(value)]) + prose))
+                    break
+            else:
+                pairs.append((see_description, ', '.join(prose)))
+        return self._build(pairs), unknown
+
+    def parse(self, notes: str) -> tuple[TraitSet, list[str]]:
+        """Parse a sheet notes cell into ``(traits, unknown fragments)``."""
+        if not notes:
+            return self.empty, []
+        cached = self._cells.get(notes)
+        if cached is None:
+            parts = [part.strip() for part in notes.split(',')]
+            cached = self._cells[notes] = self._collect((part, self.fragment(part)) for part in parts if part)
+        if cached[1]:
+            self.unknown.update(cached[1])
+        return cached[0], list(cached[1])
+
+    def from_notes(self, notes: list[dict] | None) -> tuple[TraitSet, list[str]]:
+        """Same as ``parse`` for already parsed catalog ``notes`` dicts."""
+        fragments = []
+        for note in notes or []:
+            name, value = note['name'], note.get('value')
+            trait = self.trait(name)
+            if trait is not None:
+                fragments.append((name, (trait, value)))
+            elif value is None:
+                fragments.append((name, self.fragment(name)))
+            else:
+                fragments.append((f'{name}({value})', None))
+        traits, unknown = self._collect(fragments)
+        self.unknown.update(unknown)
+        return traits, unknown
+
+
+class TraitTable:
+    """Trait sets of every weapon in a catalog, for mask-based filtering."""
+
+    def __init__(self, catalog: dict, registry: TraitRegistry | None = None):
+        self.registry = registry or TraitRegistry()
+        self.weapons: list[dict] = []
+        self.sets: list[TraitSet] = []
+        self.masks: list[int] = []
+        self.unknown: dict[str, list[str]] = {}
+        for category in catalog.get('categories', []):
+            for weapon in category.get('weapons', []):
+                traits, unknown = self.registry.from_notes(weapon.get('notes'))
+                self.weapons.append(weapon)
+                self.sets.append(traits)
+                self.masks.append(traits.mask)
+                if unknown:
+                    self.unknown[weapon['id']] = unknown
+
+    def select(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (), none_of: Iterable[str] = ()) -> list[int]:
+        """Rows having every ``all_of``, at least one ``any_of`` and no ``none_of`` trait."""
+        registry = self.registry
+        required = registry.mask(all_of)
+        if required is None:
+            return []
+        any_of = list(any_of)
+        wanted = sum(trait.mask for trait in map(registry.trait, any_of) if trait)
+        if any_of and not wanted:
+            return []  # every any_of name is unknown: nothing can match
+        forbidden = sum(trait.mask for trait in map(registry.trait, none_of) if trait)
+        return [row for row, mask in enumerate(self.masks)
+                if mask & required == required and (not any_of or mask & wanted) and not mask & forbidden]
+
+
+def _iter_sheet_notes(path: str) -> Iterator[tuple[str, str]]:
+    from tools.weapon_parser import WEAPON, iter_lines, iter_records, iter_rows
+    for kind, _, weapon in iter_records(iter_rows(iter_lines([path]))):
+        if kind == WEAPON:
+            yield weapon['id'], weapon['notes']
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Report weapon traits and unknown note fragments.')
+    parser.add_argument('source', help='weapons.json / .fvwc catalog or a weapon sheet (.tsv/.txt)')
+    parser.add_argument('--all', nargs='*', default=[], help='list weapons having all of these traits')
+    parser.add_argument('--any', nargs='*', default=[], help='... and any of these')
+    parser.add_argument('--none', nargs='*', default=[], help='... and none of these')
+    args = parser.parse_args(argv)
+
+    registry = TraitRegistry()
+    if args.source.endswith(('.json', '.fvwc')):
+        from tools.weapon_query import load_catalog
+        catalog = load_catalog(args.source)
+    else:
+        catalog = {"categories": [{"name": args.source, "weapons": [
+            {"id": weapon_id, "notes": notes} for weapon_id, notes in _iter_sheet_notes(args.source)]}]}
+    table = TraitTable(catalog, registry)
+
+    if args.all or args.any or args.none:
+        for row in table.select(args.all, args.any, args.none):
+            print(table.weapons[row]['id'], table.sets[row], sep='\t')
+        return 0
+    usage = Counter(trait.name for traits in table.sets for trait, _ in traits)
+    for trait in registry.order:
+        print(f'{trait.name:<20} {usage[trait.name]}')
+    print(f'{len(table.weapons)} weapons, {len(set(map(id, table.sets)))} distinct trait sets', file=sys.stderr)
+    for weapon_id, fragments in table.unknown.items():
+        for fragment in fragments:
+            print(f'unknown note in {weapon_id}: {fragment}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())